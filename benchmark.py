@@ -0,0 +1,353 @@
+"""
+Time the operations the bots and Game spend their time on, on a fixed corpus
+of mid-game positions, and check the numbers against a saved baseline.
+
+    python benchmark.py --out baseline.json
+    python benchmark.py --compare baseline.json --threshold 0.15
+
+Compare mode exits with status 1 if any benchmark got slower than the
+baseline by more than the threshold.
+"""
+
+import argparse
+from copy import copy
+from dataclasses import asdict, dataclass
+import json
+import platform
+from random import Random
+import sys
+import time
+from typing import Callable
+
+from board import Board, Space
+from dumb_bot import Dumb_Bot
+from game import Game
+from random_bot import RandomPlayer
+from search import opponent
+from selfplay import play_turn, random_policy
+from smart_bot import Smart_Bot
+
+
+@dataclass
+class Corpus:
+    """
+    Positions to benchmark on, the same every run
+
+    Attributes:
+        boards: Mid-game positions on both board sizes
+        unclear: Positions right after a dig and move, before the other
+            player's dead miners were cleared, with the color to clear
+    """
+
+    boards: list[Board]
+    unclear: list[tuple[Board, Space]]
+
+
+def corpus(seed: int = 0, per_size: int = 20) -> Corpus:
+    """
+    Play random games to build the benchmark positions
+
+    Args:
+        seed (int, optional): Changing it changes every benchmark. Defaults to 0.
+        per_size (int, optional): Positions per board size. Defaults to 20.
+
+    Returns:
+        Corpus: The positions
+    """
+    rng = Random(seed)
+    boards = []
+    unclear = []
+    for small in (True, False):
+        while sum(b.size == (5 if small else 7) for b in boards) < per_size:
+            board = Board(small)
+            color = Space.RED
+            stop = rng.randint(6, 30)
+            for ply in range(stop):
+                if not board.mineable_by_player(color):
+                    break
+                turn = random_policy([board], color, rng)[0]
+                if ply == stop - 1:
+                    # The same turn again, minus the final clear_dead
+                    before = copy(board)
+                    dig, move = turn
+                    before.push_mine(dig, color)
+                    if move is not None:
+                        before[move[0]] = Space.EMPTY
+                        before[move[1]] = color
+                    unclear.append((copy(before), opponent(color)))
+                play_turn(board, turn, color)
+                color = opponent(color)
+            else:
+                boards.append(board)
+    return Corpus(boards, unclear)
+
+
+@dataclass
+class Result:
+    """
+    One benchmark's measurement
+
+    Attributes:
+        value: The measured rate or time
+        unit: What value is measured in
+        higher_is_better: Whether a bigger value is an improvement
+    """
+
+    value: float
+    unit: str
+    higher_is_better: bool = False
+
+
+def per_call(
+    run: Callable[[], int], repeat: int = 5, setup: Callable[[], None] | None = None
+) -> Result:
+    # Best of several runs, in microseconds per operation. run returns how
+    # many operations it did.
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        count = run()
+        best = min(best, (time.perf_counter() - start) / max(count, 1))
+    return Result(best * 1e6, "us/op")
+
+
+def bench_board(data: Corpus, repeat: int) -> dict[str, Result]:
+    results = {}
+    for small, name in ((True, "small"), (False, "large")):
+
+        def construct() -> int:
+            for _ in range(200):
+                Board(small)
+            return 200
+
+        results[f"board_init_{name}"] = per_call(construct, repeat)
+    boards = data.boards
+
+    def copies() -> int:
+        for board in boards:
+            copy(board)
+        return len(boards)
+
+    def hashes() -> int:
+        for board in boards:
+            hash(board)
+        return len(boards)
+
+    results["copy"] = per_call(copies, repeat)
+    results["hash"] = per_call(hashes, repeat)
+
+    # Cached results are thrown away with fresh copies before each run
+    fresh: list[Board] = []
+
+    def refresh():
+        fresh[:] = [copy(board) for board in boards]
+
+    def walkable() -> int:
+        for board in fresh:
+            board.walkable_by_player(Space.RED)
+            board.walkable_by_player(Space.BLUE)
+        return 2 * len(fresh)
+
+    def mineable() -> int:
+        for board in fresh:
+            board.mineable_by_player(Space.RED)
+            board.mineable_by_player(Space.BLUE)
+        return 2 * len(fresh)
+
+    def miner_dead() -> int:
+        count = 0
+        for board in fresh:
+            for color in (Space.RED, Space.BLUE):
+                for miner in board.find_all(color):
+                    board.is_miner_dead(miner)
+                    count += 1
+        return count
+
+    results["walkable_by_player"] = per_call(walkable, repeat, refresh)
+    results["mineable_by_player"] = per_call(mineable, repeat, refresh)
+    results["is_miner_dead"] = per_call(miner_dead, repeat, refresh)
+
+    unclear: list[tuple[Board, Space]] = []
+
+    def refresh_unclear():
+        unclear[:] = [(copy(board), color) for board, color in data.unclear]
+
+    def clear_dead() -> int:
+        for board, color in unclear:
+            board.clear_dead(color)
+        return len(unclear)
+
+    results["clear_dead"] = per_call(clear_dead, repeat, refresh_unclear)
+    return results
+
+
+def bench_search(data: Corpus, repeat: int) -> dict[str, Result]:
+    # Nodes per second at a fixed depth, on a few positions of each size
+    positions = [b for b in data.boards if b.size == 5][:3] + [
+        b for b in data.boards if b.size == 7
+    ][:3]
+    results = {}
+
+    def dumb_nodes() -> tuple[int, float]:
+        bot = Dumb_Bot()
+        nodes = 0
+        search = bot.minimax_ab
+
+        def counted(*args, **kwargs):
+            nonlocal nodes
+            nodes += 1
+            return search(*args, **kwargs)
+
+        # Recursive calls go through the instance attribute too
+        bot.minimax_ab = counted  # type: ignore
+        start = time.perf_counter()
+        for board in positions:
+            bot.new_search(bot.move_table, Space.RED)
+            bot.minimax_ab(board, Space.RED, 2, -float("inf"), float("inf"), True, True)
+        return nodes, time.perf_counter() - start
+
+    def smart_nodes() -> tuple[int, float]:
+        bot = Smart_Bot()
+        nodes = 0
+        start = time.perf_counter()
+        for board in positions:
+            bot.turn_search.search(board, Space.RED, float("inf"), max_depth=2)
+            nodes += bot.turn_search.nodes
+        return nodes, time.perf_counter() - start
+
+    for name, run in (
+        ("dumb_bot_minimax_nodes_per_s", dumb_nodes),
+        ("smart_bot_search_nodes_per_s", smart_nodes),
+    ):
+        best = 0.0
+        for _ in range(max(1, repeat // 2)):
+            nodes, seconds = run()
+            best = max(best, nodes / seconds)
+        results[name] = Result(best, "nodes/s", higher_is_better=True)
+    return results
+
+
+def bench_game(repeat: int) -> dict[str, Result]:
+    # Game.step with bots that answer instantly: what Game itself costs per turn
+    startup = float("inf")
+    step = float("inf")
+    for _ in range(max(1, repeat // 2)):
+        game = Game(RandomPlayer(), RandomPlayer(), small=True)
+        try:
+            start = time.perf_counter()
+            game.step()
+            game.step()
+            startup = min(startup, time.perf_counter() - start)
+            steps = 0
+            start = time.perf_counter()
+            while game.winner is None and steps < 20:
+                game.step()
+                steps += 1
+            step = min(step, (time.perf_counter() - start) / max(steps, 1))
+        finally:
+            game.close()
+    return {
+        "game_first_turns": Result(startup * 1e6, "us/op"),
+        "game_step": Result(step * 1e6, "us/op"),
+    }
+
+
+def run_all(seed: int = 0, repeat: int = 5) -> dict[str, Result]:
+    """
+    Run every benchmark
+
+    Args:
+        seed (int, optional): Picks the corpus. Defaults to 0.
+        repeat (int, optional): Runs per benchmark; the best one counts. Defaults to 5.
+
+    Returns:
+        dict[str, Result]: The measurements, by benchmark name
+    """
+    data = corpus(seed)
+    return {
+        **bench_board(data, repeat),
+        **bench_search(data, repeat),
+        **bench_game(repeat),
+    }
+
+
+def compare(
+    baseline: dict[str, Result], current: dict[str, Result], threshold: float = 0.1
+) -> tuple[list[str], list[str]]:
+    """
+    Compare measurements against a baseline
+
+    Args:
+        baseline (dict[str, Result]): The saved measurements
+        current (dict[str, Result]): The new measurements
+        threshold (float, optional): How much slower, as a fraction, counts as a
+            regression. Defaults to 0.1.
+
+    Returns:
+        tuple[list[str], list[str]]: A report line per benchmark in both, and the
+            names of the ones that regressed
+    """
+    lines = []
+    regressions = []
+    for name in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[name], current[name]
+        # Above 1 is an improvement either way
+        speedup = new.value / old.value if new.higher_is_better else old.value / new.value
+        flag = ""
+        if speedup < 1 / (1 + threshold):
+            flag = "  REGRESSION"
+            regressions.append(name)
+        lines.append(
+            f"{name:<30}{old.value:>14.2f}{new.value:>14.2f} {new.unit:<8}"
+            f"{speedup:>7.2f}x{flag}"
+        )
+    return lines, regressions
+
+
+def save(results: dict[str, Result], path: str):
+    with open(path, "w") as file:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": {name: asdict(result) for name, result in results.items()},
+            },
+            file,
+            indent=2,
+        )
+
+
+def load(path: str) -> dict[str, Result]:
+    with open(path) as file:
+        data = json.load(file)
+    return {name: Result(**result) for name, result in data["results"].items()}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--out", help="save the results as a baseline JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="check against a baseline")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    results = run_all(args.seed, args.repeat)
+    if args.out:
+        save(results, args.out)
+    if not args.compare:
+        for name, result in results.items():
+            print(f"{name:<30}{result.value:>14.2f} {result.unit}")
+        return 0
+    lines, regressions = compare(load(args.compare), results, args.threshold)
+    print(f"{'benchmark':<30}{'baseline':>14}{'current':>14}")
+    print("\n".join(lines))
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,16 @@
-from copy import copy
 from enum import Enum
+from functools import cache
+from operator import itemgetter
+from random import Random
+from types import MappingProxyType
+from typing import Iterator, Mapping
 
 
 CompoundCoordinate = tuple[int, int] | tuple[int, int, int]
 FullCoordinate = tuple[int, int, int]
 Coordinate = tuple[int, int]
+# A whole turn: the space dug out, then the move made (if any)
+Turn = tuple[Coordinate, tuple[Coordinate, Coordinate] | None]
 
 
 class Space(Enum):
@@ -20,6 +26,24 @@ class Space(Enum):
     BLUE = 3
 
 
+# Raw cell values as stored in Board._cells. OFF_BOARD marks the padding
+# slots of the mailbox layout that are not part of the hex grid.
+WALL = Space.WALL.value
+EMPTY = Space.EMPTY.value
+RED = Space.RED.value
+BLUE = Space.BLUE.value
+OFF_BOARD = 255
+
+# Changes to a board: the index of each space that changed, and its new contents
+Delta = list[tuple[int, Space]]
+
+# Where each side's miners start. The small board only has room for the first three.
+RED_MINERS = ((1, -3), (2, 1), (-3, 2), (6, -4), (-4, -2), (-2, 6))
+BLUE_MINERS = ((-1, 3), (-2, -1), (3, -2), (-6, 4), (4, 2), (2, -6))
+
+_SPACES: tuple[Space, ...] = tuple(Space)
+
+
 def _hex_neighbors(coord: CompoundCoordinate) -> list[FullCoordinate]:
     if len(coord) == 2:
         q, r = coord
@@ -37,9 +61,427 @@ def _hex_neighbors(coord: CompoundCoordinate) -> list[FullCoordinate]:
     return [(q + a, r + b, s + c) for a, b, c in directions]
 
 
+class Geometry:
+    """
+    The static layout shared by every board of one size.
+
+    Cells live in a flat "mailbox" array: the axial coordinate (q, r) maps to
+    index (r + radius) * width + (q + radius), and each row carries one padding
+    slot so that no two real cells are adjacent by wrapping around a row.
+    Padding slots hold OFF_BOARD and never appear in the neighbor table.
+    """
+
+    def __init__(self, size: int):
+        radius = size - 1
+        self.size = size
+        self.radius = radius
+        self.width = 2 * radius + 2
+        self.length = (2 * radius + 1) * self.width
+        self.coords: list[Coordinate | None] = [None] * self.length
+        self.full_coords: list[FullCoordinate | None] = [None] * self.length
+        # Accepts both 2- and 3-component coordinates
+        self.index: dict[CompoundCoordinate, int] = {}
+        indices = []
+        for r in range(-radius, radius + 1):
+            for q in range(-radius, radius + 1):
+                s = -q - r
+                if abs(s) > radius:
+                    continue
+                i = (r + radius) * self.width + q + radius
+                indices.append(i)
+                self.coords[i] = (q, r)
+                self.full_coords[i] = (q, r, s)
+                self.index[q, r] = i
+                self.index[q, r, s] = i
+        self.indices: tuple[int, ...] = tuple(indices)
+        # Picks the real cells out of a cell array, in order, for Board.to_bytes
+        self.pack = itemgetter(*self.indices)
+        self.neighbors: list[tuple[int, ...]] = [()] * self.length
+        for i in self.indices:
+            self.neighbors[i] = tuple(
+                self.index[n] for n in _hex_neighbors(self.coords[i]) if n in self.index  # type: ignore
+            )
+        self.blank = bytearray([OFF_BOARD]) * self.length
+        for i in self.indices:
+            self.blank[i] = WALL
+        # One random 64-bit key per (index, value) pair, seeded by size so that
+        # hashes are stable across processes and runs
+        rng = Random(size)
+        self.zobrist_keys = [rng.getrandbits(64) for _ in range(self.length * 4)]
+        self.blank_zobrist = self.zobrist(self.blank)
+        # Bitboards use the same indexing: bit i is cell i
+        self.mask = sum(1 << i for i in self.indices)
+        self.neighbor_masks = [sum(1 << n for n in ns) for ns in self.neighbors]
+        self.blank_masks = self.masks(self.blank)
+        self.blank_frontier = self.mineable_walls(self.blank_masks[WALL])
+        # The starting position and everything derived from it, which every
+        # new Board copies instead of placing its miners one by one
+        self.start = bytearray(self.blank)
+        for miners, value in ((RED_MINERS, RED), (BLUE_MINERS, BLUE)):
+            for coord in miners:
+                if coord in self.index:
+                    self.start[self.index[coord]] = value
+        self.start_zobrist = self.zobrist(self.start)
+        self.start_masks = self.masks(self.start)
+        self.start_open_counts = self.open_counts(self.start)
+        self.start_frontier = self.mineable_walls(self.start_masks[WALL])
+
+    def zobrist(self, cells: bytearray) -> int:
+        """
+        Compute the Zobrist hash of a cell array from scratch
+
+        Args:
+            cells (bytearray): Raw cell values laid out according to this geometry
+
+        Returns:
+            int: The 64-bit Zobrist hash
+        """
+        keys = self.zobrist_keys
+        out = 0
+        for i in self.indices:
+            out ^= keys[4 * i + cells[i]]
+        return out
+
+    def masks(self, cells: bytearray) -> list[int]:
+        """
+        Build the bitboards of a cell array from scratch
+
+        Args:
+            cells (bytearray): Raw cell values laid out according to this geometry
+
+        Returns:
+            list[int]: One bitboard per Space, indexed by Space value
+        """
+        out = [0, 0, 0, 0]
+        for i in self.indices:
+            out[cells[i]] |= 1 << i
+        return out
+
+    def dilate(self, mask: int) -> int:
+        """
+        Grow a bitboard by one step: the cells in it plus all their neighbors
+
+        Args:
+            mask (int): A bitboard
+
+        Returns:
+            int: The bitboard together with every neighbor of its cells
+        """
+        w = self.width
+        return (
+            mask
+            | mask << 1
+            | mask >> 1
+            | mask << w
+            | mask >> w
+            | mask << (w - 1)
+            | mask >> (w - 1)
+        ) & self.mask
+
+    def fill(self, seeds: int, passable: int) -> int:
+        """
+        Flood fill outward from some seed cells through passable cells
+
+        Args:
+            seeds (int): Bitboard of starting cells, always part of the result
+            passable (int): Bitboard of cells the fill may spread through
+
+        Returns:
+            int: Bitboard of every cell reached, including the seeds
+        """
+        region = seeds
+        while True:
+            grown = region | (self.dilate(region) & passable)
+            if grown == region:
+                return region
+            region = grown
+
+    def neighbor_counts(self, mask: int) -> tuple[int, int, int]:
+        """
+        Count, for every cell at once, how many of its neighbors are in a bitboard
+
+        Args:
+            mask (int): A bitboard
+
+        Returns:
+            tuple[int, int, int]: The counts in bit-sliced binary: the 1s, 2s and
+                4s bit of each cell's count, each as a bitboard
+        """
+        w = self.width
+        ones = twos = fours = 0
+        for shifted in (
+            mask << 1,
+            mask >> 1,
+            mask << w,
+            mask >> w,
+            mask << (w - 1),
+            mask >> (w - 1),
+        ):
+            carry = ones & shifted
+            ones ^= shifted
+            fours |= twos & carry
+            twos ^= carry
+        return ones & self.mask, twos & self.mask, fours & self.mask
+
+    def open_counts(self, cells: bytearray) -> bytearray:
+        """
+        Count the mined (non-wall) neighbors of every cell of a cell array from scratch
+
+        Args:
+            cells (bytearray): Raw cell values laid out according to this geometry
+
+        Returns:
+            bytearray: The mined neighbor count of each cell, by index
+        """
+        out = bytearray(self.length)
+        for i in self.indices:
+            out[i] = sum(1 for n in self.neighbors[i] if cells[n] != WALL)
+        return out
+
+    def mineable_walls(self, walls: int) -> int:
+        """
+        Find every wall that passes the mined neighbor rule, regardless of who can reach it
+
+        Args:
+            walls (int): Bitboard of the walls on the board
+
+        Returns:
+            int: Bitboard of the walls with at most 3 mined neighbors, none of
+                which already has 3 or more mined neighbors
+        """
+        mined = self.mask & ~walls
+        ones, twos, fours = self.neighbor_counts(mined)
+        crowded = mined & (fours | (twos & ones))
+        return walls & ~fours & ~self.dilate(crowded)
+
+    def indices_of_mask(self, mask: int) -> list[int]:
+        """
+        Convert a bitboard to the indices of its cells
+
+        Args:
+            mask (int): A bitboard
+
+        Returns:
+            list[int]: The indices of the cells in the bitboard, in increasing order
+        """
+        out = []
+        while mask:
+            low = mask & -mask
+            out.append(low.bit_length() - 1)
+            mask ^= low
+        return out
+
+    def coords_of_mask(self, mask: int) -> set[Coordinate]:
+        """
+        Convert a bitboard to the coordinates of its cells
+
+        Args:
+            mask (int): A bitboard
+
+        Returns:
+            set[Coordinate]: The coordinates of the cells in the bitboard
+        """
+        coords = self.coords
+        out = set()
+        while mask:
+            low = mask & -mask
+            out.add(coords[low.bit_length() - 1])
+            mask ^= low
+        return out  # type: ignore
+
+
+@cache
+def geometry(size: int) -> Geometry:
+    """
+    Get the shared geometry for a board size. Computed once per size.
+
+    Args:
+        size (int): The board size (5 or 7)
+
+    Returns:
+        Geometry: The layout and neighbor table for that size
+    """
+    return Geometry(size)
+
+
+class Components:
+    """
+    Connected components of the empty spaces of one board position.
+
+    A single labeling pass floods each empty region that borders a miner once
+    and records which miners border it. Regions that no miner borders can't
+    matter for walking or mining, so they are only labeled if asked about.
+    """
+
+    def __init__(self, board: "Board"):
+        self.board = board
+        geometry = board.geometry
+        empty = board.masks[EMPTY]
+        miners = board.masks[RED] | board.masks[BLUE]
+        self.masks: list[int] = []
+        self.touching: list[int] = []
+        seeds = geometry.dilate(miners) & empty
+        while seeds:
+            component = geometry.fill(seeds & -seeds, empty)
+            seeds &= ~component
+            self.masks.append(component)
+            self.touching.append(geometry.dilate(component) & miners)
+        self._reach: dict[int, int] = {}
+        self._walkable: dict[int, int] = {}
+
+    def label(self, index: int) -> int:
+        """
+        Find which component an empty space belongs to
+
+        Args:
+            index (int): The index of an empty space
+
+        Raises:
+            ValueError: The index must contain an empty space
+
+        Returns:
+            int: The position of its component in self.masks and self.touching
+        """
+        if self.board._cells[index] != EMPTY:
+            raise ValueError("Only empty spaces belong to a component")
+        bit = 1 << index
+        for label, component in enumerate(self.masks):
+            if component & bit:
+                return label
+        geometry = self.board.geometry
+        component = geometry.fill(bit, self.board.masks[EMPTY])
+        self.masks.append(component)
+        self.touching.append(0)
+        return len(self.masks) - 1
+
+    def _join(self, start: int):
+        # Gather every miner connected to the one at start, and the components
+        # they can reach, by hopping between miners and the components they border
+        geometry = self.board.geometry
+        own = self.board.masks[self.board._cells[start]]
+        group = 1 << start
+        reach = 0
+        joined = [False] * len(self.masks)
+        grown = True
+        while grown:
+            grown = False
+            group |= geometry.fill(group, own)
+            for label, touching in enumerate(self.touching):
+                if not joined[label] and touching & group:
+                    joined[label] = grown = True
+                    reach |= self.masks[label]
+                    group |= touching & own
+        for miner in geometry.indices_of_mask(group):
+            self._reach[miner] = reach
+
+    def miner_region(self, index: int) -> tuple[int, int]:
+        """
+        Find the space a miner can see without passing another miner: itself plus
+        the components it borders, and the miners bordering that area
+
+        Args:
+            index (int): The index of a miner
+
+        Returns:
+            tuple[int, int]: Bitboards of the region and of the other miners around it
+        """
+        board = self.board
+        cells = board._cells
+        region = 1 << index
+        touching = board.geometry.neighbor_masks[index] & (board.masks[RED] | board.masks[BLUE])
+        for n in board.geometry.neighbors[index]:
+            if cells[n] == EMPTY:
+                label = self.label(n)
+                region |= self.masks[label]
+                touching |= self.touching[label]
+        return region, touching & ~(1 << index)
+
+    def is_dead(self, index: int) -> bool:
+        """
+        Component based version of Board.is_miner_dead
+
+        Args:
+            index (int): The index of a miner
+
+        Returns:
+            bool: True if the miner needs to be removed from the board, False otherwise
+        """
+        player = self.board._cells[index]
+        _, touching = self.miner_region(index)
+        if touching & self.board.masks[player]:
+            return False
+        return (touching & self.board.masks[RED + BLUE - player]).bit_count() >= 2
+
+    def reach(self, index: int) -> int:
+        """
+        Find the spaces a piece at the given index could walk to
+
+        Args:
+            index (int): The index of a miner or an empty space
+
+        Returns:
+            int: Bitboard of the empty spaces reachable from that index
+        """
+        value = self.board._cells[index]
+        if value == EMPTY:
+            return self.masks[self.label(index)]
+        if value != RED and value != BLUE:
+            return 0
+        if index not in self._reach:
+            self._join(index)
+        return self._reach[index]
+
+    def walkable(self, player: int) -> int:
+        """
+        Find the spaces any of a player's pieces could walk to. These are exactly
+        the components that one of the player's miners borders.
+
+        Args:
+            player (int): The raw value of the player (RED or BLUE)
+
+        Returns:
+            int: Bitboard of the empty spaces reachable by that player
+        """
+        if player not in self._walkable:
+            own = self.board.masks[player]
+            out = 0
+            for component, touching in zip(self.masks, self.touching):
+                if touching & own:
+                    out |= component
+            self._walkable[player] = out
+        return self._walkable[player]
+
+
 class Board:
     """
     Class to represent a specific board state.
+
+    Cells are stored as raw Space values in a flat bytearray indexed according
+    to the board's Geometry. The coordinate based API is a thin layer on top of
+    the index based one; engines that need speed can use the *_index methods
+    directly.
+
+    board.zobrist is a 64-bit Zobrist hash of the position that is updated on
+    every change, so engines can use it as a cache key without rehashing the
+    whole board. It is also what hash(board) returns.
+
+    board.masks holds one bitboard per Space (indexed by Space value, bit i is
+    cell i), also kept up to date on every change. The *_bitboard methods answer
+    reachability and mining questions with whole-board set algebra on these.
+
+    board.open_counts (the number of mined neighbors of each cell) and
+    board.frontier (bitboard of the walls that pass the mined neighbor rule) are
+    likewise updated locally whenever a space is dug out or filled back in.
+
+    board.components() labels the empty regions of the position and is cached
+    until the next change; all of the walkability queries are answered from it.
+
+    The board also remembers, per color, which spaces changed since that color's
+    miners were last checked by clear_dead, so clear_dead only has to look at
+    miners near those changes.
+
+    Search engines can walk a game tree on one board with push_mine, push_move
+    and pop instead of copying the board for every child.
     """
 
     def __init__(self, small: bool = False):
@@ -52,37 +494,166 @@ class Board:
         """
         self.size = 5 if small else 7
         self.miner_count = 3 if small else 6
-        self.cells: dict[FullCoordinate, Space] = {}
-        frontier = [(0, 0, 0)]
-        for _ in range(self.size - 1):
-            next_frontier = []
-            while frontier:
-                curr = frontier.pop()
-                for neighbor in (
-                    n for n in _hex_neighbors(curr) if n not in self.cells
-                ):
-                    self.cells[neighbor] = Space.WALL
-                    next_frontier.append(neighbor)
-            frontier = next_frontier
-        red_miners = [(1, -3), (2, 1), (-3, 2), (6, -4), (-4, -2), (-2, 6)]
-        blue_miners = [(-1, 3), (-2, -1), (3, -2), (-6, 4), (4, 2), (2, -6)]
-        for cell in red_miners:
-            if cell in self:
-                self[cell] = Space.RED
-        for cell in blue_miners:
-            if cell in self:
-                self[cell] = Space.BLUE
+        g = self.geometry = geometry(self.size)
+        self._cells = g.start[:]
+        self.zobrist = g.start_zobrist
+        self.masks = g.start_masks[:]
+        self.open_counts = g.start_open_counts[:]
+        self.frontier = g.start_frontier
+        self._components: Components | None = None
+        # Spaces changed since clear_dead last checked each color, by Space value
+        self._unchecked = [0, 0, g.mask, g.mask]
+        self._history: list[tuple[list[int], Components | None, list[tuple[int, int]]]] = []
 
     def __hash__(self) -> int:
-        return hash(frozenset(self.cells.items()))
+        return self.zobrist
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Board):
+            return NotImplemented
+        return (
+            self.zobrist == other.zobrist
+            and self.size == other.size
+            and self._cells == other._cells
+        )
 
     def __copy__(self) -> "Board":
         out = Board.__new__(Board)
         out.size = self.size
         out.miner_count = self.miner_count
-        out.cells = copy(self.cells)
+        out.geometry = self.geometry
+        out._cells = self._cells[:]
+        out.zobrist = self.zobrist
+        out.masks = self.masks[:]
+        out.open_counts = self.open_counts[:]
+        out.frontier = self.frontier
+        out._components = None
+        out._unchecked = self._unchecked[:]
+        out._history = []
+        return out
+
+    def __getstate__(self) -> tuple[int, int, bytes]:
+        return self.size, self.miner_count, bytes(self._cells)
+
+    def __setstate__(self, state: tuple[int, int, bytes]):
+        self.size, self.miner_count, cells = state
+        self.geometry = geometry(self.size)
+        self._reset(bytearray(cells))
+
+    def _reset(self, cells: bytearray):
+        # Replace the whole cell array and rebuild everything derived from it
+        self._cells = cells
+        self.zobrist = self.geometry.zobrist(cells)
+        self.masks = self.geometry.masks(cells)
+        self.open_counts = self.geometry.open_counts(cells)
+        self.frontier = self.geometry.mineable_walls(self.masks[WALL])
+        self._components = None
+        self._unchecked = [0, 0, self.geometry.mask, self.geometry.mask]
+        self._history = []
+
+    @property
+    def cells(self) -> Mapping[FullCoordinate, Space]:
+        """
+        The contents of every space, keyed by full coordinate.
+        This is a read-only snapshot: change single spaces with board[coord] = value,
+        or assign a whole dict to board.cells to replace the board's contents.
+        """
+        full_coords = self.geometry.full_coords
+        return MappingProxyType(
+            {full_coords[i]: _SPACES[self._cells[i]] for i in self.geometry.indices}  # type: ignore
+        )
+
+    @cells.setter
+    def cells(self, cells: Mapping[FullCoordinate, Space]):
+        new_cells = bytearray(self.geometry.blank)
+        for coord, value in cells.items():
+            new_cells[self.index_of(coord)] = value.value
+        self._reset(new_cells)
+
+    def components(self) -> Components:
+        """
+        Label the connected empty regions of the board. The result is cached
+        until the board next changes.
+
+        Returns:
+            Components: The labeled regions of this position
+        """
+        if self._components is None:
+            self._components = Components(self)
+        return self._components
+
+    def cell_bytes(self) -> bytes:
+        """
+        Get the raw cell values, one byte per slot of the mailbox layout
+
+        Returns:
+            bytes: A snapshot of the cells, for stacking many boards into one array
+        """
+        return bytes(self._cells)
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the board compactly: its size, then one byte per space, in the
+        order of Geometry.indices
+
+        Returns:
+            bytes: The encoding, which from_buffer and load_bytes read back
+        """
+        return bytes((self.size,)) + bytes(self.geometry.pack(self._cells))
+
+    @classmethod
+    def from_buffer(cls, buffer: bytes | bytearray | memoryview) -> "Board":
+        """
+        Build a board from an encoding made by to_bytes
+
+        Args:
+            buffer (bytes | bytearray | memoryview): The encoding, at the start of
+                the buffer. Anything after it is ignored, so a larger reused
+                buffer such as shared memory can be read in place.
+
+        Raises:
+            ValueError: The buffer doesn't hold a board
+
+        Returns:
+            Board: A new board with its own copy of the contents
+        """
+        size = buffer[0] if len(buffer) else 0
+        if size not in (5, 7):
+            raise ValueError("The buffer doesn't hold a board")
+        g = geometry(size)
+        count = len(g.indices)
+        if len(buffer) < count + 1 or max(buffer[1 : count + 1]) > BLUE:
+            raise ValueError(f"The buffer doesn't hold a size {size} board")
+        cells = bytearray(g.blank)
+        for n, i in enumerate(g.indices, 1):
+            cells[i] = buffer[n]
+        out = cls.__new__(cls)
+        out.__setstate__((size, 3 if size == 5 else 6, cells))
         return out
 
+    def load_bytes(self, buffer: bytes | bytearray | memoryview):
+        """
+        Change the board in place to match an encoding made by to_bytes,
+        touching only the spaces that differ
+
+        Args:
+            buffer (bytes | bytearray | memoryview): The encoding, as for
+                from_buffer, of a board of the same size
+
+        Raises:
+            ValueError: The buffer doesn't hold a board of this size
+        """
+        indices = self.geometry.indices
+        if len(buffer) < len(indices) + 1 or buffer[0] != self.size:
+            raise ValueError(f"The buffer doesn't hold a size {self.size} board")
+        cells = self._cells
+        for n, i in enumerate(indices, 1):
+            value = buffer[n]
+            if cells[i] != value:
+                if value > BLUE:
+                    raise ValueError(f"Invalid space value {value} in the buffer")
+                self._set(i, value)
+
     def count_elements(self, element: Space) -> int:
         """
         Count how many of a given space exist on the board
@@ -93,7 +664,7 @@ class Board:
         Returns:
             int: The number of instances of that space on the board
         """
-        return len([c for c in self.cells.values() if c == element])
+        return self._cells.count(element.value)
 
     def _full_coordinate(self, coord: CompoundCoordinate) -> FullCoordinate:
         if len(coord) == 2:
@@ -103,6 +674,248 @@ class Board:
             q, r, s = coord
         return (q, r, s)
 
+    def index_of(self, coord: CompoundCoordinate) -> int:
+        """
+        Find the flat index of a coordinate
+
+        Args:
+            coord (CompoundCoordinate): The coordinate to look up
+
+        Raises:
+            ValueError: The given coord is not a valid coordinate on this board
+
+        Returns:
+            int: The index of that coordinate in the board's Geometry
+        """
+        try:
+            return self.geometry.index[coord]
+        except (KeyError, TypeError):
+            full = self._full_coordinate(coord)
+            if full not in self.geometry.index:
+                raise ValueError(f"{full} is not a valid coordinate.") from None
+            return self.geometry.index[full]
+
+    def coord_of(self, index: int) -> Coordinate:
+        """
+        Find the coordinate of a flat index
+
+        Args:
+            index (int): An index of a cell on this board
+
+        Returns:
+            Coordinate: The (q, r) coordinate of that cell
+        """
+        return self.geometry.coords[index]  # type: ignore
+
+    def space_at(self, index: int) -> Space:
+        """
+        Check what the contents of the space at a flat index is
+
+        Args:
+            index (int): An index of a cell on this board
+
+        Returns:
+            Space: The value contained at that index
+        """
+        return _SPACES[self._cells[index]]
+
+    def push_mine(self, coord: CompoundCoordinate, color: Space):
+        """
+        Dig out a space the way Game.step does: it gets a new miner of the given
+        color unless that player already has a full team. Legality is not checked.
+        Undo with pop.
+
+        Args:
+            coord (CompoundCoordinate): The space to dig out
+            color (Space): The player digging
+        """
+        index = self.index_of(coord)
+        cells = self._cells
+        value = EMPTY if cells.count(color.value) == self.miner_count else color.value
+        self._history.append(
+            (self._unchecked[:], self._components, [(index, cells[index])])
+        )
+        self._set(index, value)
+
+    def push_move(
+        self, move: tuple[CompoundCoordinate, CompoundCoordinate] | None, color: Space
+    ):
+        """
+        Finish a turn the way Game.step does: optionally move a miner, then remove
+        the other player's dead miners. Legality is not checked. Undo with pop.
+
+        Args:
+            move (tuple[CompoundCoordinate, CompoundCoordinate] | None): The start and
+                end of the move, or None to not move
+            color (Space): The player moving
+        """
+        cells = self._cells
+        changes = []
+        self._history.append((self._unchecked[:], self._components, changes))
+        if move is not None:
+            start, end = self.index_of(move[0]), self.index_of(move[1])
+            changes.append((start, cells[start]))
+            changes.append((end, cells[end]))
+            self._set(start, EMPTY)
+            self._set(end, color.value)
+        other = RED + BLUE - color.value
+        for dead in self._clear_dead(other):
+            changes.append((dead, other))
+
+    def pop(self):
+        """
+        Undo the most recent push_mine, push_move or push_turn, restoring the board
+        and all of its cached state
+
+        Raises:
+            IndexError: There is nothing to undo
+        """
+        unchecked, components, changes = self._history.pop()
+        for index, value in reversed(changes):
+            self._set(index, value)
+        self._unchecked = unchecked
+        self._components = components
+
+    def push_turn(self, turn: Turn, color: Space):
+        """
+        Play a whole turn (push_mine, then push_move) as a single step that one
+        pop undoes. Legality is not checked.
+
+        Args:
+            turn (Turn): The space to dig out and the move to make afterwards
+            color (Space): The player taking the turn
+        """
+        dig, move = turn
+        self.push_mine(dig, color)
+        self.push_move(move, color)
+        _, _, move_changes = self._history.pop()
+        self._history[-1][2].extend(move_changes)
+
+    def iter_turns(self, color: Space) -> Iterator[Turn]:
+        """
+        Go through every legal turn for a player, the way Game.step would play it:
+        a dig the player can reach (placing a new miner if the team isn't full),
+        then either no move or a move of any of its miners, then the removal of
+        dead enemies. Turns that lead to the same position as an earlier one are
+        skipped, and a player that can't dig gets no turns at all.
+
+        While the loop body runs the board holds the position after the yielded
+        turn; it is put back before the next one. Finish or close the iterator
+        before using the board for anything else.
+
+        Args:
+            color (Space): The player taking the turn
+
+        Yields:
+            Turn: Each distinct turn, with the board in the resulting position
+        """
+        coords = self.geometry.coords
+        seen = set()
+        for dig in self.mineable_indices(color):
+            self.push_mine(coords[dig], color)  # type: ignore
+            try:
+                moves: list[tuple[Coordinate, Coordinate] | None] = [None]
+                for piece in self.find_all_indices(color):
+                    moves.extend(
+                        (coords[piece], coords[end])  # type: ignore
+                        for end in self.walkable_from_index(piece)
+                    )
+                for move in moves:
+                    self.push_move(move, color)
+                    try:
+                        if self.zobrist not in seen:
+                            seen.add(self.zobrist)
+                            yield coords[dig], move  # type: ignore
+                    finally:
+                        self.pop()
+            finally:
+                self.pop()
+
+    def legal_turns(self, color: Space) -> list[Turn]:
+        """
+        List every distinct legal turn for a player. See iter_turns.
+
+        Args:
+            color (Space): The player taking the turn
+
+        Returns:
+            list[Turn]: The turns, one per resulting position
+        """
+        return list(self.iter_turns(color))
+
+    def delta(self, other: "Board") -> Delta:
+        """
+        Find the changes that would turn another board of the same size into this
+        one. Applying them with set_index is much cheaper than sending a whole board.
+
+        Args:
+            other (Board): A board of the same size
+
+        Returns:
+            Delta: The index and new contents of every differing space
+        """
+        return [
+            (i, _SPACES[mine])
+            for i, (mine, theirs) in enumerate(zip(self._cells, other._cells))
+            if mine != theirs
+        ]
+
+    def set_index(self, index: int, value: Space):
+        """
+        Replace the contents of the space at a flat index
+
+        Args:
+            index (int): An index of a cell on this board
+            value (Space): The Space value to place at that index
+        """
+        self._set(index, value.value)
+
+    def _set(self, index: int, value: int):
+        # Every change to the board goes through here
+        cells = self._cells
+        keys = self.geometry.zobrist_keys
+        old = cells[index]
+        self.zobrist ^= keys[4 * index + old] ^ keys[4 * index + value]
+        bit = 1 << index
+        masks = self.masks
+        masks[old] ^= bit
+        masks[value] |= bit
+        cells[index] = value
+        self._components = None
+        unchecked = self._unchecked
+        unchecked[RED] |= bit
+        unchecked[BLUE] |= bit
+        if (old == WALL) != (value == WALL):
+            self._update_frontier(index, value != WALL)
+
+    def _update_frontier(self, index: int, opened: bool):
+        # Only the changed space, its neighbors, and the neighbors of any
+        # mined space that crossed the 3 mined neighbor mark can change status
+        cells = self._cells
+        counts = self.open_counts
+        neighbors = self.geometry.neighbors
+        delta = 1 if opened else -1
+        crossed = 3 if opened else 2
+        dirty = [index]
+        for n in neighbors[index]:
+            counts[n] += delta
+            dirty.append(n)
+            if counts[n] == crossed and cells[n] != WALL:
+                dirty.extend(neighbors[n])
+        frontier = self.frontier
+        for wall in dirty:
+            bit = 1 << wall
+            if cells[wall] == WALL and counts[wall] <= 3:
+                for n in neighbors[wall]:
+                    if counts[n] >= 3 and cells[n] != WALL:
+                        frontier &= ~bit
+                        break
+                else:
+                    frontier |= bit
+            else:
+                frontier &= ~bit
+        self.frontier = frontier
+
     def __setitem__(self, coord: CompoundCoordinate, value: Space):
         """
         Replace a space on the board with different contents.
@@ -115,10 +928,7 @@ class Board:
         Raises:
             ValueError: The given coord is not a valid coordinate on this board
         """
-        coord = self._full_coordinate(coord)
-        if coord not in self.cells:
-            raise ValueError(f"{coord} is not a valid coordinate.")
-        self.cells[coord] = value
+        self._set(self.index_of(coord), value.value)
 
     def __getitem__(self, coord: CompoundCoordinate) -> Space:
         """
@@ -134,10 +944,10 @@ class Board:
         Returns:
             Space: The value contained at that coordinate
         """
-        coord = self._full_coordinate(coord)
-        if coord not in self.cells:
-            raise ValueError(f"{coord} is not a valid coordinate.")
-        return self.cells[coord]
+        try:
+            return _SPACES[self._cells[self.geometry.index[coord]]]
+        except (KeyError, TypeError):
+            return _SPACES[self._cells[self.index_of(coord)]]
 
     def __contains__(self, coord: CompoundCoordinate) -> bool:
         """
@@ -150,8 +960,23 @@ class Board:
         Returns:
             bool: True if the coordinate exists on the board, False otherwise
         """
-        coord = self._full_coordinate(coord)
-        return coord in self.cells
+        try:
+            self.index_of(coord)
+        except ValueError:
+            return False
+        return True
+
+    def find_all_indices(self, space: Space) -> list[int]:
+        """
+        Find the flat indices of all instances of a given space
+
+        Args:
+            space (Space): The space for which to search
+
+        Returns:
+            list[int]: The indices at which the given space appears
+        """
+        return self.geometry.indices_of_mask(self.masks[space.value])
 
     def find_all(self, space: Space) -> set[Coordinate]:
         """
@@ -163,7 +988,27 @@ class Board:
         Returns:
             set[Coordinate]: The coordinates at which the given space appears
         """
-        return {coord[:2] for coord in self.cells if self[coord] == space}
+        coords = self.geometry.coords
+        return {coords[i] for i in self.find_all_indices(space)}  # type: ignore
+
+    def neighbor_indices(self, index: int, space: Space | None = None) -> list[int]:
+        """
+        Find the flat indices of all valid neighbors of a given index. If a space type
+        is given, only lists neighbors of a particular type.
+
+        Args:
+            index (int): The index whose neighbors you'd like to find
+            space (Space | None, optional): The type of space you'd like to filter to.
+                gives all neighbors if this is None. Defaults to None.
+
+        Returns:
+            list[int]: The indices of the neighbors
+        """
+        if space is None:
+            return list(self.geometry.neighbors[index])
+        cells = self._cells
+        value = space.value
+        return [n for n in self.geometry.neighbors[index] if cells[n] == value]
 
     def neighbors(
         self, coord: CompoundCoordinate, space: Space | None = None
@@ -180,11 +1025,32 @@ class Board:
         Returns:
             set[Coordinate]: The coordinates of the neighbors
         """
-        if space is None:
-            return {n[:2] for n in _hex_neighbors(coord) if n in self.cells}
-        return {
-            n[:2] for n in _hex_neighbors(coord) if n in self.cells and self[n] == space
-        }
+        coords = self.geometry.coords
+        try:
+            index = self.index_of(coord)
+        except ValueError:
+            # Off-board coordinates can still border the board
+            found = [
+                self.geometry.index[n]
+                for n in _hex_neighbors(coord)
+                if n in self.geometry.index
+            ]
+            if space is not None:
+                found = [n for n in found if self._cells[n] == space.value]
+            return {coords[n] for n in found}  # type: ignore
+        return {coords[n] for n in self.neighbor_indices(index, space)}  # type: ignore
+
+    def walkable_from_index(self, start: int) -> list[int]:
+        """
+        Index based version of walkable_from_coord
+
+        Args:
+            start (int): The index of the starting location of the piece
+
+        Returns:
+            list[int]: The indices of the spaces that piece could walk to
+        """
+        return self.geometry.indices_of_mask(self.components().reach(start))
 
     def walkable_from_coord(self, start: CompoundCoordinate) -> set[Coordinate]:
         """
@@ -198,22 +1064,23 @@ class Board:
         Returns:
             set[Coordinate]: The spaces that a piece on the starting location could walk to.
         """
-        if self[start] == Space.WALL:
-            return set()
-        traversable = {self[start], Space.EMPTY}
-        out: set[Coordinate] = set()
-        frontier = set([start])
-        visited: set[Coordinate] = set()
-        while frontier:
-            curr = frontier.pop()
-            curr = curr[:2]
-            visited.add(curr)
-            if self[curr] not in traversable:
-                continue
-            if self[curr] == Space.EMPTY:
-                out.add(curr)
-            frontier |= self.neighbors(curr) - visited
-        return out
+        coords = self.geometry.coords
+        return {coords[i] for i in self.walkable_from_index(self.index_of(start))}  # type: ignore
+
+    def walkable_indices(self, player: Space) -> list[int]:
+        """
+        Index based version of walkable_by_player
+
+        Args:
+            player (Space): The starting player
+
+        Raises:
+            ValueError: The input must be either Space.RED or Space.BLUE
+
+        Returns:
+            list[int]: The indices walkable by that player
+        """
+        return self.geometry.indices_of_mask(self.walkable_bitboard(player))
 
     def walkable_by_player(self, player: Space) -> set[Coordinate]:
         """
@@ -229,13 +1096,19 @@ class Board:
         Returns:
             set[Coordinate]: The coordinates walkable by that player
         """
-        if player not in {Space.BLUE, Space.RED}:
-            raise ValueError("The only valid players are Space.RED and Space.BLUE")
-        player_coords = self.find_all(player)
-        out = set()
-        for p in player_coords:
-            out |= self.walkable_from_coord(p)
-        return out
+        return self.geometry.coords_of_mask(self.walkable_bitboard(player))
+
+    def is_mineable_index(self, index: int) -> bool:
+        """
+        Index based version of is_mineable
+
+        Args:
+            index (int): The index of the space in question
+
+        Returns:
+            bool: True if the space can be mined, False otherwise
+        """
+        return bool(self.frontier >> index & 1)
 
     def is_mineable(self, coord: CompoundCoordinate) -> bool:
         """
@@ -245,28 +1118,24 @@ class Board:
             coord (CompoundCoordinate): The coordinates of the space in question
 
         Returns:
-            bool: _description_
+            bool: True if the space can be mined, False otherwise
         """
-        if self[coord] != Space.WALL:
-            return False
-        empty_neighbors = (
-            self.neighbors(coord, Space.EMPTY)
-            | self.neighbors(coord, Space.RED)
-            | self.neighbors(coord, Space.BLUE)
-        )
-        if len(empty_neighbors) > 3:
-            return False
-        for n in empty_neighbors:
-            if (
-                len(
-                    self.neighbors(n, Space.EMPTY)
-                    | self.neighbors(n, Space.RED)
-                    | self.neighbors(n, Space.BLUE)
-                )
-                >= 3
-            ):
-                return False
-        return True
+        return self.is_mineable_index(self.index_of(coord))
+
+    def mineable_indices(self, player: Space) -> list[int]:
+        """
+        Index based version of mineable_by_player
+
+        Args:
+            player (Space): The player in question
+
+        Raises:
+            ValueError: player must be either Space.RED or Space.BLUE
+
+        Returns:
+            list[int]: All indices that a given player can mine
+        """
+        return self.geometry.indices_of_mask(self.mineable_bitboard(player))
 
     def mineable_by_player(self, player: Space) -> set[Coordinate]:
         """
@@ -281,15 +1150,45 @@ class Board:
         Returns:
             set[Coordinate]: All coordinates that a given player can mine
         """
-        if player not in {Space.BLUE, Space.RED}:
+        return self.geometry.coords_of_mask(self.mineable_bitboard(player))
+
+    def is_miner_dead_index(self, index: int) -> bool:
+        """
+        Index based version of is_miner_dead
+
+        Args:
+            index (int): The index of the miner in question
+
+        Raises:
+            ValueError: The index must contain a miner
+
+        Returns:
+            bool: True if the miner needs to be removed from the board, False otherwise
+        """
+        cells = self._cells
+        player = cells[index]
+        if player != RED and player != BLUE:
             raise ValueError("The only valid players are Space.RED and Space.BLUE")
-        neighboring_walls = set()
-        player_coords = self.find_all(player)
-        for hall in self.walkable_by_player(player) | player_coords:
-            neighboring_walls |= {
-                w for w in self.neighbors(hall, Space.WALL) if self.is_mineable(w)
-            }
-        return neighboring_walls
+        other_player = RED if player == BLUE else BLUE
+        neighbors = self.geometry.neighbors
+        enemy_count = 0
+        seen = bytearray(len(cells))
+        seen[index] = 1
+        stack = [index]
+        while stack:
+            curr = stack.pop()
+            for n in neighbors[curr]:
+                if seen[n]:
+                    continue
+                seen[n] = 1
+                value = cells[n]
+                if value == player:
+                    return False
+                elif value == other_player:
+                    enemy_count += 1
+                elif value == EMPTY:
+                    stack.append(n)
+        return enemy_count >= 2
 
     def is_miner_dead(self, coord: CompoundCoordinate) -> bool:
         """
@@ -304,31 +1203,103 @@ class Board:
         Returns:
             bool: True if the miner needs to be removed from the board, False otherwise
         """
-        player = self[coord]
-        if player not in {Space.BLUE, Space.RED}:
+        return self.is_miner_dead_index(self.index_of(coord))
+
+    def clear_dead(self, other_color: Space) -> set[Coordinate]:
+        """
+        Remove every miner of a given color that is dead (see is_miner_dead).
+        Only miners whose surroundings changed since that color was last checked
+        are looked at, and they are all answered from one component labeling.
+
+        Args:
+            other_color (Space): The color whose dead miners should be removed
+
+        Raises:
+            ValueError: other_color must be either Space.RED or Space.BLUE
+
+        Returns:
+            set[Coordinate]: The coordinates of the removed miners
+        """
+        if other_color not in {Space.BLUE, Space.RED}:
             raise ValueError("The only valid players are Space.RED and Space.BLUE")
-        other_player = Space.RED if player == Space.BLUE else Space.BLUE
-        enemy_count = 0
-        frontier = set([coord])
-        visited: set[Coordinate] = set()
-        while frontier:
-            curr = frontier.pop()
-            curr = curr[:2]
-            visited.add(curr)
-            if self[curr] == player and curr != coord[:2]:
-                return False
-            elif self[curr] == other_player:
-                enemy_count += 1
-            elif curr == coord[:2] or self[curr] == Space.EMPTY:
-                frontier |= self.neighbors(curr) - visited
-        return enemy_count >= 2
+        return {self.coord_of(i) for i in self._clear_dead(other_color.value)}
 
-    def clear_dead(self, other_color: Space):
-        dead_enemies = {
-            coord
-            for coord in self.cells
-            if self[coord] == other_color and self.is_miner_dead(coord)
-        }
+    def _clear_dead(self, other: int) -> list[int]:
+        changed = self._unchecked[other]
+        if not changed:
+            return []
+        self._unchecked[other] = 0
+        geometry = self.geometry
+        components = self.components()
+        dead_enemies = []
+        for miner in geometry.indices_of_mask(self.masks[other]):
+            region, touching = components.miner_region(miner)
+            # A miner's fate only depends on its region and what borders it
+            if not geometry.dilate(region) & changed:
+                continue
+            if touching & self.masks[other]:
+                continue
+            if (touching & self.masks[RED + BLUE - other]).bit_count() >= 2:
+                dead_enemies.append(miner)
         for enemy in dead_enemies:
-            self[enemy] = Space.EMPTY
-            
+            self._set(enemy, EMPTY)
+        return dead_enemies
+
+    def walkable_bitboard(self, player: Space) -> int:
+        """
+        Bitboard version of walkable_by_player
+
+        Args:
+            player (Space): The starting player
+
+        Raises:
+            ValueError: The input must be either Space.RED or Space.BLUE
+
+        Returns:
+            int: Bitboard of the spaces walkable by that player
+        """
+        if player not in {Space.BLUE, Space.RED}:
+            raise ValueError("The only valid players are Space.RED and Space.BLUE")
+        return self.components().walkable(player.value)
+
+    def mineable_bitboard(self, player: Space) -> int:
+        """
+        Bitboard version of mineable_by_player
+
+        Args:
+            player (Space): The player in question
+
+        Raises:
+            ValueError: player must be either Space.RED or Space.BLUE
+
+        Returns:
+            int: Bitboard of all spaces that a given player can mine
+        """
+        if player not in {Space.BLUE, Space.RED}:
+            raise ValueError("The only valid players are Space.RED and Space.BLUE")
+        halls = self.components().walkable(player.value) | self.masks[player.value]
+        return self.frontier & self.geometry.dilate(halls)
+
+    def is_miner_dead_bitboard(self, index: int) -> bool:
+        """
+        Bitboard version of is_miner_dead
+
+        Args:
+            index (int): The index of the miner in question
+
+        Raises:
+            ValueError: The index must contain a miner
+
+        Returns:
+            bool: True if the miner needs to be removed from the board, False otherwise
+        """
+        player = self._cells[index]
+        if player != RED and player != BLUE:
+            raise ValueError("The only valid players are Space.RED and Space.BLUE")
+        geometry = self.geometry
+        masks = self.masks
+        region = geometry.fill(1 << index, masks[EMPTY])
+        border = geometry.dilate(region) & ~region
+        if border & masks[player]:
+            return False
+        return (border & masks[RED + BLUE - player]).bit_count() >= 2
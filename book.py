@@ -0,0 +1,227 @@
+"""
+An opening book for the small board: the best turn for early positions,
+searched deeply ahead of time.
+
+    python book.py --plies 3 --depth 3 --out opening_small.book
+
+The book is a hash table in a file, read through mmap, so opening it costs
+nothing up front and a lookup touches a single slot or a few.
+
+File layout, all little-endian:
+
+    header: b"MTKB", version (u32), board size (u32), slot count (u32)
+    slots:  key (u64), dig, move start, move end (u8 each, 255 for no move),
+            padding, score (i32)
+
+A slot with key 0 is empty. Keys are TranspositionTable.canonical_key of
+the position and the player to move, so one entry covers every rotation and
+reflection of a position, and the turn is stored in that canonical
+orientation. The slot is the key modulo the slot count, probing forward on
+collisions. Spaces are numbered by their position in Geometry.indices.
+"""
+
+import argparse
+from copy import copy
+import mmap
+import os
+import struct
+import time
+
+from board import Board, Space, Turn, geometry
+from search import Searcher, TranspositionTable, opponent
+from symmetry import symmetries
+
+MAGIC = b"MTKB"
+VERSION = 2
+_HEADER = struct.Struct("<4sIII")
+_SLOT = struct.Struct("<QBBBxi")
+_NO_MOVE = 255
+# The book shipped with the bots
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_small.book")
+
+
+class OpeningBook:
+    """
+    A read-only opening book, memory-mapped from a file built by build()
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The book file
+
+        Raises:
+            ValueError: The file isn't an opening book
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size, self.slots = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} opening book")
+        indices = geometry(self.size).indices
+        self._coords = [geometry(self.size).coords[i] for i in indices]
+
+    def __getstate__(self) -> str:
+        # Maps can't be pickled, so a copy in another process maps the file again
+        return self.path
+
+    def __setstate__(self, path: str):
+        self.__init__(path)  # type: ignore
+
+    def __len__(self) -> int:
+        return sum(
+            _SLOT.unpack_from(self._map, _HEADER.size + n * _SLOT.size)[0] != 0
+            for n in range(self.slots)
+        )
+
+    def lookup(self, board: Board, color: Space) -> tuple[Turn, int] | None:
+        """
+        Find the book turn for a position
+
+        Args:
+            board (Board): The position
+            color (Space): The player to move
+
+        Returns:
+            tuple[Turn, int] | None: The turn and its search score, or None if
+                the position isn't in the book
+        """
+        if board.size != self.size:
+            return None
+        key, symmetry = TranspositionTable.canonical_key(board, color)
+        slot = key % self.slots
+        for _ in range(self.slots):
+            found, dig, start, end, score = _SLOT.unpack_from(
+                self._map, _HEADER.size + slot * _SLOT.size
+            )
+            if found == 0:
+                return None
+            if found == key:
+                coords = self._coords
+                move = None if start == _NO_MOVE else (coords[start], coords[end])
+                turn = symmetries(self.size).from_canonical((coords[dig], move), symmetry)
+                return turn, score
+            slot = (slot + 1) % self.slots
+        return None
+
+    def close(self):
+        self._map.close()
+
+
+def write(path: str, size: int, entries: dict[int, tuple[Turn, int]]):
+    """
+    Write an opening book file
+
+    Args:
+        path (str): Where to write it
+        size (int): The board size the entries are for
+        entries (dict[int, tuple[Turn, int]]): Turn and score by position key,
+            each turn in the position's canonical orientation
+    """
+    g = geometry(size)
+    numbers = {i: n for n, i in enumerate(g.indices)}
+    # At most half full, so probes stay short
+    slots = 1
+    while slots < 2 * len(entries):
+        slots *= 2
+    table: list[tuple[int, Turn, int] | None] = [None] * slots
+    for key, (turn, score) in entries.items():
+        slot = key % slots
+        while table[slot] is not None:
+            slot = (slot + 1) % slots
+        table[slot] = (key, turn, score)
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, size, slots))
+    for entry in table:
+        if entry is None:
+            out += _SLOT.pack(0, 0, 0, 0, 0)
+            continue
+        key, (dig, move), score = entry
+        start = end = _NO_MOVE
+        if move is not None:
+            start, end = numbers[g.index[move[0]]], numbers[g.index[move[1]]]
+        out += _SLOT.pack(key, numbers[g.index[dig]], start, end, int(score))
+    with open(path, "wb") as file:
+        file.write(out)
+
+
+def build(plies: int = 3, depth: int = 3, verbose: bool = False) -> dict[int, tuple[Turn, int]]:
+    """
+    Search the early positions of the small board for both players
+
+    Each player's book covers every position it can reach in its first plies
+    turns of the game: after its own book turns and any turn of the opponent.
+
+    Args:
+        plies (int, optional): How many turns into the game, counting both
+            players, to cover. Defaults to 3.
+        depth (int, optional): How many turns deep to search each position.
+            Defaults to 3.
+        verbose (bool, optional): Print progress. Defaults to False.
+
+    Returns:
+        dict[int, tuple[Turn, int]]: The best turn and its score, by canonical
+            position key, each turn in the position's canonical orientation
+    """
+    # Imported here so the bots can import this module without a cycle
+    from smart_bot import Smart_Bot
+
+    bot = Smart_Bot()
+    # The first turns are searched from the symmetric starting position, so
+    # the table can share a lot
+    searcher = Searcher(bot.heuristic, bot.possible_turns, bot.apply_turn, symmetric=True)
+    turned = symmetries(5)
+    entries: dict[int, tuple[Turn, int]] = {}
+    for player in (Space.RED, Space.BLUE):
+        frontier = [Board(small=True)]
+        color = Space.RED
+        for ply in range(plies):
+            next_frontier = []
+            seen = set()
+            for board in frontier:
+                if color == player:
+                    key, symmetry = TranspositionTable.canonical_key(board, color)
+                    if key not in entries:
+                        started = time.monotonic()
+                        result = searcher.search(board, color, float("inf"), depth)
+                        if result.move is None:
+                            continue
+                        entries[key] = (
+                            turned.to_canonical(result.move, symmetry),
+                            int(result.score),
+                        )
+                        if verbose:
+                            print(
+                                f"{player.name} ply {ply}: {result.move} "
+                                f"score {result.score} in {time.monotonic() - started:.1f}s"
+                            )
+                    turns = [turned.from_canonical(entries[key][0], symmetry)]
+                else:
+                    turns = board.legal_turns(color)
+                for turn in turns:
+                    after = copy(board)
+                    after.push_turn(turn, color)
+                    # One of each set of rotated or reflected positions will do
+                    after_key = turned.canonical(after)[0]
+                    if after_key not in seen:
+                        seen.add(after_key)
+                        next_frontier.append(after)
+            frontier = next_frontier
+            color = opponent(color)
+    return entries
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--plies", type=int, default=3)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--out", default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+    started = time.monotonic()
+    entries = build(args.plies, args.depth, verbose=True)
+    write(args.out, 5, entries)
+    print(f"{len(entries)} positions in {time.monotonic() - started:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,90 +1,246 @@
-import numpy as np
-
-import sys
+"""
+Watch games in a pygame window, side by side.
+
+Each game is played on its own background thread (the bots think in their own
+worker processes, so the thread mostly waits) and sends a snapshot of its
+board to the window through a queue after every turn. The window never waits
+on a bot: it handles events, takes whatever snapshots arrived, redraws only
+the cells that changed from tiles drawn once up front, and sleeps until the
+next frame.
+"""
+
+import argparse
+from dataclasses import dataclass
+import math
+import queue
+import threading
 
 import pygame
 
-from board import Space
+from board import BLUE, EMPTY, RED, WALL, Space, geometry
 from game import Game
 from random_bot import RandomPlayer
 from dumb_bot import Dumb_Bot
 from smart_bot import Smart_Bot
 
-
-def update():
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-
-
-def hexagon(
-    screen: pygame.Surface, x: float, y: float, size: float, color: tuple[int, int, int]
-):
+BACKGROUNDS = {None: (0, 0, 0), Space.RED: (100, 0, 0), Space.BLUE: (0, 0, 100)}
+
+
+@dataclass
+class Snapshot:
+    """
+    A game's board after a turn
+
+    Attributes:
+        game: Which game it is, by its position in the window
+        cells: Board.cell_bytes() of the board
+        winner: The winner, if the game is over
+    """
+
+    game: int
+    cells: bytes
+    winner: Space | None
+
+
+class GameRunner(threading.Thread):
+    """
+    Plays a game to the end on a background thread, sending a Snapshot after
+    every turn
+    """
+
+    def __init__(self, number: int, game: Game, snapshots: queue.Queue):
+        """
+        Args:
+            number (int): The game's position in the window
+            game (Game): The game, not started yet
+            snapshots (queue.Queue): Where to send the snapshots
+        """
+        super().__init__(name=f"game-{number}", daemon=True)
+        self.number = number
+        self.game = game
+        self.snapshots = snapshots
+        self._stopping = threading.Event()
+
+    def run(self):
+        try:
+            self._send()
+            while self.game.winner is None and not self._stopping.is_set():
+                self.game.step()
+                self._send()
+        finally:
+            self.game.close()
+
+    def _send(self):
+        self.snapshots.put(Snapshot(self.number, self.game.board.cell_bytes(), self.game.winner))
+
+    def stop(self):
+        """
+        Stop after the turn being played, if any
+        """
+        self._stopping.set()
+
+
+def tile(cell_size: float, contents: int) -> pygame.Surface:
+    """
+    Draw one space of the board on a transparent square
+
+    Args:
+        cell_size (float): The distance from a hexagon's center to its corners
+        contents (int): The raw Space value in it
+
+    Returns:
+        pygame.Surface: The tile, with the hexagon in the middle
+    """
+    side = 2 * math.ceil(cell_size)
+    surface = pygame.Surface((side, side), pygame.SRCALPHA)
+    middle = side / 2
     corners = [
         (
-            x + 0.9 * size * np.cos(theta),
-            y + 0.9 * size * np.sin(theta),
+            middle + 0.9 * cell_size * math.cos(math.pi / 3 * n + math.pi / 6),
+            middle + 0.9 * cell_size * math.sin(math.pi / 3 * n + math.pi / 6),
         )
-        for theta in np.linspace(0, 2 * np.pi, 6, endpoint=False) + np.pi / 6
+        for n in range(6)
     ]
-    pygame.draw.polygon(screen, color, corners)
-
-
-def draw(screen: pygame.Surface, game: Game):
-    if game.winner == None:
-        screen.fill((0, 0, 0))
-    elif game.winner == Space.RED:
-        screen.fill((100, 0, 0))
-    elif game.winner == Space.BLUE:
-        screen.fill((0, 0, 100))
-    cell_size = screen.get_width() / (3.5 * game.board.size)
-    for coord in game.board.cells:
-        q, r = coord[:2]
-        x = screen.get_width() / 2 + cell_size * (np.sqrt(3) * q + np.sqrt(3) / 2 * r)
-        y = screen.get_height() / 2 + cell_size * 1.5 * r
-        contents = game.board.cells[coord]
-        if contents == Space.WALL:
-            color = (100, 100, 100)
+    pygame.draw.polygon(
+        surface, (100, 100, 100) if contents == WALL else (255, 255, 255), corners
+    )
+    if contents == RED:
+        pygame.draw.circle(surface, (255, 0, 0), (middle, middle), 0.6 * cell_size)
+    elif contents == BLUE:
+        pygame.draw.circle(surface, (0, 0, 255), (middle, middle), 0.6 * cell_size)
+    return surface
+
+
+class BoardView:
+    """
+    One game's board, drawn into its own part of the window
+    """
+
+    def __init__(self, area: pygame.Rect, size: int):
+        """
+        Args:
+            area (pygame.Rect): The part of the window to draw in
+            size (int): The board size, 5 or 7
+        """
+        self.area = area
+        self.geometry = geometry(size)
+        cell_size = min(area.width, area.height) / (3.5 * size)
+        self.tiles = {value: tile(cell_size, value) for value in (WALL, EMPTY, RED, BLUE)}
+        side = self.tiles[WALL].get_width()
+        # Where each space's tile goes, worked out once
+        self.rects: dict[int, pygame.Rect] = {}
+        for i in self.geometry.indices:
+            q, r = self.geometry.coords[i]  # type: ignore
+            x = area.centerx + cell_size * (math.sqrt(3) * q + math.sqrt(3) / 2 * r)
+            y = area.centery + cell_size * 1.5 * r
+            self.rects[i] = pygame.Rect(round(x - side / 2), round(y - side / 2), side, side)
+        self.cells: bytes | None = None
+        self.winner: Space | None = None
+
+    def draw(self, screen: pygame.Surface, snapshot: Snapshot) -> list[pygame.Rect]:
+        """
+        Bring the drawing up to date with a snapshot
+
+        Args:
+            screen (pygame.Surface): The window
+            snapshot (Snapshot): The game's latest board
+
+        Returns:
+            list[pygame.Rect]: The parts of the window that changed
+        """
+        background = BACKGROUNDS[snapshot.winner]
+        if self.cells is None or snapshot.winner != self.winner:
+            screen.fill(background, self.area)
+            changed = self.geometry.indices
+            dirty = [self.area]
         else:
-            color = (255, 255, 255)
-        hexagon(screen, x, y, cell_size, color)
-        if contents == Space.RED:
-            pygame.draw.circle(screen, (255, 0, 0), (x, y), 0.6 * cell_size)
-        elif contents == Space.BLUE:
-            pygame.draw.circle(screen, (0, 0, 255), (x, y), 0.6 * cell_size)
-
-    pygame.display.flip()
-
-
-def runPyGame(game: Game):
+            old = self.cells
+            changed = [i for i in self.geometry.indices if snapshot.cells[i] != old[i]]
+            dirty = [self.rects[i] for i in changed]
+        # Tile squares overlap their neighbors, so they aren't cleared first.
+        # Every tile's hexagon is opaque and the same shape, so it covers the
+        # one drawn there before, and its transparent corners leave the
+        # neighbors alone.
+        for i in changed:
+            screen.blit(self.tiles[snapshot.cells[i]], self.rects[i])
+        self.cells = snapshot.cells
+        self.winner = snapshot.winner
+        return dirty
+
+
+def runPyGame(*games: Game, fps: int = 30, side: int = 800):
+    """
+    Play games and show them side by side until the window is closed
+
+    Args:
+        *games (Game): The games, not started yet
+        fps (int, optional): The most frames to draw per second. Defaults to 30.
+        side (int, optional): The most pixels across each game's square of
+            the window. Defaults to 800.
+    """
     pygame.init()
-
-    # Set up the window.
-    width, height = 800, 800
-    screen = pygame.display.set_mode((width, height))
-
-    while True:
-        update()
-        draw(screen, game)
-        if game.winner is None:
-            game.step()
-
-
-def main():
+    columns = math.ceil(math.sqrt(len(games)))
+    rows = math.ceil(len(games) / columns)
+    side = min(side, 1600 // columns)
+    screen = pygame.display.set_mode((columns * side, rows * side))
+    snapshots: queue.Queue[Snapshot] = queue.Queue()
+    views = [
+        BoardView(
+            pygame.Rect(n % columns * side, n // columns * side, side, side), game.board.size
+        )
+        for n, game in enumerate(games)
+    ]
+    runners = [GameRunner(n, game, snapshots) for n, game in enumerate(games)]
+    for runner in runners:
+        runner.start()
+    clock = pygame.time.Clock()
+    try:
+        while True:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return
+            # Only each game's latest board is worth drawing
+            latest: dict[int, Snapshot] = {}
+            while True:
+                try:
+                    snapshot = snapshots.get_nowait()
+                except queue.Empty:
+                    break
+                latest[snapshot.game] = snapshot
+            dirty = []
+            for number, snapshot in latest.items():
+                dirty.extend(views[number].draw(screen, snapshot))
+            if dirty:
+                pygame.display.update(dirty)
+            clock.tick(fps)
+    finally:
+        # A turn in progress is cut off when the games' workers are shut down
+        # at exit
+        for runner in runners:
+            runner.stop()
+        pygame.quit()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--games", type=int, default=1, help="how many to show at once")
+    args = parser.parse_args(argv)
     # player_a is red, player_b is blue
-    
-    player_a, player_b = Smart_Bot(),Dumb_Bot()
-    ##player_a, player_b = Smart_Bot(),Dumb_Bot()
-    game = Game(
-        player_a,
-        player_b,
-        time_per_move=3,
-        reserve_time=10,
-        small=True,
-        min_sleep_time=0,
-    )
-    runPyGame(game)
+    games = []
+    for _ in range(args.games):
+        player_a, player_b = Smart_Bot(), Dumb_Bot()
+        ##player_a, player_b = Smart_Bot(), RandomPlayer()
+        games.append(
+            Game(
+                player_a,
+                player_b,
+                time_per_move=3,
+                reserve_time=10,
+                small=True,
+                min_sleep_time=0,
+            )
+        )
+    runPyGame(*games)
 
 
 if __name__ == "__main__":
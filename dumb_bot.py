@@ -4,6 +4,7 @@ import time
 from typing import Optional
 from board import Board, Space, Coordinate
 from copy import copy
+from search import EXACT, LOWER, UPPER, TranspositionTable
 
 class Dumb_Bot:
     count = 0
@@ -13,9 +14,19 @@ class Dumb_Bot:
         Dumb_Bot.count += 1
         self.max_depth = 2 # 2 is like the max for the aibot to not run out of time
         
-        self.transposition_table = {}
+        self.mine_table = TranspositionTable() # Bounded, so it doesn't grow all game
+        self.move_table = TranspositionTable()
+        self.color = None
+
+    def new_search(self, table: TranspositionTable, color: Space):
+        if color != self.color: # Scores are from our point of view, so a new color means a clean slate
+            self.mine_table.clear()
+            self.move_table.clear()
+            self.color = color
+        table.new_search()
 
     def mine(self, board: Board, color: Space) -> Coordinate:
+        self.new_search(self.mine_table, color)
         best_mine = None
         for depth in range(1, self.max_depth + 1):
             score, mine_found = self.minimax_ab(board, color, depth, alpha=-float('inf'), beta=float('inf'), maximizing=True, moving=False)
@@ -23,9 +34,12 @@ class Dumb_Bot:
                 best_mine = mine_found
                       
         if best_mine:
-            return best_mine[1]
+            return best_mine
         else:
             raise RuntimeError
+
+    def apply_mine(self, board: Board, mine: Coordinate, color: Space):
+        board.push_mine(mine, color) # Same dig rule as the Game, including new miners
     
     def apply_move(self, board: Board, move: tuple[Coordinate, Coordinate], color: Space):
         start, end = move
@@ -33,6 +47,7 @@ class Dumb_Bot:
         board[end] = color
 
     def move(self, board: Board, color: Space) -> Optional[tuple[Coordinate, Coordinate]]:
+        self.new_search(self.move_table, color)
         best_move = None
         for depth in range(1, self.max_depth + 1):
             score, move_found = self.minimax_ab(board, color, depth, alpha=-float('inf'), beta=float('inf'), maximizing=True, moving=True)
@@ -43,16 +58,26 @@ class Dumb_Bot:
 
     def minimax_ab(self, board: Board, color: Space, depth: int, alpha: float, beta: float, maximizing: bool, moving: bool):
         
-        state_key = (board, color, depth, alpha, beta, maximizing, moving)
-        if state_key in self.transposition_table:
-            return self.transposition_table[state_key]
+        table = self.move_table if moving else self.mine_table
+        current_color = color if maximizing else self.opponent(color)
+        state_key = table.key(board, current_color)
+        entry = table.probe(state_key)
+        if entry is not None and entry.depth >= depth:
+            if entry.flag == EXACT:
+                return entry.value, entry.move
+            elif entry.flag == LOWER:
+                alpha = max(alpha, entry.value)
+            else:
+                beta = min(beta, entry.value)
+            if beta <= alpha:
+                return entry.value, entry.move
+        original_alpha, original_beta = alpha, beta
 
         if depth == 0: #Base Case
             val = self.heuristic(board, color)
-            self.transposition_table[state_key] = (val, None)
+            table.store(state_key, depth, val, EXACT, None)
             return val, None
 
-        current_color = color if maximizing else self.opponent(color)
         if moving: 
             moves = self.possible_moves(board, current_color)
         else: 
@@ -60,7 +85,7 @@ class Dumb_Bot:
 
         if not moves:
             val = self.heuristic(board, color)
-            self.transposition_table[state_key] = (val, None)
+            table.store(state_key, depth, val, EXACT, None)
             return val, None
 
 
@@ -70,7 +95,10 @@ class Dumb_Bot:
             value = float('-inf')
             for move in moves:
                 new_board = copy(board)
-                self.apply_move(new_board, move, current_color)
+                if moving:
+                    self.apply_move(new_board, move, current_color)
+                else:
+                    self.apply_mine(new_board, move, current_color)
                 if moving: 
                     evaluation, _ = self.minimax_ab(new_board, color, depth - 1, alpha, beta, maximizing=False, moving=True) 
                 else:
@@ -86,7 +114,10 @@ class Dumb_Bot:
             value = float('inf')
             for move in moves:
                 new_board = copy(board)
-                self.apply_move(new_board, move, current_color)
+                if moving:
+                    self.apply_move(new_board, move, current_color)
+                else:
+                    self.apply_mine(new_board, move, current_color)
                 if moving: 
                     evaluation, _ = self.minimax_ab(new_board, color, depth - 1, alpha, beta, maximizing=True, moving=True) 
                 else:
@@ -99,7 +130,13 @@ class Dumb_Bot:
                 if beta <= alpha: #Cut time
                     break 
 
-        self.transposition_table[state_key] = (value, best_move)
+        if value <= original_alpha: #Only know it's at most this
+            flag = UPPER
+        elif value >= original_beta: #Only know it's at least this
+            flag = LOWER
+        else:
+            flag = EXACT
+        table.store(state_key, depth, value, flag, best_move)
         return value, best_move
 
     def opponent(self, color: Space) -> Space:
@@ -122,9 +159,5 @@ class Dumb_Bot:
                 moves.append((piece, destination))
         return moves
     
-    def possible_mines(self, board: Board, color: Space) -> list[tuple[Coordinate, Coordinate]]:
-        mines = []
-        for piece in board.find_all(color):
-            for destination in board.mineable_by_player(color):
-                mines.append((piece, destination))
-        return mines
\ No newline at end of file
+    def possible_mines(self, board: Board, color: Space) -> list[Coordinate]:
+        return list(board.mineable_by_player(color)) # Each dig once, no matter how many miners we have
\ No newline at end of file
@@ -0,0 +1,251 @@
+from functools import cache
+from math import isqrt
+from typing import Sequence
+
+import numpy as np
+
+from board import BLUE, EMPTY, OFF_BOARD, RED, WALL, Board, Space, geometry
+
+
+class BatchEvaluator:
+    """
+    Scores many boards of one size at once with NumPy.
+
+    Boards are stacked into a (boards, length) uint8 array of raw cell values,
+    laid out the same way as Board's mailbox. For the flood fills each cell
+    then gets one bit per board: a mask is a (length, words) uint64 array where
+    bit b of a cell's words is board b, so one bitwise operation works on 64
+    boards at a time. Because every row of the mailbox carries a padding slot,
+    stepping to a neighbor is a shift along the cell axis by 1, width or
+    width - 1 in either direction, the same trick Geometry.dilate plays on
+    bitboards.
+    """
+
+    def __init__(self, size: int):
+        """
+        Args:
+            size (int): The board size (radius + 1) of the boards to score
+        """
+        self.geometry = geometry(size)
+        self.width = self.geometry.width
+        self.length = self.geometry.length
+        on_board = np.frombuffer(bytes(self.geometry.blank), np.uint8) != OFF_BOARD
+        self.on_board = np.where(on_board, ~np.uint64(0), np.uint64(0))[:, None]
+        self._shifts = (1, self.width, self.width - 1)
+
+    def stack(self, boards: Sequence[Board | bytes]) -> np.ndarray:
+        """
+        Stack boards into one state array
+
+        Args:
+            boards (Sequence[Board | bytes]): Boards of this evaluator's size, or
+                their Board.cell_bytes()
+
+        Returns:
+            np.ndarray: A (len(boards), length) uint8 array of raw cell values
+        """
+        raw = b"".join(
+            board.cell_bytes() if isinstance(board, Board) else board
+            for board in boards
+        )
+        return np.frombuffer(raw, np.uint8).reshape(len(boards), self.length)
+
+    def pack(self, mask: np.ndarray) -> np.ndarray:
+        """
+        Turn a (boards, length) boolean array into one bit per board per cell
+
+        Args:
+            mask (np.ndarray): A (boards, length) boolean array
+
+        Returns:
+            np.ndarray: A (length, words) uint64 array, bit b of each cell's
+                words being board b
+        """
+        words = -(-len(mask) // 64)
+        padded = np.zeros((self.length, words * 64), bool)
+        padded[:, : len(mask)] = mask.T
+        return np.packbits(padded, axis=1, bitorder="little").view(np.uint64)
+
+    def count(self, packed: np.ndarray, boards: int) -> np.ndarray:
+        """
+        Count the cells set in a packed mask, board by board
+
+        Args:
+            packed (np.ndarray): A (length, words) uint64 array from pack()
+            boards (int): How many boards were packed
+
+        Returns:
+            np.ndarray: One count per board
+        """
+        bits = np.unpackbits(packed.view(np.uint8), axis=1, bitorder="little")
+        return bits[:, :boards].sum(axis=0, dtype=np.int64)
+
+    def dilate(self, packed: np.ndarray) -> np.ndarray:
+        """
+        Grow packed masks by one step: each cell plus all its neighbors
+
+        Args:
+            packed (np.ndarray): A (length, words) uint64 array
+
+        Returns:
+            np.ndarray: The masks together with every neighbor of their cells
+        """
+        out = packed.copy()
+        for shift in self._shifts:
+            out[shift:] |= packed[:-shift]
+            out[:-shift] |= packed[shift:]
+        out &= self.on_board
+        return out
+
+    def neighbor_counts(
+        self, packed: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Count, for every cell of every board, how many of its neighbors are in a mask
+
+        Args:
+            packed (np.ndarray): A (length, words) uint64 array
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: The counts in bit-sliced
+                binary, like Geometry.neighbor_counts: the 1s, 2s and 4s bit of
+                each cell's count
+        """
+        ones = np.zeros_like(packed)
+        twos = np.zeros_like(packed)
+        fours = np.zeros_like(packed)
+        for shift in self._shifts:
+            for shifted in (
+                np.concatenate((np.zeros_like(packed[:shift]), packed[:-shift])),
+                np.concatenate((packed[shift:], np.zeros_like(packed[:shift]))),
+            ):
+                carry = ones & shifted
+                ones ^= shifted
+                fours |= twos & carry
+                twos ^= carry
+        return ones, twos, fours
+
+    def fill(self, seeds: np.ndarray, passable: np.ndarray) -> np.ndarray:
+        """
+        Flood fill every board at once, until no board's region grows
+
+        Args:
+            seeds (np.ndarray): Packed masks of starting cells, always part of the result
+            passable (np.ndarray): Packed masks of cells the fill may spread through
+
+        Returns:
+            np.ndarray: Packed masks of every cell reached, including the seeds
+        """
+        region = seeds
+        while True:
+            grown = region | (self.dilate(region) & passable)
+            if np.array_equal(grown, region):
+                return region
+            region = grown
+
+    def mineable_walls(self, walls: np.ndarray) -> np.ndarray:
+        """
+        Find every wall that passes the mined neighbor rule, regardless of who can reach it
+
+        Args:
+            walls (np.ndarray): Packed masks of the walls
+
+        Returns:
+            np.ndarray: Packed masks of the walls with at most 3 mined neighbors,
+                none of which already has 3 or more mined neighbors
+        """
+        mined = self.on_board & ~walls
+        ones, twos, fours = self.neighbor_counts(mined)
+        crowded = mined & (fours | (twos & ones))
+        return walls & ~fours & ~self.dilate(crowded)
+
+    def counts(self, states: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Count what each player can dig and walk to, on every board
+
+        Args:
+            states (np.ndarray): A (boards, length) state array
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The mineable and walkable counts, each
+                a (boards, 4) int array indexed by Space value (only the RED and
+                BLUE columns are filled in)
+        """
+        n = len(states)
+        walls = self.mineable_walls(self.pack(states == WALL))
+        empty = self.pack(states == EMPTY)
+        words = empty.shape[1]
+        # Fill for both players in one pass: red's words first, then blue's
+        own = np.concatenate(
+            (self.pack(states == RED), self.pack(states == BLUE)), axis=1
+        )
+        empty = np.concatenate((empty, empty), axis=1)
+        # The same as Board.walkable_bitboard and Board.mineable_bitboard
+        reach = self.fill(own, own | empty) & empty
+        reached = self.dilate(reach | own) & np.concatenate((walls, walls), axis=1)
+        mineable = np.zeros((n, 4), np.int64)
+        walkable = np.zeros((n, 4), np.int64)
+        for player, part in ((RED, slice(None, words)), (BLUE, slice(words, None))):
+            walkable[:, player] = self.count(reach[:, part], n)
+            mineable[:, player] = self.count(reached[:, part], n)
+        return mineable, walkable
+
+    def heuristic(
+        self, boards: Sequence[Board | bytes], color: Space
+    ) -> np.ndarray:
+        """
+        Smart_Bot's heuristic for many boards at once: 4 points per mineable
+        space and 1 per walkable space, relative to the opponent
+
+        Args:
+            boards (Sequence[Board | bytes]): The boards to score
+            color (Space): The player to score them for
+
+        Returns:
+            np.ndarray: One score per board
+        """
+        if not boards:
+            return np.zeros(0, np.int64)
+        mineable, walkable = self.counts(self.stack(boards))
+        me, them = color.value, BLUE if color.value == RED else RED
+        return 4 * (mineable[:, me] - mineable[:, them]) + (
+            walkable[:, me] - walkable[:, them]
+        )
+
+
+@cache
+def batch_evaluator(size: int) -> BatchEvaluator:
+    """
+    The shared BatchEvaluator for one board size
+
+    Args:
+        size (int): The board size (radius + 1)
+
+    Returns:
+        BatchEvaluator: The evaluator, built on first use
+    """
+    return BatchEvaluator(size)
+
+
+def batch_heuristic(boards: Sequence[Board | bytes], color: Space) -> np.ndarray:
+    """
+    Smart_Bot's heuristic for many boards of one size, which can be passed to
+    Searcher as evaluate_batch
+
+    Args:
+        boards (Sequence[Board | bytes]): The boards to score, or their
+            Board.cell_bytes()
+        color (Space): The player to score them for
+
+    Returns:
+        np.ndarray: One score per board
+    """
+    if not boards:
+        return np.zeros(0, np.int64)
+    first = boards[0]
+    if isinstance(first, Board):
+        size = first.size
+    else:
+        # The mailbox holds (2 * radius + 1) * (2 * radius + 2) slots
+        size = (isqrt(4 * len(first) + 1) - 3) // 4 + 1
+    return batch_evaluator(size).heuristic(boards, color)
@@ -1,10 +1,23 @@
+import asyncio
+from collections import deque
 from copy import copy
+from dataclasses import dataclass
+import os
+import queue
+import signal
+import sys
+import threading
 import time
 import traceback
-from typing import Protocol
-from multiprocessing import Pool, TimeoutError
+import weakref
+from typing import Any, Generator, Protocol
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+from multiprocessing.reduction import ForkingPickler
+from multiprocessing.shared_memory import SharedMemory
 
-from board import Coordinate, Board, Space
+from board import Coordinate, Board, Delta, Space, geometry
+from metrics import GameObserver, TurnMetrics
 
 
 class Player(Protocol):
@@ -19,6 +32,471 @@ class Player(Protocol):
     ) -> tuple[Coordinate, Coordinate] | None: ...
 
 
+class PlayerCrashed(Exception):
+    """
+    A bot raised an exception in its worker. The message is the worker's traceback.
+    """
+
+
+def _serve(player: Player, conn: Connection, shared: SharedMemory):
+    # Worker process loop: keep a mirror of the game board, bring it up to date
+    # from the position in shared memory on each request, and answer mine/move
+    # requests until told to stop.
+    # Being terminated exits normally, so anything the bot started (such as a
+    # search pool) gets shut down too.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    board: Board | None = None
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        phase, color, report = request
+        if board is None:
+            board = Board.from_buffer(shared.buf)
+        else:
+            board.load_bytes(shared.buf)
+        conn.send(_answer(player, board, phase, color, report))
+
+
+def _update(board: Board | None, update: Board | Delta) -> Board:
+    # Bring a worker's mirror of the board up to date: the first request of a
+    # game sends the whole board, later ones only the changed spaces, as
+    # (index, new Space) pairs from Board.delta
+    if isinstance(update, Board):
+        return update
+    for index, value in update:
+        board.set_index(index, value)  # type: ignore
+    return board  # type: ignore
+
+
+def _answer(
+    player: Player, board: Board, phase: str, color: Space, report: bool
+) -> tuple[bool, Any, dict[str, Any] | None]:
+    # Ask the bot, returning whether it answered, the answer or the traceback,
+    # and what it reported
+    try:
+        result = getattr(player, phase)(copy(board), color)
+        # Bots may describe their last answer, e.g. how deep they searched
+        stats = player.report() if report and hasattr(player, "report") else None
+    except Exception:
+        return False, traceback.format_exc(), None
+    return True, result, stats
+
+
+def _serve_shared(conn: Connection):
+    # Shared worker process loop: host the bots of many games by slot number,
+    # each with its own mirror of its game's board, and answer their requests
+    # in order, timing how long each bot thinks
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    players: dict[int, Player] = {}
+    boards: dict[int, Board] = {}
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        slot, phase, *args = request
+        if phase == "open":
+            players[slot] = args[0]
+            continue
+        if phase == "close":
+            players.pop(slot, None)
+            boards.pop(slot, None)
+            continue
+        color, update, report = args
+        board = boards[slot] = _update(boards.get(slot), update)
+        start_time = time.monotonic()
+        ok, value, stats = _answer(players[slot], board, phase, color, report)
+        conn.send((slot, ok, value, stats, time.monotonic() - start_time))
+
+
+class PlayerWorker:
+    """
+    A process that runs one player's bot for a whole game. The bot keeps its
+    state between turns. The position is passed through a block of shared
+    memory that is reused every turn, written with Board.to_bytes, so a
+    request itself only says what to answer.
+    """
+
+    def __init__(self, player: Player):
+        # Big enough for either board size
+        self._shared = SharedMemory(create=True, size=len(geometry(7).indices) + 1)
+        self._conn, child_conn = Pipe()
+        self._process = Process(target=_serve, args=(player, child_conn, self._shared))
+        self._process.start()
+        child_conn.close()
+        # What the bot reported about its last answer, if it was asked to
+        self.stats: dict[str, Any] | None = None
+
+    def request(self, phase: str, board: Board, color: Space, report: bool = False):
+        """
+        Ask the bot to start thinking about a turn
+
+        Args:
+            phase (str): Which Player method to call, "mine" or "move"
+            board (Board): The current board
+            color (Space): The color the bot is playing
+            report (bool, optional): Whether to collect the bot's report() along
+                with its answer, into stats. Defaults to False.
+        """
+        # The worker is done with the previous position: requests take turns
+        data = board.to_bytes()
+        self._shared.buf[: len(data)] = data
+        self._conn.send((phase, color, report))
+
+    def result(self, timeout: float) -> Any:
+        """
+        Wait for the answer to the last request
+
+        Args:
+            timeout (float): How many seconds to wait
+
+        Raises:
+            TimeoutError: The bot didn't answer in time
+            PlayerCrashed: The bot raised an exception or its process died
+
+        Returns:
+            Any: What the bot returned
+        """
+        if not self._conn.poll(max(0.0, timeout)):
+            raise TimeoutError
+        try:
+            ok, value, self.stats = self._conn.recv()
+        except EOFError:
+            raise PlayerCrashed("The worker process died") from None
+        if not ok:
+            raise PlayerCrashed(value)
+        return value
+
+    def close(self):
+        """
+        Stop the worker process, whether or not it is still thinking
+        """
+        self._process.terminate()
+        self._process.join()
+        self._conn.close()
+        self._shared.close()
+        self._shared.unlink()
+
+
+@dataclass
+class _Request:
+    # A request sent to a shared worker. started is set once the worker gets
+    # to it, and timeout once the game starts waiting for the answer. Thinking
+    # done before charged_from isn't counted against the timeout.
+    future: asyncio.Future
+    timeout: float | None = None
+    started: float | None = None
+    charged_from: float = 0.0
+
+    def deadline(self, grace: float) -> float:
+        return max(self.started, self.charged_from) + self.timeout + grace  # type: ignore
+
+
+class _SharedWorker:
+    # One process of a BotPool, and its unanswered requests, oldest first.
+    # The oldest is the one it is working on.
+    # Messages are pickled right away, so a bot that can't be is reported to
+    # whoever opened it, but written out by a thread of their own: a bot can be
+    # too big for the pipe's buffer, and the event loop mustn't wait for the
+    # worker to read it.
+    def __init__(self):
+        self.conn, child_conn = Pipe()
+        # Not a daemon: bots may start processes of their own, such as a search pool
+        self.process = Process(target=_serve_shared, args=(child_conn,))
+        self.process.start()
+        child_conn.close()
+        self.pending: deque[_Request] = deque()
+        self.bots = 0
+        self.alive = True
+        self.timer: asyncio.TimerHandle | None = None
+        self._outbox: queue.SimpleQueue[bytes | None] = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._writer.start()
+
+    def send(self, message: tuple):
+        self._outbox.put(bytes(ForkingPickler.dumps(message)))
+
+    def _write(self):
+        while (message := self._outbox.get()) is not None:
+            try:
+                self.conn.send_bytes(message)
+            except (OSError, ValueError):
+                # The worker is gone, which the event loop finds out from its
+                # end of the pipe
+                return
+
+    def close(self):
+        self.alive = False
+        if self.timer is not None:
+            self.timer.cancel()
+        self._outbox.put(None)
+        self.process.terminate()
+        self.process.join()
+        self._writer.join()
+        self.conn.close()
+
+
+def _close_shared_workers(workers: list[_SharedWorker]):
+    for worker in workers:
+        if worker.alive:
+            worker.close()
+
+
+class BotPool:
+    """
+    Worker processes shared by the bots of many AsyncGames, so that any number
+    of games can be played at once on a fixed number of processes.
+
+    Each bot lives in one worker for its whole game and keeps its state
+    between turns there, as with PlayerWorker. A worker answers its bots one at
+    a time, and a bot is only charged for the time it spends thinking, as
+    measured in the worker, not for waiting behind other bots.
+
+    A bot that runs more than grace seconds past its time is timed out. If it
+    still hasn't answered hang_timeout seconds after its worker got to it, the
+    worker is restarted, and every other bot that lived there crashes.
+
+    Use it inside a running event loop and close it when done, or use it with
+    async with.
+    """
+
+    def __init__(
+        self, processes: int | None = None, grace: float = 0.5, hang_timeout: float = 60.0
+    ):
+        """
+        Args:
+            processes (int | None, optional): How many worker processes to run.
+                Defaults to the number of CPUs.
+            grace (float, optional): Seconds past a bot's time to wait for it,
+                on top of the time measured in the worker. Defaults to 0.5.
+            hang_timeout (float, optional): Seconds after which a worker that
+                is stuck on one answer is restarted. Should be longer than any
+                bot's time per move and reserve time together. Defaults to 60.0.
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.grace = grace
+        self.hang_timeout = hang_timeout
+        self._workers: list[_SharedWorker] = []
+        self._slots = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Not left running if the pool is dropped or the program exits unclosed
+        self._finalizer = weakref.finalize(self, _close_shared_workers, self._workers)
+
+    async def __aenter__(self) -> "BotPool":
+        return self
+
+    async def __aexit__(self, *_):
+        self.close()
+
+    def open(self, player: Player) -> "PooledBot":
+        """
+        Start hosting a bot in the worker with the fewest bots
+
+        Args:
+            player (Player): The bot, which is sent to the worker
+
+        Returns:
+            PooledBot: A handle to ask the bot for answers through
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            for _ in range(self.processes):
+                self._workers.append(self._start_worker())
+        worker = min(self._workers, key=lambda w: w.bots)
+        worker.bots += 1
+        self._slots += 1
+        worker.send((self._slots, "open", player))
+        return PooledBot(self, worker, self._slots)
+
+    def close(self):
+        """
+        Stop every worker process, whether or not it is still thinking
+        """
+        for worker in self._workers:
+            self._stop_worker(worker)
+        self._workers.clear()
+        self._loop = None
+
+    def _start_worker(self) -> _SharedWorker:
+        worker = _SharedWorker()
+        self._loop.add_reader(worker.conn.fileno(), self._receive, worker)  # type: ignore
+        return worker
+
+    def _stop_worker(self, worker: _SharedWorker):
+        if worker.alive:
+            self._loop.remove_reader(worker.conn.fileno())  # type: ignore
+            worker.close()
+        while worker.pending:
+            request = worker.pending.popleft()
+            if not request.future.done():
+                request.future.set_exception(
+                    PlayerCrashed("The shared worker process was stopped")
+                )
+
+    def _submit(self, worker: _SharedWorker, message: tuple) -> _Request:
+        request = _Request(self._loop.create_future())  # type: ignore
+        if not worker.alive:
+            request.future.set_exception(PlayerCrashed("The worker process died"))
+            return request
+        worker.pending.append(request)
+        worker.send(message)
+        if len(worker.pending) == 1:
+            self._begin(worker)
+        return request
+
+    def _begin(self, worker: _SharedWorker):
+        # The worker has moved on to its oldest pending request
+        worker.pending[0].started = time.monotonic()
+        self._watch(worker)
+
+    def _watch(self, worker: _SharedWorker):
+        # Check on the request the worker is working on when it runs out of time
+        if worker.timer is not None:
+            worker.timer.cancel()
+            worker.timer = None
+        if not worker.pending:
+            return
+        request = worker.pending[0]
+        check = request.started + self.hang_timeout  # type: ignore
+        if request.timeout is not None and not request.future.done():
+            check = min(check, request.deadline(self.grace))
+        worker.timer = self._loop.call_later(  # type: ignore
+            max(0.0, check - time.monotonic()), self._check, worker, request
+        )
+
+    def _check(self, worker: _SharedWorker, request: _Request):
+        worker.timer = None
+        if not worker.pending or worker.pending[0] is not request:
+            return
+        now = time.monotonic()
+        if (
+            request.timeout is not None
+            and not request.future.done()
+            and now >= request.deadline(self.grace)
+        ):
+            request.future.set_exception(TimeoutError())
+        if now >= request.started + self.hang_timeout:  # type: ignore
+            # The bot is stuck, and holding up every other bot in the worker
+            self._stop_worker(worker)
+            self._workers[self._workers.index(worker)] = self._start_worker()
+            return
+        self._watch(worker)
+
+    def _receive(self, worker: _SharedWorker):
+        try:
+            while worker.alive and worker.conn.poll():
+                _, ok, value, stats, seconds = worker.conn.recv()
+                request = worker.pending.popleft()
+                # The game may have given up on it already
+                if not request.future.done():
+                    request.future.set_result((ok, value, stats, seconds))
+                if worker.pending:
+                    self._begin(worker)
+                else:
+                    self._watch(worker)
+        except (EOFError, OSError):
+            self._stop_worker(worker)
+            if worker in self._workers:
+                self._workers[self._workers.index(worker)] = self._start_worker()
+
+
+class PooledBot:
+    """
+    A bot hosted in a BotPool worker, used like a PlayerWorker but awaited
+    """
+
+    def __init__(self, pool: BotPool, worker: _SharedWorker, slot: int):
+        self._pool = pool
+        self._worker = worker
+        self._slot = slot
+        self._board: Board | None = None
+        self._request: _Request | None = None
+        # What the bot reported about its last answer, if it was asked to
+        self.stats: dict[str, Any] | None = None
+
+    def request(self, phase: str, board: Board, color: Space, report: bool = False):
+        """
+        Ask the bot to start thinking about a turn, after any requests its
+        worker already has
+
+        Args:
+            phase (str): Which Player method to call, "mine" or "move"
+            board (Board): The current board
+            color (Space): The color the bot is playing
+            report (bool, optional): Whether to collect the bot's report() along
+                with its answer, into stats. Defaults to False.
+        """
+        update = copy(board) if self._board is None else board.delta(self._board)
+        self._board = copy(board)
+        self._request = self._pool._submit(
+            self._worker, (self._slot, phase, color, update, report)
+        )
+
+    async def result(self, timeout: float, charged_from: float = 0.0) -> tuple[Any, float]:
+        """
+        Wait for the answer to the last request
+
+        Args:
+            timeout (float): How many seconds the bot may think for
+            charged_from (float, optional): The time.monotonic() from which the
+                bot's thinking counts, such as when the game stopped sleeping.
+                Defaults to 0.0, to count all of it.
+
+        Raises:
+            TimeoutError: The bot thought for too long
+            PlayerCrashed: The bot raised an exception or its worker was stopped
+
+        Returns:
+            tuple[Any, float]: What the bot returned, and how many of the
+                seconds it thought for count
+        """
+        request = self._request
+        assert request is not None
+        request.timeout = timeout
+        request.charged_from = charged_from
+        if self._worker.pending and self._worker.pending[0] is request:
+            self._pool._watch(self._worker)
+        ok, value, self.stats, seconds = await request.future
+        if not ok:
+            raise PlayerCrashed(value)
+        seconds -= min(seconds, max(0.0, charged_from - request.started))  # type: ignore
+        if seconds > timeout:
+            raise TimeoutError
+        return value, seconds
+
+    def close(self):
+        """
+        Stop hosting the bot. Its worker finishes any request it already has.
+        """
+        if self._worker.alive:
+            self._worker.bots -= 1
+            self._worker.send((self._slot, "close"))
+
+
+def _close_workers(workers: dict[Space, PlayerWorker]):
+    for worker in workers.values():
+        worker.close()
+    workers.clear()
+
+
+class _Laps:
+    # Records the time since the previous lap under each phase name
+    def __init__(self, phases: dict[str, float]):
+        self.phases = phases
+        self.mark = time.perf_counter()
+
+    def __call__(self, phase: str):
+        now = time.perf_counter()
+        self.phases[phase] = now - self.mark
+        self.mark = now
+
+
 class Game:
 
     def __init__(
@@ -29,6 +507,7 @@ class Game:
         time_per_move: float = 3.0,
         reserve_time: float = 10.0,
         min_sleep_time: float = 0.0,
+        observer: GameObserver | None = None,
     ):
         self.players = {Space.RED: red, Space.BLUE: blue}  # red, blue
         self.red_turn = True
@@ -37,41 +516,127 @@ class Game:
         self.time_per_move = time_per_move
         self.min_sleep_time = min_sleep_time
         self.reserve_time = {Space.RED: reserve_time, Space.BLUE: reserve_time}
+        # Gets a TurnMetrics after every step, if set
+        self.observer = observer
+        self.turns = 0
+        # One long-lived worker per player, started on that player's first turn
+        self._workers: dict[Space, PlayerWorker] = {}
+        self._finalizer = weakref.finalize(self, _close_workers, self._workers)
+
+    def close(self):
+        """
+        Shut down the players' worker processes. Called automatically once the
+        game has a winner.
+        """
+        self._finalizer()
+
+    def _worker(self, color: Space) -> PlayerWorker:
+        if color not in self._workers:
+            self._workers[color] = PlayerWorker(self.players[color])
+        return self._workers[color]
 
     def step(self):
-        if self.winner:
+        metrics = self._begin_step()
+        if metrics is None:
             return
+        try:
+            turn = self._turn(metrics)
+            reply: Any = None
+            error: Exception | None = None
+            while True:
+                try:
+                    need = turn.send(reply) if error is None else turn.throw(error)
+                except StopIteration:
+                    break
+                reply, error = None, None
+                try:
+                    reply = self._fulfil(*need)
+                except Exception as exception:
+                    error = exception
+        finally:
+            self._end_step(metrics)
+
+    def _fulfil(self, kind: str, color: Space, *args: Any) -> Any:
+        # Do what _turn asked for, blocking until it's done
+        if kind == "worker":
+            starting = color not in self._workers
+            self._worker(color)
+            return starting
+        worker = self._workers[color]
+        if kind == "request":
+            phase, report = args
+            worker.request(phase, self.board, color, report)
+        elif kind == "result":
+            start_time = time.monotonic()
+            answer = worker.result(args[0])
+            return answer, time.monotonic() - start_time, worker.stats
+        elif kind == "sleep":
+            time.sleep(args[0])
+
+    def _begin_step(self) -> TurnMetrics | None:
+        if self.winner:
+            return None
+        # Metrics are always taken, they cost far less than a turn
+        return TurnMetrics(self.turns, Space.RED if self.red_turn else Space.BLUE)
+
+    def _end_step(self, metrics: TurnMetrics):
+        metrics.reserve_time = self.reserve_time[metrics.color]
+        metrics.winner = self.winner
+        if self.observer is not None:
+            self.observer.on_turn(metrics)
+        self.turns += 1
+        if self.winner:
+            self.close()
+
+    def _turn(self, metrics: TurnMetrics) -> Generator[tuple, Any, None]:
+        # The rules of one turn. Everything that involves the player's worker
+        # is yielded to step as a tuple, so that Game and AsyncGame share them:
+        #   ("worker", color): make sure the worker is running, and send back
+        #       whether it had to be started
+        #   ("request", color, phase, report): send it the board to answer on
+        #   ("result", color, timeout): send back (answer, seconds the bot
+        #       took, its stats), or throw in TimeoutError or why it crashed
+        #   ("sleep", color, seconds): wait
+        phases, bot_stats = metrics.phases, metrics.bot_stats
+        report = self.observer is not None
         player_color = Space.RED if self.red_turn else Space.BLUE
         other_color = Space.BLUE if self.red_turn else Space.RED
         total_time = self.time_per_move + self.reserve_time[player_color]
         available_time = total_time
         player = self.players[player_color]
+        lap = _Laps(phases)
         # Check if a player just lost by not being able to mine
-        if len(self.board.mineable_by_player(player_color)) == 0:
+        mineable = self.board.mineable_bitboard(player_color)
+        if not mineable:
             self.winner = other_color
+            lap("legality")
             return
+        lap("legality")
+        if (yield ("worker", player_color)):
+            lap("worker_start")
         # Current player needs to dig out a space
-        with Pool(processes=1) as pool:
-            mine_res = pool.apply_async(
-                player.mine, (copy(self.board), player_color)
-            )
-            try:
-                start_time = time.monotonic()
-                mine_coord = mine_res.get(available_time)
-                end_time = time.monotonic()
-                available_time -= end_time - start_time
-            # Player crashed or timed out
-            except TimeoutError:
-                self.winner = other_color
-                print(f"{player.name} timed out!")
-                return
-            except Exception:
-                self.winner = other_color
-                print(f"{player.name} crashed!")
-                traceback.print_exc()
-                return
-        # Current player made an illegal dig
-        if not self.board.is_mineable(mine_coord):
+        yield ("request", player_color, "mine", report)
+        lap("send_mine")
+        try:
+            mine_coord, seconds, stats = yield ("result", player_color, available_time)
+            available_time -= seconds
+        # Player crashed or timed out
+        except TimeoutError:
+            self.winner = other_color
+            print(f"{player.name} timed out!")
+            return
+        except Exception:
+            self.winner = other_color
+            print(f"{player.name} crashed!")
+            traceback.print_exc()
+            return
+        finally:
+            lap("think_mine")
+        if stats is not None:
+            bot_stats["mine"] = stats
+        # Current player made an illegal dig: only walls it can reach may be
+        # dug, the same ones it would have lost for having none of
+        if not mineable >> self.board.index_of(mine_coord) & 1:
             print(f"{player.name} illegally tried to mine at {mine_coord}")
             self.winner = other_color
             return
@@ -81,8 +646,12 @@ class Game:
             if self.board.count_elements(player_color) == self.board.miner_count
             else player_color
         )
+        metrics.dig = mine_coord
+        lap("dig")
         # Current player may move
-        with Pool(processes=2) as pool:
+        yield ("request", player_color, "move", report)
+        lap("send_move")
+        try:
             if self.min_sleep_time > 0:
                 sleep_time = max(
                     0,
@@ -96,28 +665,25 @@ class Game:
                         ),
                     ),
                 )
-                delay = pool.apply_async(time.sleep, (sleep_time,))
-            move_res = pool.apply_async(
-                player.move, (copy(self.board), player_color)
-            )
-            try:
-                if self.min_sleep_time > 0:
-                    delay.get() # type: ignore
-                start_time = time.monotonic()
-                move = move_res.get(available_time)
-                end_time = time.monotonic()
-                available_time -= end_time - start_time
-                self.reserve_time[player_color] -= max(0, total_time - available_time - self.time_per_move)
-            # player crashed or timed out
-            except TimeoutError:
-                self.winner = other_color
-                print(f"{player.name} timed out!")
-                return
-            except Exception:
-                self.winner = other_color
-                print(f"{player.name} crashed!")
-                traceback.print_exc()
-                return
+                yield ("sleep", player_color, sleep_time)
+                lap("sleep")
+            move, seconds, stats = yield ("result", player_color, available_time)
+            available_time -= seconds
+            self.reserve_time[player_color] -= max(0, total_time - available_time - self.time_per_move)
+        # player crashed or timed out
+        except TimeoutError:
+            self.winner = other_color
+            print(f"{player.name} timed out!")
+            return
+        except Exception:
+            self.winner = other_color
+            print(f"{player.name} crashed!")
+            traceback.print_exc()
+            return
+        finally:
+            lap("think_move")
+        if stats is not None:
+            bot_stats["move"] = stats
         if move is not None:
             move_start, move_end = move
             if self.board[
@@ -132,8 +698,11 @@ class Game:
                 return
             self.board[move_start] = Space.EMPTY
             self.board[move_end] = player_color
+            metrics.move = move
+        lap("move")
         # Clear dead enemies
-        self.board.clear_dead(other_color)
+        metrics.removed = sorted(self.board.clear_dead(other_color))
+        lap("clear_dead")
         # Switch players
         self.red_turn = not self.red_turn
 
@@ -141,3 +710,76 @@ class Game:
         while not self.winner:
             self.step()
         return self.winner
+
+
+class AsyncGame(Game):
+    """
+    A Game whose turns are awaited instead of blocking, so that one event loop
+    can play many games at once. Its bots live in a shared BotPool instead of
+    processes of their own. The rules, clocks and metrics are the same as
+    Game's, except that a bot's thinking time is measured in its worker.
+    """
+
+    def __init__(
+        self,
+        red: Player,
+        blue: Player,
+        pool: BotPool,
+        small: bool = False,
+        time_per_move: float = 3.0,
+        reserve_time: float = 10.0,
+        min_sleep_time: float = 0.0,
+        observer: GameObserver | None = None,
+    ):
+        super().__init__(
+            red, blue, small, time_per_move, reserve_time, min_sleep_time, observer
+        )
+        self.pool = pool
+        # When the last sleep ended, as Game only times the bot after it
+        self._slept_until = 0.0
+
+    def _worker(self, color: Space) -> PooledBot:  # type: ignore[override]
+        if color not in self._workers:
+            self._workers[color] = self.pool.open(self.players[color])  # type: ignore
+        return self._workers[color]  # type: ignore
+
+    async def step(self):  # type: ignore[override]
+        metrics = self._begin_step()
+        if metrics is None:
+            return
+        try:
+            turn = self._turn(metrics)
+            reply: Any = None
+            error: Exception | None = None
+            while True:
+                try:
+                    need = turn.send(reply) if error is None else turn.throw(error)
+                except StopIteration:
+                    break
+                reply, error = None, None
+                try:
+                    reply = await self._fulfil_async(*need)
+                except Exception as exception:
+                    error = exception
+        finally:
+            self._end_step(metrics)
+
+    async def _fulfil_async(self, kind: str, color: Space, *args: Any) -> Any:
+        # Do what _turn asked for, letting other games go on in the meantime
+        if kind == "result":
+            bot: PooledBot = self._workers[color]  # type: ignore
+            try:
+                answer, seconds = await bot.result(args[0], self._slept_until)
+            finally:
+                self._slept_until = 0.0
+            return answer, seconds, bot.stats
+        if kind == "sleep":
+            await asyncio.sleep(args[0])
+            self._slept_until = time.monotonic()
+            return None
+        return self._fulfil(kind, color, *args)
+
+    async def play_game(self) -> Space:  # type: ignore[override]
+        while not self.winner:
+            await self.step()
+        return self.winner
@@ -0,0 +1,198 @@
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from board import Coordinate, Space
+
+
+# The phases of a turn, in the order Game.step goes through them
+PHASES = (
+    "legality",  # Checking that the player has something to dig
+    "worker_start",  # Starting the player's worker process, on its first turn
+    "send_mine",  # Working out and sending the board update for the dig
+    "think_mine",  # Waiting for the bot to choose a dig
+    "dig",  # Checking and digging out the space
+    "sleep",  # min_sleep_time
+    "send_move",  # Working out and sending the board update for the move
+    "think_move",  # Waiting for the bot to choose a move
+    "move",  # Checking and making the move
+    "clear_dead",  # Removing the other player's dead miners
+)
+
+
+@dataclass
+class TurnMetrics:
+    """
+    What happened during one call to Game.step
+
+    Attributes:
+        turn: How many turns were played before this one
+        color: The player whose turn it was
+        phases: Seconds spent in each phase that was reached, by name (see PHASES)
+        reserve_time: The player's reserve time left after the turn
+        winner: The winner, if the game ended on this turn
+        bot_stats: What the bot reported about each of its answers, by phase
+            ("mine" and "move"), for bots that have a report() method
+        dig: The space that was dug out, if the turn got that far
+        move: The move that was made, if any
+        removed: The other player's miners that died at the end of the turn
+    """
+
+    turn: int
+    color: Space
+    phases: dict[str, float] = field(default_factory=dict)
+    reserve_time: float = 0.0
+    winner: Space | None = None
+    bot_stats: dict[str, dict[str, Any]] = field(default_factory=dict)
+    dig: Coordinate | None = None
+    move: tuple[Coordinate, Coordinate] | None = None
+    removed: list[Coordinate] = field(default_factory=list)
+
+
+class GameObserver(Protocol):
+
+    def on_turn(self, metrics: TurnMetrics): ...
+
+
+class Observers:
+    """
+    Passes every turn on to several observers, in order
+    """
+
+    def __init__(self, *observers: GameObserver):
+        self.observers = observers
+
+    def on_turn(self, metrics: TurnMetrics):
+        for observer in self.observers:
+            observer.on_turn(metrics)
+
+
+def percentile(values: list[float], share: float) -> float:
+    """
+    The value a given share of the values are at or below, interpolating
+    between the nearest two
+
+    Args:
+        values (list[float]): The values, in any order
+        share (float): Between 0 and 1
+
+    Returns:
+        float: The percentile, or 0.0 if there are no values
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = share * (len(ordered) - 1)
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+class MetricsAggregator:
+    """
+    A GameObserver that keeps every turn's metrics and summarizes them with
+    percentiles, per phase and per player. One aggregator can watch several
+    games.
+    """
+
+    def __init__(self):
+        self.turns: list[TurnMetrics] = []
+
+    def on_turn(self, metrics: TurnMetrics):
+        self.turns.append(metrics)
+
+    def phase_summary(
+        self, color: Space | None = None
+    ) -> dict[str, dict[str, float]]:
+        """
+        Summarize the time spent in each phase
+
+        Args:
+            color (Space | None, optional): Only count this player's turns.
+                Defaults to None, for both.
+
+        Returns:
+            dict[str, dict[str, float]]: For each phase that was reached, how
+                many turns reached it and the mean, median, 90th and 99th
+                percentile and maximum seconds it took
+        """
+        times: dict[str, list[float]] = {}
+        for turn in self.turns:
+            if color is None or turn.color == color:
+                for phase, seconds in turn.phases.items():
+                    times.setdefault(phase, []).append(seconds)
+        return {
+            phase: {
+                "count": len(times[phase]),
+                "mean": sum(times[phase]) / len(times[phase]),
+                "p50": percentile(times[phase], 0.5),
+                "p90": percentile(times[phase], 0.9),
+                "p99": percentile(times[phase], 0.99),
+                "max": max(times[phase]),
+            }
+            for phase in PHASES
+            if phase in times
+        }
+
+    def stat_summary(self, color: Space) -> dict[str, dict[str, float]]:
+        """
+        Summarize the numbers a player's bot reported
+
+        Args:
+            color (Space): The player
+
+        Returns:
+            dict[str, dict[str, float]]: For each numeric stat, named
+                "<phase>_<stat>", its mean, median, 90th percentile and maximum
+        """
+        values: dict[str, list[float]] = {}
+        for turn in self.turns:
+            if turn.color != color:
+                continue
+            for phase, stats in turn.bot_stats.items():
+                for name, value in stats.items():
+                    if isinstance(value, (int, float)):
+                        values.setdefault(f"{phase}_{name}", []).append(value)
+        return {
+            name: {
+                "mean": sum(found) / len(found),
+                "p50": percentile(found, 0.5),
+                "p90": percentile(found, 0.9),
+                "max": max(found),
+            }
+            for name, found in values.items()
+        }
+
+    def report(self) -> str:
+        """
+        Describe the summaries as text tables, in milliseconds
+
+        Returns:
+            str: One table of phases and one of bot stats per player
+        """
+        lines = []
+        for color in (Space.RED, Space.BLUE):
+            turns = [t for t in self.turns if t.color == color]
+            if not turns:
+                continue
+            lines.append(
+                f"{color.name}: {len(turns)} turns, "
+                f"{turns[-1].reserve_time:.2f}s reserve left"
+            )
+            lines.append(
+                f"  {'phase (ms)':<14}{'count':>6}{'mean':>9}{'p50':>9}"
+                f"{'p90':>9}{'p99':>9}{'max':>9}"
+            )
+            for phase, summary in self.phase_summary(color).items():
+                lines.append(
+                    f"  {phase:<14}{summary['count']:>6}"
+                    + "".join(
+                        f"{1000 * summary[key]:>9.2f}"
+                        for key in ("mean", "p50", "p90", "p99", "max")
+                    )
+                )
+            for name, summary in self.stat_summary(color).items():
+                lines.append(
+                    f"  {name}: mean {summary['mean']:.4g}, p50 {summary['p50']:.4g}, "
+                    f"p90 {summary['p90']:.4g}, max {summary['max']:.4g}"
+                )
+        return "\n".join(lines)
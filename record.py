@@ -0,0 +1,280 @@
+"""
+A compact binary record of a game, written turn by turn as the game is played
+and replayed later without the bots.
+
+A record is a header followed by one entry per turn, every number an unsigned
+LEB128 varint. Spaces are numbered by their position in Geometry.indices, so
+any space fits in one byte.
+
+    header: b"MTKR", format version, board size
+    turn:   0, dig, move start + 1 (0 for no move), [move end],
+            removed count, removed spaces..., mine ms, move ms
+    end:    1, winner's Space value, dig + 1 (0 if the final turn didn't dig)
+
+Colors aren't stored, red always moves first. Several records can follow one
+another in one file.
+"""
+
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator
+
+from board import Board, Coordinate, Space, geometry
+from metrics import TurnMetrics
+from search import opponent
+
+MAGIC = b"MTKR"
+VERSION = 1
+_TURN = 0
+_END = 1
+
+
+def write_varint(out: bytearray, value: int):
+    """
+    Append an unsigned LEB128 varint
+
+    Args:
+        out (bytearray): Where to append it
+        value (int): A non-negative integer
+    """
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data: bytes, position: int) -> tuple[int, int]:
+    """
+    Read an unsigned LEB128 varint
+
+    Args:
+        data (bytes): The encoded bytes
+        position (int): Where the varint starts
+
+    Raises:
+        ValueError: The data ends in the middle of the varint
+
+    Returns:
+        tuple[int, int]: The value and the position just after it
+    """
+    value = shift = 0
+    while True:
+        if position >= len(data):
+            raise ValueError("Game record ends in the middle of a number")
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+@dataclass
+class RecordedTurn:
+    """
+    One turn of a recorded game
+
+    Attributes:
+        color: The player who took it
+        dig: The space dug out
+        move: The move made afterwards, if any
+        removed: The other player's miners that died at the end of the turn
+        think_mine: Seconds the bot took to choose its dig, to the millisecond
+        think_move: Seconds the bot took to choose its move, to the millisecond
+    """
+
+    color: Space
+    dig: Coordinate
+    move: tuple[Coordinate, Coordinate] | None
+    removed: list[Coordinate]
+    think_mine: float = 0.0
+    think_move: float = 0.0
+
+
+@dataclass
+class GameRecord:
+    """
+    A whole recorded game
+
+    Attributes:
+        size: The board size, 5 (small) or 7
+        turns: Every completed turn, in order
+        winner: Who won, or None if the record stops before the end
+        last_dig: A dig that was made on the final turn before it was cut short
+            by an illegal move or a timeout, if any
+    """
+
+    size: int
+    turns: list[RecordedTurn] = field(default_factory=list)
+    winner: Space | None = None
+    last_dig: Coordinate | None = None
+
+
+class RecordWriter:
+    """
+    A GameObserver that streams a game's record to a binary file as it is played
+
+    Pass it to Game as the observer, or together with other observers through
+    metrics.Observers.
+    """
+
+    def __init__(self, stream: BinaryIO, small: bool = False):
+        """
+        Args:
+            stream (BinaryIO): Where to write. It is flushed when the game ends.
+            small (bool, optional): Should match the Game. Defaults to False.
+        """
+        self.stream = stream
+        self.geometry = geometry(5 if small else 7)
+        self._numbers = {i: n for n, i in enumerate(self.geometry.indices)}
+        out = bytearray(MAGIC)
+        write_varint(out, VERSION)
+        write_varint(out, self.geometry.size)
+        stream.write(out)
+
+    def _space(self, coord) -> int:
+        return self._numbers[self.geometry.index[tuple(coord)]]
+
+    def on_turn(self, metrics: TurnMetrics):
+        out = bytearray()
+        if metrics.winner is None:
+            write_varint(out, _TURN)
+            write_varint(out, self._space(metrics.dig))
+            if metrics.move is None:
+                write_varint(out, 0)
+            else:
+                write_varint(out, self._space(metrics.move[0]) + 1)
+                write_varint(out, self._space(metrics.move[1]))
+            write_varint(out, len(metrics.removed))
+            for coord in metrics.removed:
+                write_varint(out, self._space(coord))
+            write_varint(out, round(1000 * metrics.phases.get("think_mine", 0.0)))
+            write_varint(out, round(1000 * metrics.phases.get("think_move", 0.0)))
+            self.stream.write(out)
+            return
+        write_varint(out, _END)
+        write_varint(out, metrics.winner.value)
+        write_varint(out, 0 if metrics.dig is None else self._space(metrics.dig) + 1)
+        self.stream.write(out)
+        self.stream.flush()
+
+
+def parse_records(data: bytes) -> Iterator[GameRecord]:
+    """
+    Decode every game record in some bytes
+
+    Args:
+        data (bytes): One or more records, one after another
+
+    Raises:
+        ValueError: The data isn't a game record or is cut off mid-entry
+
+    Yields:
+        GameRecord: Each game, in order
+    """
+    position = 0
+    while position < len(data):
+        if data[position : position + len(MAGIC)] != MAGIC:
+            raise ValueError(f"No game record starts at byte {position}")
+        version, position = read_varint(data, position + len(MAGIC))
+        if version != VERSION:
+            raise ValueError(f"Unknown game record version {version}")
+        size, position = read_varint(data, position)
+        coords = [geometry(size).coords[i] for i in geometry(size).indices]
+        record = GameRecord(size)
+        color = Space.RED
+        while position < len(data) and record.winner is None:
+            tag, position = read_varint(data, position)
+            if tag == _END:
+                winner, position = read_varint(data, position)
+                dig, position = read_varint(data, position)
+                record.winner = Space(winner)
+                record.last_dig = coords[dig - 1] if dig else None
+                continue
+            if tag != _TURN:
+                raise ValueError(f"Unknown game record entry {tag}")
+            dig, position = read_varint(data, position)
+            start, position = read_varint(data, position)
+            move = None
+            if start:
+                end, position = read_varint(data, position)
+                move = (coords[start - 1], coords[end])
+            count, position = read_varint(data, position)
+            removed = []
+            for _ in range(count):
+                space, position = read_varint(data, position)
+                removed.append(coords[space])
+            mine_ms, position = read_varint(data, position)
+            move_ms, position = read_varint(data, position)
+            record.turns.append(
+                RecordedTurn(
+                    color,
+                    coords[dig],  # type: ignore
+                    move,  # type: ignore
+                    removed,  # type: ignore
+                    mine_ms / 1000,
+                    move_ms / 1000,
+                )
+            )
+            color = opponent(color)
+        yield record
+
+
+def read_records(stream: BinaryIO) -> Iterator[GameRecord]:
+    """
+    Decode every game record in a binary file
+
+    Args:
+        stream (BinaryIO): The file, read to the end
+
+    Yields:
+        GameRecord: Each game, in order
+    """
+    yield from parse_records(stream.read())
+
+
+def replay(record: GameRecord, verify: bool = True) -> Iterator[Board]:
+    """
+    Play a recorded game back, the same way Game.step played it
+
+    Args:
+        record (GameRecord): The game
+        verify (bool, optional): Check that every turn was legal and removed
+            the recorded miners. Defaults to True.
+
+    Raises:
+        ValueError: A turn doesn't match the rules or the record, when verifying
+
+    Yields:
+        Board: The starting position, then the position after every turn. It
+            is the same board each time, changed in place; copy it to keep it.
+    """
+    board = Board(small=record.size == 5)
+    yield board
+    for n, turn in enumerate(record.turns):
+        color = turn.color
+        # Game only checks the mining rule, not whether the player can reach it
+        if verify and not board.is_mineable(turn.dig):
+            raise ValueError(f"Turn {n}: {color.name} can't dig at {turn.dig}")
+        board[turn.dig] = (
+            Space.EMPTY if board.count_elements(color) == board.miner_count else color
+        )
+        if turn.move is not None:
+            start, end = turn.move
+            if verify and (
+                board[start] != color or end not in board.walkable_from_coord(start)
+            ):
+                raise ValueError(f"Turn {n}: {color.name} can't move {turn.move}")
+            board[start] = Space.EMPTY
+            board[end] = color
+        removed = board.clear_dead(opponent(color))
+        if verify and removed != set(turn.removed):
+            raise ValueError(
+                f"Turn {n}: removed {sorted(removed)}, recorded {turn.removed}"
+            )
+        yield board
+    if record.last_dig is not None:
+        color = Space.RED if len(record.turns) % 2 == 0 else Space.BLUE
+        board[record.last_dig] = (
+            Space.EMPTY if board.count_elements(color) == board.miner_count else color
+        )
+        yield board
@@ -0,0 +1,807 @@
+from copy import copy
+from dataclasses import dataclass
+import multiprocessing
+import multiprocessing.pool
+from random import Random
+import time
+import weakref
+from typing import Any, Callable, Generic, NamedTuple, Sequence, TypeVar
+
+from board import Board, Space
+from symmetry import symmetries
+
+
+Move = TypeVar("Move")
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside a search when its deadline has passed
+    """
+
+
+@dataclass
+class SearchResult(Generic[Move]):
+    """
+    The outcome of an iterative deepening search
+
+    Attributes:
+        move: The best move found, or None if there were no moves to search
+        score: Its minimax value from the root player's point of view
+        depth: The deepest iteration that finished
+        nodes: How many positions were visited across all iterations
+    """
+
+    move: Move | None
+    score: float
+    depth: int
+    nodes: int
+
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+# Depth recorded for results whose whole subtree was searched to the end
+EXHAUSTED = 1 << 20
+# Mixed into Board.zobrist when blue is to move
+_BLUE_TO_MOVE = Random(0).getrandbits(64)
+
+
+class Entry(NamedTuple):
+    """
+    One stored search result
+
+    Attributes:
+        key: The full key of the position, to detect index collisions
+        depth: How deep the position was searched
+        value: Its minimax value, or a bound on it
+        flag: EXACT, LOWER (value is a lower bound) or UPPER (value is an upper bound)
+        move: The best move found there, if any
+        age: The search that stored it
+    """
+
+    key: int
+    depth: int
+    value: float
+    flag: int
+    move: Any
+    age: int
+
+
+class TranspositionTable:
+    """
+    A fixed-size table of search results keyed by position and side to move.
+
+    Each slot holds one entry. A new result replaces the one in its slot if the
+    slot holds the same position, holds a result left over from an older search,
+    or holds a result that was searched no deeper than the new one.
+    """
+
+    def __init__(self, size: int = 1 << 17):
+        """
+        Args:
+            size (int, optional): The number of slots, which caps memory use.
+                Defaults to 1 << 17.
+        """
+        self.size = size
+        self._slots: list[Entry | None] = [None] * size
+        self.age = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+
+    @staticmethod
+    def key(board: Board, to_move: Space) -> int:
+        """
+        Build the table key for a position
+
+        Args:
+            board (Board): The position
+            to_move (Space): The player to move
+
+        Returns:
+            int: The key
+        """
+        return board.zobrist ^ _BLUE_TO_MOVE if to_move == Space.BLUE else board.zobrist
+
+    @staticmethod
+    def canonical_key(board: Board, to_move: Space) -> tuple[int, int]:
+        """
+        Build a table key that is the same for every rotation and reflection
+        of a position
+
+        Args:
+            board (Board): The position
+            to_move (Space): The player to move
+
+        Returns:
+            tuple[int, int]: The key, and the symmetry that turns the position
+                into the orientation the key describes (see symmetry.py)
+        """
+        key, symmetry = symmetries(board.size).canonical(board)
+        return (key ^ _BLUE_TO_MOVE if to_move == Space.BLUE else key), symmetry
+
+    def probe(self, key: int) -> Entry | None:
+        """
+        Look up a position
+
+        Args:
+            key (int): The position's key
+
+        Returns:
+            Entry | None: The stored result, if there is one
+        """
+        self.probes += 1
+        entry = self._slots[key % self.size]
+        if entry is None or entry.key != key:
+            return None
+        self.hits += 1
+        return entry
+
+    def store(self, key: int, depth: int, value: float, flag: int, move: Any):
+        """
+        Record a search result, if the replacement policy allows it
+
+        Args:
+            key (int): The position's key
+            depth (int): How deep it was searched
+            value (float): The value found
+            flag (int): EXACT, LOWER or UPPER
+            move (Any): The best move found, if any
+        """
+        index = key % self.size
+        old = self._slots[index]
+        if old is not None:
+            if old.key == key:
+                if depth < old.depth and old.age == self.age:
+                    return
+            elif old.age == self.age and depth < old.depth:
+                return
+            else:
+                self.replacements += 1
+        self.stores += 1
+        self._slots[index] = Entry(key, depth, value, flag, move, self.age)
+
+    def new_search(self):
+        """
+        Mark everything stored so far as old, so it gives way to new results
+        """
+        self.age += 1
+
+    def clear(self):
+        """
+        Forget every stored result
+        """
+        self._slots = [None] * self.size
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Results aren't worth sending to another process, and an empty list
+        # of slots pickles to hundreds of kilobytes, so a copy starts empty
+        state = self.__dict__.copy()
+        del state["_slots"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__dict__.update(state)
+        self.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        The fraction of probes that found their position
+        """
+        return self.hits / self.probes if self.probes else 0.0
+
+    def stats(self) -> dict[str, float]:
+        """
+        Summarize how the table has been used, for tuning its size
+
+        Returns:
+            dict[str, float]: Probe, hit, store and replacement counts, the hit
+                rate, and the fraction of slots in use
+        """
+        return {
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate,
+            "stores": self.stores,
+            "replacements": self.replacements,
+            "fill": sum(entry is not None for entry in self._slots) / self.size,
+        }
+
+
+class Clock:
+    """
+    Tracks a bot's time the same way Game does, from inside the bot's process.
+
+    Each turn may spend time_per_move for free plus whatever is left of the
+    reserve. A turn is normally held to time_per_move (minus a safety margin
+    for the time it takes Game to hand the board over), but critical positions
+    may borrow a share of the remaining reserve.
+    """
+
+    def __init__(
+        self,
+        time_per_move: float = 3.0,
+        reserve_time: float = 10.0,
+        margin: float = 0.25,
+        reserve_share: float = 0.25,
+    ):
+        """
+        Args:
+            time_per_move (float, optional): Should match the Game. Defaults to 3.0.
+            reserve_time (float, optional): Should match the Game. Defaults to 10.0.
+            margin (float, optional): Seconds per turn to leave unused as a safety
+                buffer. Defaults to 0.25.
+            reserve_share (float, optional): Fraction of the remaining reserve a
+                critical turn may use. Defaults to 0.25.
+        """
+        self.time_per_move = time_per_move
+        self.reserve_time = reserve_time
+        self.margin = margin
+        self.reserve_share = reserve_share
+        self.budget = time_per_move
+        self.used = 0.0
+        self._phase_start: float | None = None
+
+    def start_turn(self, critical: bool = False):
+        """
+        Begin a new turn and decide how much time it gets
+
+        Args:
+            critical (bool, optional): Whether this position deserves reserve time.
+                Defaults to False.
+        """
+        self.used = 0.0
+        self.budget = self.time_per_move - self.margin
+        if critical:
+            self.budget += self.reserve_share * self.reserve_time
+        self.budget = max(self.budget, 0.0)
+
+    def phase(self, share: float = 1.0) -> float:
+        """
+        Begin one phase (mine or move) of the current turn
+
+        Args:
+            share (float, optional): Fraction of the turn's remaining time this
+                phase may use. Defaults to 1.0.
+
+        Returns:
+            float: The time.monotonic() deadline for this phase
+        """
+        self._phase_start = time.monotonic()
+        return self._phase_start + share * max(0.0, self.budget - self.used)
+
+    def stop(self):
+        """
+        End the current phase, charging its time to the turn
+        """
+        if self._phase_start is not None:
+            self.used += time.monotonic() - self._phase_start
+            self._phase_start = None
+
+    def finish_turn(self):
+        """
+        End the current phase and the turn, charging any overtime to the reserve
+        """
+        self.stop()
+        self.reserve_time = max(
+            0.0, self.reserve_time - max(0.0, self.used - self.time_per_move)
+        )
+
+
+class MoveOrderer(Generic[Move]):
+    """
+    Decides which moves to try first, so alpha-beta cuts off as early as possible.
+
+    The transposition table's best move for the position goes first, then up to
+    two killer moves (moves that caused a cutoff elsewhere at the same ply), then
+    everything else by its history score: how much cutoff-causing work the move
+    has done for that player. History is kept across iterations and searches,
+    halving at the start of each search so old knowledge fades.
+    """
+
+    def __init__(self):
+        self.killers: list[list[Move]] = []
+        self.history: dict[tuple[Space, Move], int] = {}
+
+    def new_search(self):
+        """
+        Forget the killer moves and fade the history scores
+        """
+        self.killers = []
+        self.history = {key: score >> 1 for key, score in self.history.items() if score > 1}
+
+    def order(
+        self, moves: list[Move], color: Space, ply: int, best: Move | None = None
+    ) -> list[Move]:
+        """
+        Sort moves into the order they should be searched in
+
+        Args:
+            moves (list[Move]): The moves available
+            color (Space): The player making them
+            ply (int): How many moves deep in the search this position is
+            best (Move | None, optional): The best move found here before, e.g. by
+                the transposition table. Defaults to None.
+
+        Returns:
+            list[Move]: The same moves, most promising first
+        """
+        killers = self.killers[ply] if ply < len(self.killers) else []
+        history = self.history
+
+        def priority(move: Move) -> float:
+            if move == best:
+                return float("inf")
+            if move in killers:
+                return 1e18 - killers.index(move)
+            return history.get((color, move), 0)
+
+        return sorted(moves, key=priority, reverse=True)
+
+    def cutoff(self, move: Move, color: Space, ply: int, depth: int):
+        """
+        Record that a move caused a cutoff
+
+        Args:
+            move (Move): The move
+            color (Space): The player who made it
+            ply (int): How many moves deep in the search it was made
+            depth (int): How much search remained below it
+        """
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        key = (color, move)
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+
+class Searcher(Generic[Move]):
+    """
+    Iterative deepening minimax with alpha-beta pruning, played out on a single
+    board with push/pop instead of copies.
+
+    A searcher is built from three functions: one that lists the moves available
+    to a player, one that plays a move on the board with exactly one push, and
+    one that scores a board from the root player's point of view.
+
+    Results are kept in a TranspositionTable that lives as long as the searcher,
+    so later iterations and later turns can reuse them, and moves are tried in
+    the order a MoveOrderer suggests.
+
+    With more than one worker the root moves are split between a pool of
+    processes (root splitting). Each deepens on its own share of the moves with
+    its own table until the same deadline, and the answers are compared at the
+    deepest iteration they all finished.
+    """
+
+    def __init__(
+        self,
+        evaluate: Callable[[Board, Space], float],
+        generate: Callable[[Board, Space], list[Move]],
+        play: Callable[[Board, Move, Space], None],
+        max_depth: int = 64,
+        table_size: int = 1 << 17,
+        ordering: bool = True,
+        workers: int = 1,
+        join_slack: float = 0.05,
+        evaluate_batch: Callable[[list[bytes], Space], Sequence[float]] | None = None,
+        symmetric: bool = False,
+    ):
+        """
+        Args:
+            evaluate (Callable[[Board, Space], float]): Scores a board for a player
+            generate (Callable[[Board, Space], list[Move]]): Lists a player's moves
+            play (Callable[[Board, Move, Space], None]): Plays a move with one push
+            max_depth (int, optional): The deepest iteration to run. Defaults to 64.
+            table_size (int, optional): Slots in the transposition table.
+                Defaults to 1 << 17.
+            ordering (bool, optional): Whether to order moves. Turning it off
+                is only useful for measuring what it saves. Defaults to True.
+            workers (int, optional): Processes to split the root moves between.
+                With 1 the search runs in this process and is deterministic
+                for a given depth limit. Defaults to 1.
+            join_slack (float, optional): Seconds past the deadline to wait for
+                the workers' answers to arrive. Defaults to 0.05.
+            evaluate_batch (Callable[[list[bytes], Space], Sequence[float]] | None,
+                optional): Scores many boards, given as Board.cell_bytes(), in one
+                call. If given, the children of each node one step above the
+                depth limit are scored together with it instead of one by one.
+                Defaults to None.
+            symmetric (bool, optional): Whether rotations and reflections of a
+                position share one transposition table entry. It costs a
+                canonical hash per node, and the moves and evaluation have to
+                play the same in every orientation. Defaults to False.
+        """
+        self.evaluate = evaluate
+        self.evaluate_batch = evaluate_batch
+        self.generate = generate
+        self.play = play
+        self.max_depth = max_depth
+        self.symmetric = symmetric
+        self.table = TranspositionTable(table_size)
+        self._table_color: Space | None = None
+        self.orderer: MoveOrderer[Move] | None = MoveOrderer() if ordering else None
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self._deadline = float("inf")
+        self._truncated = False
+        self._partial: tuple[float, Move] | None = None
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, not {workers}")
+        self.workers = workers
+        self.join_slack = join_slack
+        self._pool: multiprocessing.pool.Pool | None = None
+        self._finalizer: weakref.finalize | None = None
+
+    def search(
+        self, board: Board, color: Space, deadline: float, max_depth: int | None = None
+    ) -> SearchResult[Move]:
+        """
+        Search deeper and deeper until the deadline, keeping the answer from the
+        last depth that finished
+
+        Args:
+            board (Board): The position to search. It is searched on a copy.
+            color (Space): The player to move, who is maximizing
+            deadline (float): The time.monotonic() time to stop by
+            max_depth (int | None, optional): Don't search deeper than this.
+                Defaults to the searcher's max_depth.
+
+        Returns:
+            SearchResult[Move]: The best move found and how it was found
+        """
+        board = copy(board)
+        max_depth = self.max_depth if max_depth is None else max_depth
+        self._start(color, deadline)
+        moves = self.generate(board, color)
+        if len(moves) <= 1:
+            return SearchResult(
+                moves[0] if moves else None, self.evaluate(board, color), 0, 0
+            )
+        if self.workers > 1:
+            return self._search_split(board, color, moves, deadline, max_depth)
+        results, _ = self._deepen(board, color, moves, max_depth)
+        if not results:
+            return SearchResult(moves[0], self.evaluate(board, color), 0, self.nodes)
+        result = results[-1]
+        result.nodes = self.nodes
+        return result
+
+    def _start(self, color: Space, deadline: float):
+        self.nodes = self.cutoffs = self.first_move_cutoffs = 0
+        self._deadline = deadline
+        if self.orderer is not None:
+            self.orderer.new_search()
+        # Scores are stored from the root player's point of view
+        if color != self._table_color:
+            self.table.clear()
+            self._table_color = color
+        self.table.new_search()
+
+    def _deepen(
+        self, board: Board, color: Space, moves: list[Move], max_depth: int
+    ) -> tuple[list[SearchResult[Move]], bool]:
+        # Run the iterations over the given root moves until the deadline.
+        # Returns the result of every iteration that finished, preceded by a
+        # depth 0 result if only part of the first one did, and whether the
+        # whole game tree below these moves was searched
+        results: list[SearchResult[Move]] = []
+        moves = list(moves)
+        last_duration = previous_duration = 0.0
+        for depth in range(1, max_depth + 1):
+            started = time.monotonic()
+            # Don't start an iteration that can't be expected to finish
+            if previous_duration > 0 and (
+                started + last_duration * last_duration / previous_duration
+                > self._deadline
+            ):
+                break
+            self._truncated = False
+            try:
+                score, move = self._root(board, color, moves, depth)
+            except SearchTimeout:
+                # Even a partly searched first iteration beats no search at all
+                if not results and self._partial is not None:
+                    score, move = self._partial
+                    results.append(SearchResult(move, score, 0, self.nodes))
+                break
+            results.append(SearchResult(move, score, depth, self.nodes))
+            # Put the best move first so the next iteration tries it first
+            if self.orderer is not None:
+                moves = self.orderer.order(moves, color, 0, move)
+            else:
+                moves.remove(move)
+                moves.insert(0, move)
+            if not self._truncated:
+                return results, True  # Deeper can't change anything
+            previous_duration = last_duration
+            last_duration = max(time.monotonic() - started, 1e-6)
+        return results, False
+
+    def _search_split(
+        self,
+        board: Board,
+        color: Space,
+        moves: list[Move],
+        deadline: float,
+        max_depth: int,
+    ) -> SearchResult[Move]:
+        # Deal the root moves out to the pool like cards so every worker gets
+        # some of the promising ones, and let each deepen on its share
+        if self.orderer is not None:
+            moves = self.orderer.order(moves, color, 0, None)
+        shares = [moves[i :: self.workers] for i in range(self.workers)]
+        pending = [
+            self._get_pool().apply_async(
+                _search_share, (board, color, share, deadline, max_depth)
+            )
+            for share in shares
+            if share
+        ]
+        outcomes = []
+        for job in pending:
+            wait = max(0.0, deadline - time.monotonic()) + self.join_slack
+            try:
+                outcomes.append(job.get(None if wait == float("inf") else wait))
+            except multiprocessing.TimeoutError:
+                pass  # A worker that misses the deadline doesn't get a say
+        self.nodes = sum(outcome[2] for outcome in outcomes)
+        # The workers' table use counts as this searcher's, for reports
+        self.table.hits += sum(outcome[3] for outcome in outcomes)
+        self.table.probes += sum(outcome[4] for outcome in outcomes)
+        outcomes = [(results, done) for results, done, *_ in outcomes if results]
+        # Each share's best move is worth trying early in the next search
+        if self.orderer is not None:
+            for results, _ in outcomes:
+                self.orderer.cutoff(results[-1].move, color, 0, results[-1].depth)
+        if not outcomes:
+            return SearchResult(moves[0], self.evaluate(board, color), 0, self.nodes)
+        # Scores are only comparable at the same depth, so compare the workers at
+        # the deepest iteration all of them finished. A worker that searched its
+        # whole tree has the final answer for any depth.
+        depth = min(
+            EXHAUSTED if done else results[-1].depth for results, done in outcomes
+        )
+        best: SearchResult[Move] | None = None
+        for results, done in outcomes:
+            result = next((r for r in results if r.depth == depth), results[-1])
+            if best is None or result.score > best.score:
+                best = result
+        assert best is not None
+        if depth == EXHAUSTED:
+            depth = max(results[-1].depth for results, _ in outcomes)
+        return SearchResult(best.move, best.score, depth, self.nodes)
+
+    def _get_pool(self) -> multiprocessing.pool.Pool:
+        if self._pool is None:
+            # Each pool process gets its own single-process copy of this
+            # searcher, with its own table, kept for the life of the pool
+            self._pool = multiprocessing.Pool(
+                self.workers, initializer=_start_worker, initargs=(self,)
+            )
+            self._finalizer = weakref.finalize(self, self._pool.terminate)
+        return self._pool
+
+    def close(self):
+        """
+        Stop the worker processes of a parallel searcher, if they were started
+        """
+        if self._pool is not None:
+            self._finalizer()
+            self._pool = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Pools can't be sent to other processes, and a copy starts out fresh
+        state = self.__dict__.copy()
+        state["_pool"] = state["_finalizer"] = None
+        state["table"] = TranspositionTable(self.table.size)
+        state["_table_color"] = None
+        return state
+
+    def _root(
+        self, board: Board, color: Space, moves: list[Move], depth: int
+    ) -> tuple[float, Move]:
+        alpha = float("-inf")
+        best_move = moves[0]
+        self._partial = None
+        for move in moves:
+            self.play(board, move, color)
+            try:
+                evaluation = self._minimax(
+                    board, color, depth - 1, 1, alpha, float("inf"), maximizing=False
+                )
+            finally:
+                board.pop()
+            if evaluation > alpha:
+                alpha, best_move = evaluation, move
+                self._partial = (alpha, best_move)
+        return alpha, best_move
+
+    def _minimax(
+        self,
+        board: Board,
+        color: Space,
+        depth: int,
+        ply: int,
+        alpha: float,
+        beta: float,
+        maximizing: bool,
+    ) -> float:
+        self.nodes += 1
+        if time.monotonic() > self._deadline:
+            raise SearchTimeout
+        if depth == 0:
+            self._truncated = True
+            return self.evaluate(board, color)
+        current_color = color if maximizing else opponent(color)
+        if self.symmetric:
+            key, symmetry = self.table.canonical_key(board, current_color)
+        else:
+            key, symmetry = self.table.key(board, current_color), 0
+        entry = self.table.probe(key)
+        if entry is not None and entry.depth >= depth:
+            if entry.depth < EXHAUSTED:
+                self._truncated = True
+            if entry.flag == EXACT:
+                return entry.value
+            if entry.flag == LOWER:
+                alpha = max(alpha, entry.value)
+            else:
+                beta = min(beta, entry.value)
+            if beta <= alpha:
+                return entry.value
+        moves = self.generate(board, current_color)
+        if not moves:
+            value = self.evaluate(board, color)
+            self.table.store(key, EXHAUSTED, value, EXACT, None)
+            return value
+        if depth == 1 and self.evaluate_batch is not None:
+            return self._frontier(
+                board, color, key, symmetry, moves, current_color, maximizing
+            )
+        if self.orderer is not None:
+            best = None if entry is None else entry.move
+            if symmetry and best is not None:
+                best = symmetries(board.size).from_canonical(best, symmetry)
+            moves = self.orderer.order(moves, current_color, ply, best)
+        original_alpha, original_beta = alpha, beta
+        truncated, self._truncated = self._truncated, False
+        best_move = None
+        if maximizing:
+            value = float("-inf")
+            for move in moves:
+                self.play(board, move, current_color)
+                try:
+                    evaluation = self._minimax(
+                        board, color, depth - 1, ply + 1, alpha, beta, False
+                    )
+                finally:
+                    board.pop()
+                if evaluation > value:
+                    value, best_move = evaluation, move
+                alpha = max(alpha, value)
+                if beta <= alpha:
+                    self._cutoff(move, current_color, ply, depth, moves)
+                    break
+        else:
+            value = float("inf")
+            for move in moves:
+                self.play(board, move, current_color)
+                try:
+                    evaluation = self._minimax(
+                        board, color, depth - 1, ply + 1, alpha, beta, True
+                    )
+                finally:
+                    board.pop()
+                if evaluation < value:
+                    value, best_move = evaluation, move
+                beta = min(beta, value)
+                if beta <= alpha:
+                    self._cutoff(move, current_color, ply, depth, moves)
+                    break
+        if value <= original_alpha:
+            flag = UPPER
+        elif value >= original_beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        if symmetry and best_move is not None:
+            best_move = symmetries(board.size).to_canonical(best_move, symmetry)
+        # A subtree that never hit the depth limit is good for any depth
+        self.table.store(key, depth if self._truncated else EXHAUSTED, value, flag, best_move)
+        self._truncated = self._truncated or truncated
+        return value
+
+    def _frontier(
+        self,
+        board: Board,
+        color: Space,
+        key: int,
+        symmetry: int,
+        moves: list[Move],
+        current_color: Space,
+        maximizing: bool,
+    ) -> float:
+        # Score every child of a node just above the depth limit in one batch.
+        # Nothing is pruned among them, so the value is exact.
+        children = []
+        for move in moves:
+            self.play(board, move, current_color)
+            children.append(board.cell_bytes())
+            board.pop()
+        self.nodes += len(children)
+        self._truncated = True
+        scores = self.evaluate_batch(children, color)  # type: ignore
+        pick = max if maximizing else min
+        best = pick(range(len(moves)), key=scores.__getitem__)
+        value = float(scores[best])
+        move = moves[best]
+        if symmetry:
+            move = symmetries(board.size).to_canonical(move, symmetry)
+        self.table.store(key, 1, value, EXACT, move)
+        return value
+
+    def _cutoff(self, move: Move, color: Space, ply: int, depth: int, moves: list[Move]):
+        self.cutoffs += 1
+        if move is moves[0]:
+            self.first_move_cutoffs += 1
+        if self.orderer is not None:
+            self.orderer.cutoff(move, color, ply, depth)
+
+    def stats(self) -> dict[str, float]:
+        """
+        Summarize the last search, to measure how well moves are being ordered
+
+        Returns:
+            dict[str, float]: Nodes visited, cutoffs, the fraction of cutoffs
+                made by the first move tried, and the transposition table's stats
+        """
+        return {
+            "nodes": self.nodes,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoff_rate": (
+                self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+            ),
+            **{f"table_{name}": value for name, value in self.table.stats().items()},
+        }
+
+
+# The searcher a pool process works for, set when the process starts
+_worker_searcher: Searcher | None = None
+
+
+def _start_worker(searcher: Searcher):
+    global _worker_searcher
+    searcher.workers = 1
+    searcher._pool = searcher._finalizer = None
+    _worker_searcher = searcher
+
+
+def _search_share(
+    board: Board, color: Space, moves: list, deadline: float, max_depth: int
+) -> tuple[list[SearchResult], bool, int, int, int]:
+    # Runs in a pool process: deepen on one share of the root moves. Also
+    # returns the node count and the table hits and probes it took.
+    searcher = _worker_searcher
+    assert searcher is not None
+    hits, probes = searcher.table.hits, searcher.table.probes
+    searcher._start(color, deadline)
+    results, done = searcher._deepen(board, color, moves, max_depth)
+    return (
+        results,
+        done,
+        searcher.nodes,
+        searcher.table.hits - hits,
+        searcher.table.probes - probes,
+    )
+
+
+def opponent(color: Space) -> Space:
+    return Space.RED if color == Space.BLUE else Space.BLUE
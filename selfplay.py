@@ -0,0 +1,277 @@
+"""
+Play many games quickly between in-process policies, for rollouts and for
+collecting training positions.
+
+    python selfplay.py random greedy --games 1000 --size small --out positions.jsonl
+
+Unlike Game there are no worker processes and no clocks. The games are played
+in lockstep: every unfinished game takes its turn before any game takes the
+next one, so a policy gets one call per turn with the boards of all the games
+at once. The rules, including how a game is won, are the same as Game.step.
+"""
+
+import argparse
+from dataclasses import dataclass, field
+import json
+from random import Random
+from typing import Callable, Iterator
+
+import numpy as np
+
+from board import Board, Space, Turn
+from evaluation import batch_heuristic
+from search import opponent
+
+
+# Chooses a whole turn (dig, then move or None) for each board, all for the same color
+Policy = Callable[[list[Board], Space, Random], list[Turn]]
+
+
+@dataclass
+class Position:
+    """
+    One position of a simulated game, with the turn played from it
+
+    Attributes:
+        game: Which game of the batch it's from
+        ply: How many turns were played before it
+        color: The player to move
+        cells: The board, as Board.cell_bytes()
+        turn: The turn the policy chose, or None if the player couldn't dig
+        winner: Who went on to win the game
+    """
+
+    game: int
+    ply: int
+    color: Space
+    cells: bytes
+    turn: Turn | None
+    winner: Space | None = None
+
+    def to_json(self) -> dict:
+        """
+        Convert to something json.dumps accepts
+
+        Returns:
+            dict: The fields, with colors as names and the board as hex
+        """
+        return {
+            "game": self.game,
+            "ply": self.ply,
+            "color": self.color.name,
+            "cells": self.cells.hex(),
+            "turn": self.turn,
+            "winner": None if self.winner is None else self.winner.name,
+        }
+
+
+@dataclass
+class SimulatedGame:
+    """
+    The outcome of one simulated game
+
+    Attributes:
+        board: The final position
+        winner: Who won
+        reason: "no_mineable" if the loser had nothing to dig, "illegal_dig" or
+            "illegal_move" if the loser's policy broke the rules
+        plies: How many turns were played
+        positions: Every position the game passed through, if recorded
+    """
+
+    board: Board
+    winner: Space | None = None
+    reason: str = ""
+    plies: int = 0
+    positions: list[Position] = field(default_factory=list)
+
+
+def random_policy(boards: list[Board], color: Space, rng: Random) -> list[Turn]:
+    """
+    Play like RandomPlayer: dig anywhere reachable, then move a random miner to a
+    random space it can walk to, if it has one
+    """
+    turns = []
+    for board in boards:
+        dig = rng.choice(sorted(board.mineable_by_player(color)))
+        board.push_mine(dig, color)
+        start = rng.choice(sorted(board.find_all(color)))
+        ends = sorted(board.walkable_from_coord(start))
+        board.pop()
+        turns.append((dig, (start, rng.choice(ends)) if ends else None))
+    return turns
+
+
+def greedy_policy(boards: list[Board], color: Space, rng: Random) -> list[Turn]:
+    """
+    Play the turn that leads to the best Smart_Bot heuristic, breaking ties at
+    random. Every turn of every board is scored in one batch.
+    """
+    options: list[list[Turn]] = []
+    children: list[bytes] = []
+    for board in boards:
+        turns = []
+        for turn in board.iter_turns(color):
+            turns.append(turn)
+            children.append(board.cell_bytes())
+        options.append(turns)
+    scores = batch_heuristic(children, color)
+    out = []
+    offset = 0
+    for turns in options:
+        mine = scores[offset : offset + len(turns)]
+        offset += len(turns)
+        best = np.flatnonzero(mine == mine.max())
+        out.append(turns[best[rng.randrange(len(best))]])
+    return out
+
+
+POLICIES: dict[str, Policy] = {"random": random_policy, "greedy": greedy_policy}
+
+
+def play_turn(board: Board, turn: Turn, color: Space) -> str:
+    """
+    Play a turn with the same steps and checks as Game.step
+
+    Args:
+        board (Board): The board to play on
+        turn (Turn): The dig and the optional move
+        color (Space): The player taking the turn
+
+    Returns:
+        str: "illegal_dig" or "illegal_move" if the turn broke the rules, in
+            which case the player loses, otherwise ""
+    """
+    dig, move = turn
+    if not board.is_mineable(dig):
+        return "illegal_dig"
+    board[dig] = (
+        Space.EMPTY if board.count_elements(color) == board.miner_count else color
+    )
+    if move is not None:
+        start, end = move
+        if board[start] != color or end not in board.walkable_from_coord(start):
+            return "illegal_move"
+        board[start] = Space.EMPTY
+        board[end] = color
+    board.clear_dead(opponent(color))
+    return ""
+
+
+def simulate(
+    red: Policy,
+    blue: Policy,
+    games: int = 1,
+    small: bool = True,
+    seed: int | None = None,
+    record: bool = True,
+) -> list[SimulatedGame]:
+    """
+    Play a batch of games to the end in lockstep
+
+    Args:
+        red (Policy): Chooses red's turns
+        blue (Policy): Chooses blue's turns
+        games (int, optional): How many games to play. Defaults to 1.
+        small (bool, optional): Whether to play on the small board. Defaults to True.
+        seed (int | None, optional): Seeds the policies' random choices, for
+            repeatable batches. Defaults to None.
+        record (bool, optional): Whether to keep every position. Defaults to True.
+
+    Returns:
+        list[SimulatedGame]: The games, in order
+    """
+    rng = Random(seed)
+    results = [SimulatedGame(Board(small)) for _ in range(games)]
+    active = list(range(games))
+    color = Space.RED
+    ply = 0
+    while active:
+        # The same check Game.step starts each turn with
+        playing = []
+        for n in active:
+            board = results[n].board
+            if board.mineable_by_player(color):
+                playing.append(n)
+            else:
+                results[n].winner, results[n].reason = opponent(color), "no_mineable"
+                if record:
+                    results[n].positions.append(
+                        Position(n, ply, color, board.cell_bytes(), None)
+                    )
+        policy = red if color == Space.RED else blue
+        boards = [results[n].board for n in playing]
+        turns = policy(boards, color, rng) if playing else []
+        active = []
+        for n, turn in zip(playing, turns):
+            result = results[n]
+            if record:
+                result.positions.append(
+                    Position(n, ply, color, result.board.cell_bytes(), turn)
+                )
+            reason = play_turn(result.board, turn, color)
+            result.plies += 1
+            if reason:
+                result.winner, result.reason = opponent(color), reason
+            else:
+                active.append(n)
+        ply += 1
+        color = opponent(color)
+    for result in results:
+        for position in result.positions:
+            position.winner = result.winner
+    return results
+
+
+def positions(games: list[SimulatedGame]) -> Iterator[Position]:
+    """
+    Go through the recorded positions of a batch of games
+
+    Args:
+        games (list[SimulatedGame]): Games from simulate
+
+    Yields:
+        Position: Each position of each game, in order
+    """
+    for game in games:
+        yield from game.positions
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("red", choices=sorted(POLICIES))
+    parser.add_argument("blue", choices=sorted(POLICIES))
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=256, help="games per lockstep batch")
+    parser.add_argument("--size", choices=["small", "large"], default="small")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--out", help="write every position to this JSONL file")
+    args = parser.parse_args(argv)
+    rng = Random(args.seed)
+    wins = {Space.RED: 0, Space.BLUE: 0}
+    out = open(args.out, "w") if args.out else None
+    try:
+        for start in range(0, args.games, args.batch):
+            batch = simulate(
+                POLICIES[args.red],
+                POLICIES[args.blue],
+                min(args.batch, args.games - start),
+                args.size == "small",
+                rng.getrandbits(32),
+                record=out is not None,
+            )
+            for game in batch:
+                wins[game.winner] += 1  # type: ignore
+            if out is not None:
+                for position in positions(batch):
+                    record = position.to_json()
+                    record["game"] += start
+                    out.write(json.dumps(record) + "\n")
+    finally:
+        if out is not None:
+            out.close()
+    print(f"red ({args.red}) {wins[Space.RED]} - {wins[Space.BLUE]} blue ({args.blue})")
+
+
+if __name__ == "__main__":
+    main()
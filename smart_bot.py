@@ -1,110 +1,104 @@
 #Nathan Liu, Jack Xie
 
-from dataclasses import dataclass
-import time
+from copy import copy
+import os
 from random import choice
 from typing import Optional
-from board import Board, Space, Coordinate
-from copy import copy
+from board import Board, Space, Coordinate, Turn
+from book import DEFAULT_PATH, OpeningBook
+from evaluation import batch_heuristic
+from search import Clock, Searcher, opponent
 
 class Smart_Bot:
     count = 0
-    def __init__(self):
+    def __init__(self, time_per_move: float = 3.0, reserve_time: float = 10.0, workers: int = 1, batch_leaves: bool = False,
+                 book_path: Optional[str] = DEFAULT_PATH):
         
         self.name = f"Smart_Bot"
         Smart_Bot.count += 1
-        self.max_depth = 2
-        self.transposition_table = {}
+        self.clock = Clock(time_per_move, reserve_time) #Should match the Game's time control
+        #batch_leaves scores the last ply all at once with numpy, but gives up alpha-beta pruning there, which usually costs more than it saves
+        self.turn_search = Searcher(self.heuristic, self.possible_turns, self.apply_turn, workers=workers,
+                                    evaluate_batch=batch_heuristic if batch_leaves else None) #Searches whole turns (dig + move), split over worker processes if workers > 1
+        self.move_search = Searcher(self.heuristic, self.possible_moves, self.apply_move) #Backup if the dig didn't go as planned
+        self.plan = None #Board we expect to be asked to move on, and the move we picked for it
+        self.last_report = {} #What the last search found, for Game's observer
+        self.book_path = book_path #Opening book for the small board, None to always search
+        self.book = None #Opened on first use, in the game's worker process
 
     def mine(self, board: Board, color: Space) -> Coordinate:
-        best_mine = None
-        for depth in range(1, self.max_depth + 1):
-            score, mine_found = self.minimax_ab(board, color, depth, alpha=-float('inf'), beta=float('inf'), maximizing=True, moving=False)
-            if mine_found is not None:
-                best_mine = mine_found
-                      
-        if best_mine:
-            return best_mine[1]
-        else:
+        self.clock.start_turn(self.is_critical(board, color))
+        book_turn = self.book_turn(board, color)
+        if book_turn is not None: #Saves the clock for the middlegame
+            dig, move = book_turn
+            after = copy(board)
+            after.push_mine(dig, color)
+            self.plan = (after, move)
+            self.last_report = {"book": 1}
+            return dig
+        result = self.search(self.turn_search, board, color, self.clock.phase(0.9)) #Almost all of the turn, the move was picked along with the dig
+        self.clock.stop()
+        if result.move is None:
+            self.plan = None
             mineable = board.mineable_by_player(color)
             return choice(tuple(mineable))
+        dig, move = result.move
+        after = copy(board)
+        after.push_mine(dig, color)
+        self.plan = (after, move)
+        return dig
+
+    def book_turn(self, board: Board, color: Space) -> Optional[Turn]:
+        if self.book_path is None or board.size != 5:
+            return None
+        if self.book is None:
+            if not os.path.exists(self.book_path):
+                self.book_path = None
+                return None
+            self.book = OpeningBook(self.book_path)
+        found = self.book.lookup(board, color)
+        if found is None or not board.is_mineable(found[0][0]):
+            return None
+        return found[0]
+
+    def apply_turn(self, board: Board, turn: Turn, color: Space):
+        board.push_turn(turn, color)
+
     def apply_move(self, board: Board, move: tuple[Coordinate, Coordinate], color: Space):
-        start, end = move
-        board[start] = Space.EMPTY
-        board[end] = color
+        board.push_move(move, color)
 
     def move(self, board: Board, color: Space) -> Optional[tuple[Coordinate, Coordinate]]:
-        best_move = None
-        for depth in range(1, self.max_depth + 1):
-            _,move_found = self.minimax_ab(board, color, depth, alpha=-float('inf'), beta=float('inf'), maximizing=True, moving=True)
-            if move_found is not None:
-                best_move = move_found
-
+        deadline = self.clock.phase()
+        if self.plan is not None and self.plan[0] == board:
+            best_move = self.plan[1]
+            self.last_report = {"planned": 1}
+        else:
+            best_move = self.search(self.move_search, board, color, deadline).move
+        self.plan = None
+        self.clock.finish_turn()
         return best_move
 
-    def minimax_ab(self, board: Board, color: Space, depth: int, alpha: float, beta: float, maximizing: bool, moving: bool):
-        
-        state_key = (board, color, depth, alpha, beta, maximizing, moving)
-        if state_key in self.transposition_table:
-            return self.transposition_table[state_key]
-
-        if depth == 0: #Base Case
-            val = self.heuristic(board, color)
-            self.transposition_table[state_key] = (val, None)
-            return val, None
-
-        current_color = color if maximizing else self.opponent(color)
-        if moving: 
-            moves = self.possible_moves(board, current_color)
-        else: 
-            moves = self.possible_mines(board, current_color)
-
-        if not moves:
-            val = self.heuristic(board, color)
-            self.transposition_table[state_key] = (val, None)
-            return val, None
-
-
-        best_move = None
-
-        if maximizing: #Max
-            value = float('-inf')
-            for move in moves:
-                new_board = copy(board)
-                self.apply_move(new_board, move, current_color)
-                if moving: 
-                    evaluation, _ = self.minimax_ab(new_board, color, depth - 1, alpha, beta, maximizing=False, moving=True) 
-                else:
-                    evaluation, _ = self.minimax_ab(new_board, color, depth - 1, alpha, beta, maximizing=False, moving=False) 
-                
-                if evaluation > value: #Comparing Scores from heuristic
-                    value, best_move = evaluation, move
-                    
-                alpha = max(alpha, value)
-                if beta <= alpha: #Cut time
-                    break 
-        else: #Min
-            value = float('inf')
-            for move in moves:
-                new_board = copy(board)
-                self.apply_move(new_board, move, current_color)
-                if moving: 
-                    evaluation, _ = self.minimax_ab(new_board, color, depth - 1, alpha, beta, maximizing=True, moving=True) 
-                else:
-                    evaluation, _ = self.minimax_ab(new_board, color, depth - 1, alpha, beta, maximizing=True, moving=False) 
-                
-                if evaluation < value: #Comparing Scores from heuristic
-                    value, best_move = evaluation, move
-                    
-                beta = min(beta, value)
-                if beta <= alpha: #Cut time
-                    break 
-
-        self.transposition_table[state_key] = (value, best_move)
-        return value, best_move
+    def search(self, searcher: Searcher, board: Board, color: Space, deadline: float):
+        hits, probes = searcher.table.hits, searcher.table.probes
+        result = searcher.search(board, color, deadline)
+        self.last_report = {
+            "nodes": result.nodes,
+            "depth": result.depth,
+            "score": result.score,
+            "tt_hits": searcher.table.hits - hits,
+            "tt_probes": searcher.table.probes - probes,
+        }
+        return result
+
+    def report(self) -> dict:
+        return self.last_report
+
+    def is_critical(self, board: Board, color: Space) -> bool:
+        #Close to someone running out of digs, worth spending reserve time
+        return min(len(board.mineable_by_player(color)), len(board.mineable_by_player(self.opponent(color)))) <= 3
 
     def opponent(self, color: Space) -> Space:
-        return Space.RED if color == Space.BLUE else Space.BLUE
+        return opponent(color)
 
     def heuristic(self, board: Board, color: Space) -> float:
         opp = self.opponent(color)
@@ -116,16 +110,12 @@ class Smart_Bot:
     
         return 4*(my_mineable - opp_mineable)+1*(my_walkable - opp_walkable) #Heuristic 4:1 ratio between mineable and walkable
 
+    def possible_turns(self, board: Board, color: Space) -> list[Turn]:
+        return board.legal_turns(color)
+
     def possible_moves(self, board: Board, color: Space) -> list[tuple[Coordinate, Coordinate]]:
         moves = []
         for piece in board.find_all(color):
             for destination in board.walkable_from_coord(piece):
                 moves.append((piece, destination))
         return moves
-    
-    def possible_mines(self, board: Board, color: Space) -> list[tuple[Coordinate, Coordinate]]:
-        mines = []
-        for piece in board.find_all(color):
-            for destination in board.mineable_by_player(color):
-                mines.append((piece, destination))
-        return mines
\ No newline at end of file
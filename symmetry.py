@@ -0,0 +1,194 @@
+"""
+The symmetries of the hexagonal board: its six rotations, each with or without
+a mirror flip. The rules don't depend on orientation, so positions that are
+rotations or reflections of each other play the same, and caches can store
+them once under a canonical key.
+
+A symmetry is numbered 0 to 11: k for a rotation by k * 60 degrees
+counterclockwise, and 6 + k for a flip across the q axis followed by that
+rotation. Symmetry 0 leaves the board as it is.
+"""
+
+from functools import cache
+from typing import Any, Iterator
+
+from board import WALL, Board, Coordinate, geometry
+
+COUNT = 12
+
+
+def transform_coord(coord: Coordinate, symmetry: int) -> Coordinate:
+    """
+    Move a coordinate by a symmetry of the board
+
+    Args:
+        coord (Coordinate): The axial coordinate
+        symmetry (int): The symmetry, 0 to 11
+
+    Returns:
+        Coordinate: Where the symmetry takes it
+    """
+    q, r = coord
+    s = -q - r
+    if symmetry >= 6:
+        r, s = s, r
+    for _ in range(symmetry % 6):
+        q, r, s = -r, -s, -q
+    return q, r
+
+
+class Symmetries:
+    """
+    The symmetries of one board size, as lookup tables
+
+    Attributes:
+        size: The board size
+        permutations: For each symmetry, where it takes each mailbox index.
+            Padding slots stay where they are.
+        inverses: For each symmetry, the symmetry that undoes it
+    """
+
+    def __init__(self, size: int):
+        g = geometry(size)
+        self.size = size
+        self.geometry = g
+        self.permutations: list[tuple[int, ...]] = []
+        self._coords: list[dict[Coordinate, Coordinate]] = []
+        for symmetry in range(COUNT):
+            permutation = list(range(g.length))
+            coords = {}
+            for i in g.indices:
+                coord = g.coords[i]
+                moved = transform_coord(coord, symmetry)  # type: ignore
+                permutation[i] = g.index[moved]
+                coords[coord] = moved
+            self.permutations.append(tuple(permutation))
+            self._coords.append(coords)  # type: ignore
+        identity = self.permutations[0]
+        self.inverses: list[int] = [
+            next(
+                j
+                for j in range(COUNT)
+                if tuple(self.permutations[j][p] for p in permutation) == identity
+            )
+            for permutation in self.permutations
+        ]
+        # Zobrist keys by symmetry, relative to a wall: XORing in the entry of
+        # every cell that isn't a wall into the hash of the all-wall board
+        # gives the hash of the moved board. Indexed by 4 * index + value, like
+        # Geometry.zobrist_keys.
+        keys = g.zobrist_keys
+        self._keys: list[list[int]] = []
+        for permutation in self.permutations:
+            table = [0] * len(keys)
+            for i in g.indices:
+                moved = permutation[i]
+                for value in range(4):
+                    table[4 * i + value] = keys[4 * moved + value] ^ keys[4 * moved + WALL]
+            self._keys.append(table)
+
+    def canonical(self, board: Board) -> tuple[int, int]:
+        """
+        Find the orientation of a position with the smallest Zobrist hash
+
+        Args:
+            board (Board): The position, of this size
+
+        Returns:
+            tuple[int, int]: The Zobrist hash of the position turned to that
+                orientation, the same for every rotation and reflection of it,
+                and the symmetry that turns the position there
+        """
+        cells = board._cells
+        open_cells = self.geometry.mask & ~board.masks[WALL]
+        entries = []
+        while open_cells:
+            low = open_cells & -open_cells
+            i = low.bit_length() - 1
+            entries.append(4 * i + cells[i])
+            open_cells ^= low
+        blank = self.geometry.blank_zobrist
+        best = best_symmetry = -1
+        for symmetry, table in enumerate(self._keys):
+            key = blank
+            for entry in entries:
+                key ^= table[entry]
+            if best < 0 or key < best:
+                best, best_symmetry = key, symmetry
+        return best, best_symmetry
+
+    def transform(self, move: Any, symmetry: int) -> Any:
+        """
+        Move every coordinate in a move, dig or turn by a symmetry
+
+        Args:
+            move (Any): A coordinate, or nested tuples of coordinates and None
+                such as a Turn or a (start, end) move
+            symmetry (int): The symmetry, 0 to 11
+
+        Returns:
+            Any: The same structure with every coordinate moved
+        """
+        if move is None:
+            return None
+        if isinstance(move[0], int):
+            return self._coords[symmetry][move]
+        return tuple(self.transform(part, symmetry) for part in move)
+
+    def to_canonical(self, move: Any, symmetry: int) -> Any:
+        """
+        Turn a move on a position into the same move on its canonical orientation
+
+        Args:
+            move (Any): The move, as for transform
+            symmetry (int): The symmetry canonical() returned for the position
+
+        Returns:
+            Any: The move in the canonical orientation
+        """
+        return self.transform(move, symmetry)
+
+    def from_canonical(self, move: Any, symmetry: int) -> Any:
+        """
+        Turn a move on a canonical orientation back into the move on the position
+
+        Args:
+            move (Any): The move in the canonical orientation
+            symmetry (int): The symmetry canonical() returned for the position
+
+        Returns:
+            Any: The move on the position itself
+        """
+        return self.transform(move, self.inverses[symmetry])
+
+    def images(self, board: Board) -> Iterator[Board]:
+        """
+        Every rotation and reflection of a position, some of them maybe equal
+
+        Args:
+            board (Board): The position
+
+        Yields:
+            Board: The position moved by each symmetry in turn
+        """
+        for permutation in self.permutations:
+            cells = bytearray(len(permutation))
+            for i, moved in enumerate(permutation):
+                cells[moved] = board._cells[i]
+            out = Board.__new__(Board)
+            out.__setstate__((board.size, board.miner_count, bytes(cells)))
+            yield out
+
+
+@cache
+def symmetries(size: int) -> Symmetries:
+    """
+    Get the shared symmetry tables for a board size
+
+    Args:
+        size (int): The board size, 5 or 7
+
+    Returns:
+        Symmetries: The tables, built once per size
+    """
+    return Symmetries(size)
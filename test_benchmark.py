@@ -0,0 +1,26 @@
+from benchmark import Result, compare, corpus
+
+
+def test_corpus_is_fixed():
+    first, second = corpus(seed=3, per_size=4), corpus(seed=3, per_size=4)
+    assert first.boards == second.boards
+    assert sorted(b.size for b in first.boards) == [5] * 4 + [7] * 4
+    assert len(first.unclear) == len(first.boards)
+
+
+def test_compare():
+    baseline = {
+        "fast": Result(10.0, "us/op"),
+        "rate": Result(100.0, "nodes/s", higher_is_better=True),
+        "gone": Result(1.0, "us/op"),
+    }
+    current = {
+        "fast": Result(12.0, "us/op"),
+        "rate": Result(95.0, "nodes/s", higher_is_better=True),
+        "new": Result(1.0, "us/op"),
+    }
+    lines, regressions = compare(baseline, current, threshold=0.1)
+    assert regressions == ["fast"]
+    assert len(lines) == 2
+    _, regressions = compare(baseline, current, threshold=0.25)
+    assert regressions == []
@@ -0,0 +1,400 @@
+from copy import copy
+import pickle
+from random import Random
+
+import pytest
+from board import BLUE_MINERS, EMPTY, RED_MINERS, WALL, Board, Space
+
+
+def random_boards(seed: int, count: int) -> list[Board]:
+    """
+    Play random legal turns to get a spread of mid-game positions on both sizes
+    """
+    rng = Random(seed)
+    out = []
+    for n in range(count):
+        board = Board(small=n % 2 == 0)
+        color, other = Space.RED, Space.BLUE
+        for _ in range(rng.randint(0, 40)):
+            mineable = sorted(board.mineable_by_player(color))
+            if not mineable:
+                break
+            board[rng.choice(mineable)] = (
+                Space.EMPTY
+                if board.count_elements(color) == board.miner_count
+                else color
+            )
+            start = rng.choice(sorted(board.find_all(color)))
+            ends = sorted(board.walkable_from_coord(start))
+            if ends:
+                board[start] = Space.EMPTY
+                board[rng.choice(ends)] = color
+            board.clear_dead(other)
+            color, other = other, color
+        out.append(board)
+    return out
+
+
+@pytest.fixture
+def blank_board() -> Board:
+    board = Board(small=True)
+    board.cells = {coord: Space.WALL for coord in board.cells}
+    return board
+
+
+@pytest.mark.parametrize("small, cell_count", [(True, 61), (False, 127)])
+def test_geometry(small: bool, cell_count: int):
+    board = Board(small)
+    assert len(board.cells) == cell_count
+    assert board.count_elements(Space.RED) == board.miner_count
+    assert board.count_elements(Space.BLUE) == board.miner_count
+    for coord in board.cells:
+        index = board.index_of(coord)
+        assert board.index_of(coord[:2]) == index
+        assert board.coord_of(index) == coord[:2]
+        assert {board.coord_of(n) for n in board.neighbor_indices(index)} == (
+            board.neighbors(coord)
+        )
+    # The shared starting layout matches placing the miners one by one
+    placed = Board(small)
+    placed.cells = {coord: Space.WALL for coord in placed.cells}
+    for miners, color in ((RED_MINERS, Space.RED), (BLUE_MINERS, Space.BLUE)):
+        for coord in miners:
+            if coord in placed:
+                placed[coord] = color
+    assert placed == board
+    assert placed.open_counts == board.open_counts
+    assert placed.frontier == board.frontier
+    assert placed.masks == board.masks
+    board.push_mine(next(iter(board.mineable_by_player(Space.RED))), Space.RED)
+    assert Board(small) == placed
+
+
+def test_cells_is_read_only():
+    board = Board(small=True)
+    # Writing to the snapshot would be lost, so it isn't allowed
+    with pytest.raises(TypeError):
+        board.cells[0, 0, 0] = Space.EMPTY  # type: ignore
+    assert board[0, 0] == Space.WALL
+    board.cells = {**board.cells, (0, 0, 0): Space.EMPTY}
+    assert board[0, 0] == Space.EMPTY
+
+
+def test_coordinate_api(blank_board: Board):
+    b = blank_board
+    b[0, 0] = Space.EMPTY
+    b[1, -1, 0] = Space.RED
+    assert b[0, 0, 0] == Space.EMPTY
+    assert b[1, -1] == Space.RED
+    assert (4, 0) in b
+    assert (5, 0) not in b
+    assert (1, 1, 1) not in b
+    with pytest.raises(ValueError):
+        b[5, 0] = Space.EMPTY
+    with pytest.raises(ValueError):
+        b[0, 5]
+    assert b.neighbors((0, 0), Space.RED) == {(1, -1)}
+    assert b.neighbors((5, -1)) == {(4, 0), (4, -1)}
+    assert b.find_all_indices(Space.RED) == [b.index_of((1, -1))]
+    assert b.walkable_from_coord((1, -1)) == {(0, 0)}
+
+
+def test_zobrist(blank_board: Board):
+    b = blank_board
+    assert b.zobrist == b.geometry.zobrist(b._cells)
+    other = copy(b)
+    b[0, 0] = Space.EMPTY
+    b[1, 0] = Space.RED
+    assert b.zobrist == b.geometry.zobrist(b._cells)
+    assert b != other and hash(b) != hash(other)
+    other[1, 0] = Space.RED
+    other[0, 0] = Space.EMPTY
+    assert b == other and hash(b) == hash(other)
+    assert len({b, other, copy(b)}) == 1
+    b[1, 0] = Space.WALL
+    b[0, 0] = Space.WALL
+    assert b.zobrist == Board(small=True).geometry.blank_zobrist
+    assert pickle.loads(pickle.dumps(other)).zobrist == other.zobrist
+
+
+def is_mineable_by_rule(board: Board, index: int) -> bool:
+    cells, neighbors = board._cells, board.geometry.neighbors
+    if cells[index] != WALL:
+        return False
+    mined = [n for n in neighbors[index] if cells[n] != WALL]
+    return len(mined) <= 3 and all(
+        sum(cells[m] != WALL for m in neighbors[n]) < 3 for n in mined
+    )
+
+
+def walkable_by_rule(board: Board, start: int) -> set[int]:
+    cells, neighbors = board._cells, board.geometry.neighbors
+    if cells[start] == WALL:
+        return set()
+    traversable = {cells[start], EMPTY}
+    seen, stack = {start}, [start]
+    while stack:
+        for n in neighbors[stack.pop()]:
+            if n not in seen and cells[n] in traversable:
+                seen.add(n)
+                stack.append(n)
+    return {i for i in seen if cells[i] == EMPTY}
+
+
+def test_frontier(blank_board: Board):
+    b = blank_board
+    assert b.frontier == b.geometry.mask
+    for coord in [(0, 0), (1, 0), (-1, 0), (0, 1), (0, -1)]:
+        b[coord] = Space.EMPTY
+        assert b.open_counts == b.geometry.open_counts(b._cells)
+        assert b.frontier == b.geometry.mineable_walls(b.masks[WALL])
+    assert not b.is_mineable((1, -1))
+    assert b.is_mineable((2, 0))
+    b[0, -1] = Space.WALL
+    assert b.frontier == b.geometry.mineable_walls(b.masks[WALL])
+    for index in b.geometry.indices:
+        assert b.is_mineable_index(index) == is_mineable_by_rule(b, index)
+
+
+def test_bitboards():
+    for board in random_boards(0, 40):
+        g = board.geometry
+        assert board.masks == g.masks(board._cells)
+        assert board.open_counts == g.open_counts(board._cells)
+        assert board.frontier == g.mineable_walls(board.masks[WALL])
+        for player in (Space.RED, Space.BLUE):
+            walkable = set()
+            for start in board.find_all_indices(player):
+                reach = board.walkable_from_index(start)
+                assert set(reach) == walkable_by_rule(board, start)
+                walkable.update(reach)
+            assert g.indices_of_mask(board.walkable_bitboard(player)) == sorted(walkable)
+            halls = walkable | set(board.find_all_indices(player))
+            mineable = {
+                n
+                for hall in halls
+                for n in g.neighbors[hall]
+                if is_mineable_by_rule(board, n)
+            }
+            assert g.indices_of_mask(board.mineable_bitboard(player)) == sorted(mineable)
+            for miner in board.find_all_indices(player):
+                assert board.is_miner_dead_bitboard(miner) == (
+                    board.is_miner_dead_index(miner)
+                )
+
+
+def test_components(blank_board: Board):
+    b = blank_board
+    for coord in [(0, 0), (1, 0), (3, 0), (0, 2), (-2, 0), (-3, 0)]:
+        b[coord] = Space.EMPTY
+    b[2, 0] = Space.RED
+    b[-1, 0] = Space.RED
+    b[0, 1] = Space.BLUE
+    components = b.components()
+    assert components is b.components()
+    assert len(components.masks) == 4
+    center = components.label(b.index_of((0, 0)))
+    assert components.label(b.index_of((1, 0))) == center
+    assert b.geometry.coords_of_mask(components.touching[center]) == {
+        (2, 0),
+        (-1, 0),
+        (0, 1),
+    }
+    # Red walks through its own pieces but not through blue ones
+    assert b.walkable_from_coord((-1, 0)) == {(0, 0), (1, 0), (3, 0), (-2, 0), (-3, 0)}
+    assert b.walkable_by_player(Space.RED) == b.walkable_from_coord((2, 0))
+    assert b.walkable_by_player(Space.BLUE) == {(0, 0), (1, 0), (0, 2)}
+    assert b.walkable_from_coord((0, 2)) == {(0, 2)}
+    b[0, 2] = Space.WALL
+    assert b.components() is not components
+    assert b.walkable_by_player(Space.BLUE) == {(0, 0), (1, 0)}
+
+
+# The dict-based dead miner check the board started out with, frozen here so
+# that the bitboard version is checked against code it doesn't share
+_DIRECTIONS = [(1, -1, 0), (1, 0, -1), (0, 1, -1), (-1, 1, 0), (-1, 0, 1), (0, -1, 1)]
+
+
+def original_neighbors(cells: dict, coord: tuple) -> set[tuple[int, int]]:
+    q, r = coord[:2]
+    s = -q - r
+    return {(q + a, r + b) for a, b, c in _DIRECTIONS if (q + a, r + b, s + c) in cells}
+
+
+def original_is_miner_dead(cells: dict, coord: tuple) -> bool:
+    def at(c):
+        return cells[(c[0], c[1], -c[0] - c[1])]
+
+    player = at(coord)
+    other_player = Space.RED if player == Space.BLUE else Space.BLUE
+    enemy_count = 0
+    frontier = set([coord])
+    visited: set = set()
+    while frontier:
+        curr = frontier.pop()
+        curr = curr[:2]
+        visited.add(curr)
+        if at(curr) == player and curr != coord[:2]:
+            return False
+        elif at(curr) == other_player:
+            enemy_count += 1
+        elif curr == coord[:2] or at(curr) == Space.EMPTY:
+            frontier |= original_neighbors(cells, curr) - visited
+    return enemy_count >= 2
+
+
+def original_clear_dead(cells: dict, other_color: Space) -> set[tuple[int, int]]:
+    dead_enemies = {
+        coord
+        for coord in cells
+        if cells[coord] == other_color and original_is_miner_dead(cells, coord)
+    }
+    for enemy in dead_enemies:
+        cells[enemy] = Space.EMPTY
+    return {enemy[:2] for enemy in dead_enemies}
+
+
+def test_clear_dead_matches_original():
+    rng = Random(1)
+    removed_total = 0
+    for n in range(30):
+        board = Board(small=n % 2 == 0)
+        color, other = Space.RED, Space.BLUE
+        for _ in range(60):
+            mineable = sorted(board.mineable_by_player(color))
+            if not mineable:
+                break
+            board[rng.choice(mineable)] = (
+                Space.EMPTY
+                if board.count_elements(color) == board.miner_count
+                else color
+            )
+            start = rng.choice(sorted(board.find_all(color)))
+            ends = sorted(board.walkable_from_coord(start))
+            if ends:
+                board[start] = Space.EMPTY
+                board[rng.choice(ends)] = color
+            cells = dict(board.cells)
+            expected = original_clear_dead(cells, other)
+            assert board.clear_dead(other) == expected
+            assert dict(board.cells) == cells
+            assert not any(
+                board.is_miner_dead_index(i) for i in board.find_all_indices(other)
+            )
+            removed_total += len(expected)
+            color, other = other, color
+    assert removed_total > 0
+
+
+def board_state(board: Board) -> tuple:
+    return (
+        bytes(board._cells),
+        board.zobrist,
+        tuple(board.masks),
+        bytes(board.open_counts),
+        board.frontier,
+        tuple(board._unchecked),
+    )
+
+
+def test_push_pop():
+    rng = Random(2)
+    for board in random_boards(3, 20):
+        states = []
+        color = Space.RED
+        for _ in range(12):
+            mineable = sorted(board.mineable_by_player(color))
+            if not mineable:
+                break
+            states.append((board_state(board), board.components()))
+            board.push_mine(rng.choice(mineable), color)
+            states.append((board_state(board), board.components()))
+            start = rng.choice(sorted(board.find_all(color)))
+            ends = sorted(board.walkable_from_coord(start))
+            board.push_move((start, rng.choice(ends)) if ends else None, color)
+            color = Space.BLUE if color == Space.RED else Space.RED
+        while states:
+            board.pop()
+            state, components = states.pop()
+            assert board_state(board) == state
+            assert board.components() is components
+        with pytest.raises(IndexError):
+            board.pop()
+
+
+def test_push_matches_game_rules(blank_board: Board):
+    b = blank_board
+    b[0, 0] = Space.EMPTY
+    b[-1, 0] = Space.RED
+    b[-3, 3] = Space.RED
+    b[-1, 1] = Space.BLUE
+    b.push_mine((1, 0), Space.RED)
+    assert b[1, 0] == Space.RED
+    b.push_mine((2, -1), Space.RED)
+    assert b[2, -1] == Space.EMPTY
+    b.push_move(((1, 0), (0, 0)), Space.RED)
+    assert b[0, 0] == Space.RED and b[1, 0] == Space.EMPTY
+    assert b[-1, 1] == Space.EMPTY
+    b.pop()
+    assert b[-1, 1] == Space.BLUE
+    # Blue also borders both red miners through the empty space
+    b.push_move(None, Space.RED)
+    assert b[-1, 1] == Space.EMPTY
+    b.pop()
+    assert b[-1, 1] == Space.BLUE
+    b.pop()
+    b.pop()
+    assert b.find_all(Space.RED) == {(-1, 0), (-3, 3)}
+    assert b.find_all(Space.EMPTY) == {(0, 0)}
+
+
+def play_like_game(board: Board, turn, color: Space) -> Board:
+    # The same steps Game.step takes after the bot answers
+    board = copy(board)
+    dig, move = turn
+    board[dig] = (
+        Space.EMPTY if board.count_elements(color) == board.miner_count else color
+    )
+    if move is not None:
+        assert board[move[0]] == color
+        assert move[1] in board.walkable_from_coord(move[0])
+        board[move[0]] = Space.EMPTY
+        board[move[1]] = color
+    board.clear_dead(Space.BLUE if color == Space.RED else Space.RED)
+    return board
+
+
+def test_legal_turns():
+    for board in random_boards(4, 6):
+        for color in (Space.RED, Space.BLUE):
+            before = board_state(board)
+            turns = board.legal_turns(color)
+            assert board_state(board) == before
+            assert {turn[0] for turn in turns} == board.mineable_by_player(color)
+            results = set()
+            for turn in turns:
+                expected = play_like_game(board, turn, color)
+                board.push_turn(turn, color)
+                assert board == expected
+                results.add(expected)
+                board.pop()
+            assert len(results) == len(turns)
+            assert board_state(board) == before
+
+
+def test_bytes():
+    for board in random_boards(4, 6):
+        data = board.to_bytes()
+        assert len(data) == len(board.geometry.indices) + 1
+        loaded = Board.from_buffer(memoryview(data + b"unused"))
+        assert loaded == board
+        assert loaded.masks == board.masks and loaded.frontier == board.frontier
+        start = Board(board.size == 5)
+        start.load_bytes(data)
+        assert start == board and start.zobrist == board.zobrist
+        assert start.open_counts == board.open_counts
+        assert start.mineable_by_player(Space.RED) == board.mineable_by_player(Space.RED)
+    with pytest.raises(ValueError):
+        Board.from_buffer(b"\x06")
+    with pytest.raises(ValueError):
+        Board(True).load_bytes(Board().to_bytes())
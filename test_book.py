@@ -0,0 +1,44 @@
+from copy import copy
+import pickle
+
+from board import Board, Space
+from book import OpeningBook, build, write
+from search import TranspositionTable
+from smart_bot import Smart_Bot
+from symmetry import symmetries
+
+
+def test_book(tmp_path):
+    entries = build(plies=2, depth=1)
+    start = Board(small=True)
+    # Red's start position, and every position after one red turn for blue,
+    # once per set of rotations and reflections
+    after_red = set()
+    for _ in start.iter_turns(Space.RED):
+        after_red.add(TranspositionTable.canonical_key(start, Space.BLUE)[0])
+    assert len(entries) == 1 + len(after_red)
+    path = str(tmp_path / "test.book")
+    write(path, 5, entries)
+    book = OpeningBook(path)
+    assert len(book) == len(entries)
+    turn, score = book.lookup(start, Space.RED)
+    assert turn in start.legal_turns(Space.RED)
+    after = copy(start)
+    after.push_turn(turn, Space.RED)
+    assert book.lookup(after, Space.RED) is None
+    assert book.lookup(after, Space.BLUE) is not None
+    assert book.lookup(Board(), Space.RED) is None
+    # A rotated position finds the same entry, with the turn rotated to match
+    turned = symmetries(5)
+    for rotated in turned.images(after):
+        found = book.lookup(rotated, Space.BLUE)
+        assert found is not None
+        assert found[0] in rotated.legal_turns(Space.BLUE)
+    assert pickle.loads(pickle.dumps(book)).lookup(start, Space.RED) == (turn, score)
+    bot = Smart_Bot(book_path=path)
+    assert bot.mine(start, Space.RED) == turn[0]
+    assert bot.last_report == {"book": 1}
+    board = copy(start)
+    board.push_mine(turn[0], Space.RED)
+    assert bot.move(board, Space.RED) == turn[1]
+    book.close()
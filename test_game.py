@@ -1,7 +1,14 @@
+import asyncio
+from copy import copy
+import time
+
 import pytest
-from board import Space
-from game import Game
+from board import Board, Space
+from game import AsyncGame, BotPool, Game
+from metrics import PHASES, MetricsAggregator, TurnMetrics
 from random_bot import RandomPlayer
+from smart_bot import Smart_Bot
+from test_board import random_boards
 
 
 @pytest.fixture
@@ -49,3 +56,170 @@ def test_reserve_time(time_reserve_game: Game):
     g = time_reserve_game
     g.step()
     assert g.reserve_time[Space.RED] == pytest.approx(1.5, abs=0.01)
+
+
+class ForgetfulPlayer(RandomPlayer):
+    """
+    Crashes on its second turn, which it can only notice if it keeps its state
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.turns = 0
+
+    def mine(self, board, color):
+        self.turns += 1
+        if self.turns > 1:
+            raise RuntimeError("second turn")
+        return super().mine(board, color)
+
+
+class SlowMover(RandomPlayer):
+    """
+    Takes longer to move than the game sleeps before asking for the move
+    """
+
+    def move(self, board, color):
+        time.sleep(1.2)
+        return super().move(board, color)
+
+
+def walled_in(game: Game) -> Game:
+    game.board.cells = {coord: Space.WALL for coord in game.board.cells}
+    game.board[0, 0] = Space.RED
+    return game
+
+
+def test_sleep_is_free():
+    # Thinking done while the game sleeps before asking for the move isn't
+    # charged, by either kind of game
+    clock = dict(small=True, time_per_move=1.0, reserve_time=2.0, min_sleep_time=0.5)
+    g = walled_in(Game(SlowMover(), RandomPlayer(), **clock))
+    g.step()
+    g.close()
+    assert g.reserve_time[Space.RED] == pytest.approx(2.0, abs=0.05)
+
+    async def play():
+        async with BotPool(1) as pool:
+            g = walled_in(AsyncGame(SlowMover(), RandomPlayer(), pool, **clock))
+            await g.step()
+            g.close()
+            assert g.reserve_time[Space.RED] == pytest.approx(2.0, abs=0.05)
+
+    asyncio.run(play())
+
+
+def referee_accepts(board: Board, color: Space, dig) -> bool:
+    # Play the start of a turn with the given dig, answering for the bot, and
+    # see whether the game lets it go on to the move
+    game = Game(RandomPlayer(), RandomPlayer(), small=board.size == 5)
+    game.board = copy(board)
+    game.red_turn = color == Space.RED
+    turn = game._turn(TurnMetrics(0, color))
+    need = next(turn)
+    while need[0] != "result":
+        need = turn.send(False if need[0] == "worker" else None)
+    try:
+        turn.send((dig, 0.0, None))
+    except StopIteration:
+        pass
+    turn.close()
+    return game.winner is None
+
+
+def test_referee_accepts_legal_turn_digs():
+    out_of_reach = 0
+    for board in random_boards(1, 12):
+        for color in (Space.RED, Space.BLUE):
+            digs = {turn[0] for turn in board.legal_turns(color)}
+            if not digs:
+                continue
+            accepted = {
+                board.coord_of(i)
+                for i in board.geometry.indices
+                if referee_accepts(board, color, board.coord_of(i))
+            }
+            assert accepted == digs
+            out_of_reach += len(board.geometry.coords_of_mask(board.frontier) - digs)
+    # Some positions had mineable walls out of the player's reach to turn down
+    assert out_of_reach > 0
+
+
+def test_player_state_persists():
+    g = Game(ForgetfulPlayer(), RandomPlayer(), small=True)
+    g.step()
+    g.step()
+    assert g.winner is None
+    g.step()
+    assert g.winner == Space.BLUE
+    assert not g._workers
+
+
+def test_observer():
+    metrics = MetricsAggregator()
+    g = Game(
+        Smart_Bot(0.3, 0.5, book_path=None),
+        RandomPlayer(),
+        small=True,
+        time_per_move=0.3,
+        reserve_time=0.5,
+        observer=metrics,
+    )
+    for _ in range(4):
+        g.step()
+    g.close()
+    assert [t.turn for t in metrics.turns] == [0, 1, 2, 3]
+    assert [t.color for t in metrics.turns] == [Space.RED, Space.BLUE] * 2
+    first = metrics.turns[0].phases
+    assert list(first) == [p for p in PHASES if p != "sleep"]
+    assert "worker_start" not in metrics.turns[2].phases
+    assert metrics.turns[0].bot_stats["mine"]["depth"] >= 1
+    assert metrics.turns[1].bot_stats == {}
+    summary = metrics.phase_summary(Space.RED)
+    assert summary["think_mine"]["count"] == 2
+    assert summary["think_mine"]["p50"] <= summary["think_mine"]["max"]
+    assert "mine_nodes" in metrics.stat_summary(Space.RED)
+    assert "think_mine" in metrics.report()
+
+
+def test_async_games():
+    async def play():
+        async with BotPool(2) as pool:
+            games = [
+                AsyncGame(RandomPlayer(), RandomPlayer(), pool, small=True)
+                for _ in range(20)
+            ]
+            winners = await asyncio.gather(*(g.play_game() for g in games))
+            assert all(winner in (Space.RED, Space.BLUE) for winner in winners)
+            assert all(not g._workers for g in games)
+            # The same clock as Game, counting only the bot's own thinking
+            slow = AsyncGame(
+                RandomPlayer(1.5),
+                RandomPlayer(),
+                pool,
+                small=True,
+                time_per_move=1.0,
+                reserve_time=2.0,
+            )
+            await slow.step()
+            assert slow.reserve_time[Space.RED] == pytest.approx(1.5, abs=0.01)
+            slow.close()
+            crashing = AsyncGame(ForgetfulPlayer(), RandomPlayer(), pool, small=True)
+            for _ in range(3):
+                await crashing.step()
+            assert crashing.winner == Space.BLUE
+            # Bots can start processes of their own in the pool's workers
+            splitting = AsyncGame(
+                Smart_Bot(0.3, 1.0, workers=2),
+                RandomPlayer(),
+                pool,
+                small=False,
+                time_per_move=0.3,
+                reserve_time=1.0,
+            )
+            for _ in range(2):
+                await splitting.step()
+            assert splitting.winner is None
+            splitting.close()
+
+    asyncio.run(play())
@@ -0,0 +1,57 @@
+from copy import copy
+from io import BytesIO
+
+import pytest
+from board import Space
+from game import Game
+from metrics import MetricsAggregator, Observers
+from random_bot import RandomPlayer
+from record import RecordWriter, parse_records, read_varint, replay, write_varint
+
+
+def test_varint():
+    out = bytearray()
+    values = [0, 1, 127, 128, 300, 1 << 40]
+    for value in values:
+        write_varint(out, value)
+    assert len(out) == 1 + 1 + 1 + 2 + 2 + 6
+    position = 0
+    for value in values:
+        found, position = read_varint(out, position)
+        assert found == value
+    with pytest.raises(ValueError):
+        read_varint(bytes([0x80]), 0)
+
+
+def test_record_and_replay():
+    stream = BytesIO()
+    games = []
+    for small in (True, False):
+        metrics = MetricsAggregator()
+        game = Game(
+            RandomPlayer(),
+            RandomPlayer(),
+            small=small,
+            observer=Observers(RecordWriter(stream, small), metrics),
+        )
+        game.play_game()
+        games.append((game, metrics))
+    records = list(parse_records(stream.getvalue()))
+    assert len(records) == 2
+    for record, (game, metrics) in zip(records, games):
+        assert record.winner == game.winner
+        assert len(record.turns) == game.turns - 1
+        assert [t.color for t in record.turns[:2]] == [Space.RED, Space.BLUE]
+        assert [t.removed for t in record.turns] == [t.removed for t in metrics.turns[:-1]]
+        boards = [copy(board) for board in replay(record)]
+        assert len(boards) == game.turns
+        assert boards[-1] == game.board
+    # Tampering is caught
+    record = records[0]
+    turn = next(t for t in record.turns if t.move is not None)
+    turn.move = (turn.move[1], turn.move[0])
+    with pytest.raises(ValueError):
+        for _ in replay(record):
+            pass
+    with pytest.raises(ValueError):
+        list(parse_records(b"nope"))
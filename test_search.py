@@ -0,0 +1,156 @@
+import pickle
+import time
+
+import pytest
+from board import Board, Space
+from evaluation import batch_heuristic
+from search import EXACT, LOWER, Clock, MoveOrderer, Searcher, TranspositionTable
+from smart_bot import Smart_Bot
+from test_board import random_boards
+
+
+@pytest.fixture
+def bot() -> Smart_Bot:
+    return Smart_Bot(time_per_move=0.5, reserve_time=1.0)
+
+
+def test_clock():
+    clock = Clock(time_per_move=1.0, reserve_time=4.0, margin=0.1, reserve_share=0.5)
+    clock.start_turn()
+    assert clock.budget == pytest.approx(0.9)
+    deadline = clock.phase(0.5)
+    assert deadline - time.monotonic() == pytest.approx(0.45, abs=0.01)
+    clock.finish_turn()
+    assert clock.reserve_time == 4.0
+    clock.start_turn(critical=True)
+    assert clock.budget == pytest.approx(2.9)
+    clock.used = 2.0
+    clock.finish_turn()
+    assert clock.reserve_time == pytest.approx(3.0, abs=0.01)
+
+
+def test_search_respects_deadline(bot: Smart_Bot):
+    board = Board()
+    start = time.monotonic()
+    result = bot.turn_search.search(board, Space.RED, start + 0.2)
+    assert time.monotonic() - start < 0.3
+    assert result.depth >= 1
+    assert result.move in board.legal_turns(Space.RED)
+    assert board == Board()
+
+
+def test_search_exhausts_small_trees(bot: Smart_Bot):
+    board = Board(small=True)
+    board.cells = {coord: Space.WALL for coord in board.cells}
+    for coord in [(0, 0), (1, 0), (2, 0)]:
+        board[coord] = Space.EMPTY
+    board[0, 0] = Space.RED
+    board[-2, 0] = Space.BLUE
+    searcher = Searcher(bot.heuristic, bot.possible_moves, bot.apply_move)
+    result = searcher.search(board, Space.RED, time.monotonic() + 10)
+    # Red's moves don't change anything blue can do, so the tree runs out quickly
+    assert result.move in {((0, 0), (1, 0)), ((0, 0), (2, 0))}
+    assert result.depth < 10
+
+
+def test_transposition_table():
+    table = TranspositionTable(size=8)
+    board = Board(small=True)
+    red, blue = table.key(board, Space.RED), table.key(board, Space.BLUE)
+    assert red != blue
+    assert table.probe(red) is None
+    table.store(red, 3, 1.0, EXACT, "a")
+    assert table.probe(red).move == "a"
+    # Shallower results don't replace deeper ones from the same search...
+    table.store(red, 2, 5.0, LOWER, "b")
+    assert table.probe(red).value == 1.0
+    collision = red + 8
+    table.store(collision, 1, 0.0, EXACT, None)
+    assert table.probe(collision) is None
+    # ...but results from older searches give way
+    table.new_search()
+    table.store(collision, 1, 0.0, EXACT, None)
+    assert table.probe(collision).depth == 1
+    assert table.probe(red) is None
+    stats = table.stats()
+    assert stats["probes"] == 6
+    assert stats["hits"] == 3
+    assert stats["replacements"] == 1
+    assert stats["fill"] == 1 / 8
+    # Copies sent to other processes leave the results behind
+    copied = pickle.loads(pickle.dumps(table))
+    assert copied.size == 8
+    assert copied.probe(red) is None
+    assert len(pickle.dumps(TranspositionTable())) < 1000
+
+
+def test_move_orderer():
+    orderer = MoveOrderer()
+    moves = ["a", "b", "c", "d"]
+    orderer.cutoff("c", Space.RED, 1, 3)
+    orderer.cutoff("d", Space.RED, 2, 2)
+    orderer.cutoff("b", Space.BLUE, 2, 4)
+    assert orderer.order(moves, Space.RED, 0) == ["c", "d", "a", "b"]
+    assert orderer.order(moves, Space.RED, 2, best="a") == ["a", "b", "d", "c"]
+    orderer.new_search()
+    assert orderer.killers == []
+    assert orderer.history == {(Space.RED, "c"): 4, (Space.RED, "d"): 2, (Space.BLUE, "b"): 8}
+
+
+def test_ordering_saves_nodes(bot: Smart_Bot):
+    board = random_boards(5, 1)[0]
+    nodes = []
+    for ordering in (False, True):
+        searcher = Searcher(
+            bot.heuristic, bot.possible_moves, bot.apply_move, ordering=ordering
+        )
+        result = searcher.search(board, Space.RED, float("inf"), max_depth=3)
+        assert result.depth == 3
+        nodes.append(searcher.stats()["nodes"])
+    assert nodes[1] < nodes[0]
+
+
+def test_split_search_matches_serial(bot: Smart_Bot):
+    board = random_boards(5, 1)[0]
+    serial = [
+        Searcher(bot.heuristic, bot.possible_moves, bot.apply_move).search(
+            board, Space.RED, float("inf"), max_depth=3
+        )
+        for _ in range(2)
+    ]
+    assert serial[0] == serial[1]
+    split = Searcher(bot.heuristic, bot.possible_moves, bot.apply_move, workers=2)
+    try:
+        result = split.search(board, Space.RED, float("inf"), max_depth=3)
+        assert (result.score, result.depth) == (serial[0].score, 3)
+        assert result.move in bot.possible_moves(board, Space.RED)
+        # The workers' table use and best moves come back to this searcher
+        assert split.table.probes > 0
+        assert split.orderer is not None
+        assert any(color == Space.RED for color, _ in split.orderer.history)
+        start = time.monotonic()
+        result = split.search(board, Space.BLUE, start + 0.3)
+        assert result.depth >= 1
+        assert time.monotonic() - start < 0.3 + 2 * split.join_slack
+        assert result.move in bot.possible_moves(board, Space.BLUE)
+    finally:
+        split.close()
+
+
+def test_batch_heuristic(bot: Smart_Bot):
+    boards = random_boards(8, 20)
+    for color in (Space.RED, Space.BLUE):
+        for small in (True, False):
+            same_size = [b for b in boards if (b.size == 5) == small]
+            expected = [bot.heuristic(b, color) for b in same_size]
+            assert list(batch_heuristic(same_size, color)) == expected
+            cells = [b.cell_bytes() for b in same_size]
+            assert list(batch_heuristic(cells, color)) == expected
+    board = random_boards(5, 1)[0]
+    results = [
+        Searcher(
+            bot.heuristic, bot.possible_moves, bot.apply_move, evaluate_batch=batch
+        ).search(board, Space.RED, float("inf"), max_depth=3)
+        for batch in (None, batch_heuristic)
+    ]
+    assert results[0].score == results[1].score
@@ -0,0 +1,52 @@
+from board import Board, Space
+from game import Game
+from selfplay import greedy_policy, positions, random_policy, simulate
+
+
+class ScriptedPlayer:
+    """
+    Plays back a fixed list of turns
+    """
+
+    def __init__(self, turns):
+        self.name = "scripted"
+        self.turns = list(turns)
+
+    def mine(self, board, color):
+        return self.turns[0][0]
+
+    def move(self, board, color):
+        return self.turns.pop(0)[1]
+
+
+def test_simulate_matches_game():
+    for small in (True, False):
+        for game in simulate(random_policy, random_policy, 3, small, seed=small):
+            assert game.reason == "no_mineable"
+            assert game.plies == len(game.positions) - 1
+            turns = {
+                color: [p.turn for p in game.positions if p.color == color and p.turn]
+                for color in (Space.RED, Space.BLUE)
+            }
+            replay = Game(
+                ScriptedPlayer(turns[Space.RED]),
+                ScriptedPlayer(turns[Space.BLUE]),
+                small=small,
+            )
+            for position in game.positions:
+                assert replay.board.cell_bytes() == position.cells
+                replay.step()
+            assert replay.winner == game.winner
+            assert replay.board == game.board
+
+
+def test_simulate_records():
+    games = simulate(greedy_policy, random_policy, 4, seed=0)
+    again = simulate(greedy_policy, random_policy, 4, seed=0)
+    assert [g.board for g in games] == [g.board for g in again]
+    records = list(positions(games))
+    assert len(records) == sum(len(g.positions) for g in games)
+    assert records[0].cells == Board(small=True).cell_bytes()
+    assert all(r.winner == games[r.game].winner for r in records)
+    assert sum(g.winner == Space.RED for g in games) >= 3
+    assert records[0].to_json()["color"] == "RED"
@@ -0,0 +1,51 @@
+from copy import copy
+from random import Random
+
+from board import Board, Space
+from search import Searcher, opponent
+from selfplay import play_turn, random_policy
+from smart_bot import Smart_Bot
+from symmetry import COUNT, symmetries, transform_coord
+
+
+def test_symmetries():
+    for small in (True, False):
+        board = Board(small)
+        rng = Random(3)
+        color = Space.RED
+        for _ in range(8):
+            play_turn(board, random_policy([board], color, rng)[0], color)
+            color = opponent(color)
+        turned = symmetries(board.size)
+        key, symmetry = turned.canonical(board)
+        images = list(turned.images(board))
+        assert len(images) == COUNT
+        assert key == min(image.zobrist for image in images) == images[symmetry].zobrist
+        for image in images:
+            assert turned.canonical(image)[0] == key
+        for n in range(COUNT):
+            assert transform_coord(transform_coord((1, -3), n), turned.inverses[n]) == (1, -3)
+        for turn in board.legal_turns(color):
+            moved = turned.to_canonical(turn, symmetry)
+            assert turned.from_canonical(moved, symmetry) == turn
+            after, image = copy(board), copy(images[symmetry])
+            after.push_turn(turn, color)
+            image.push_turn(moved, color)
+            assert turned.canonical(after)[0] == turned.canonical(image)[0]
+    # The start has three-fold symmetry
+    assert len({image.zobrist for image in symmetries(5).images(Board(True))}) == 4
+
+
+def test_symmetric_search():
+    bot = Smart_Bot()
+    board = Board(True)
+    results = []
+    for symmetric in (False, True):
+        searcher = Searcher(
+            bot.heuristic, bot.possible_turns, bot.apply_turn, symmetric=symmetric
+        )
+        results.append((searcher.search(board, Space.RED, float("inf"), 2), searcher.nodes))
+    (plain, plain_nodes), (shared, shared_nodes) = results
+    assert plain.score == shared.score
+    assert shared.move in board.legal_turns(Space.RED)
+    assert shared_nodes < plain_nodes
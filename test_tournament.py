@@ -0,0 +1,74 @@
+import io
+import json
+
+import pytest
+from record import parse_records
+from tournament import Match, elo_difference, fit_elo, run, run_shared, schedule, wilson
+
+
+def test_schedule():
+    matches = schedule(["smart", "dumb", "random"], rounds=2)
+    assert len(matches) == 3 * 2 * 2 * 2
+    assert sum(m.red == "smart" and m.blue == "dumb" and m.small for m in matches) == 2
+    gauntlet = schedule(["smart", "dumb", "random"], gauntlet="random", sizes=[True])
+    assert {(m.red, m.blue) for m in gauntlet} == {
+        ("random", "smart"),
+        ("smart", "random"),
+        ("random", "dumb"),
+        ("dumb", "random"),
+    }
+    with pytest.raises(ValueError):
+        schedule(["smart", "nobody"])
+    with pytest.raises(ValueError):
+        schedule(["smart", "smart"])
+
+
+def test_ratings():
+    assert wilson(5, 10) == pytest.approx((0.2366, 0.7634), abs=1e-4)
+    assert wilson(0, 0) == (0.0, 1.0)
+    assert elo_difference(0.5) == 0
+    assert elo_difference(0.75) == pytest.approx(190.85, abs=0.01)
+    results = [
+        {"red": a, "blue": b, "winner": winner}
+        for a, b, winner, count in [
+            ("x", "y", "x", 3),
+            ("y", "x", "y", 1),
+            ("y", "z", "y", 3),
+            ("z", "x", "x", 4),
+        ]
+        for _ in range(count)
+    ]
+    ratings = fit_elo(results)
+    assert ratings["x"] > ratings["y"] > ratings["z"]
+    assert sum(ratings.values()) == pytest.approx(0, abs=1e-6)
+
+
+def test_run():
+    out = io.StringIO()
+    records = io.BytesIO()
+    matches = [
+        Match("random", "dumb", True, 1.0, 2.0),
+        Match("dumb", "random", True, 1.0, 2.0),
+    ]
+    results = run(matches, jobs=2, out=out, records=records)
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == results
+    for result in results:
+        assert result["winner"] in (result["red"], result["blue"])
+        red_won = result["winner"] == result["red"]
+        assert result["winner_color"] == ("RED" if red_won else "BLUE")
+        assert result["turns"] > 0
+    winners = [r.winner.name for r in parse_records(records.getvalue())]
+    assert sorted(winners) == sorted(r["winner_color"] for r in results)
+
+
+def test_run_shared():
+    out = io.StringIO()
+    matches = [
+        Match("random", "dumb", small, 1.0, 2.0, n)
+        for n in range(3)
+        for small in (True, False)
+    ]
+    results = run_shared(matches, processes=2, out=out)
+    assert len(results) == len(matches)
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == results
+    assert all(result["winner"] in ("random", "dumb") for result in results)
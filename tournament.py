@@ -0,0 +1,435 @@
+"""
+Play many headless games between bots and rate them.
+
+    python tournament.py smart dumb random --rounds 4 --jobs 4 --out results.jsonl
+    python tournament.py smart dumb random --gauntlet smart
+    python tournament.py smart dumb random --rounds 50 --shared 4
+    python tournament.py --summarize results.jsonl
+
+Every game is a normal Game, so the rules and time controls are the same as in
+display.py. Each pairing is played on both board sizes with both colors.
+With --shared, every game is played at once as an AsyncGame in this process,
+with all the bots hosted in a fixed number of shared worker processes.
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from io import BytesIO
+from itertools import combinations
+import json
+import math
+import time
+from typing import BinaryIO, Callable, Iterable, TextIO
+
+from board import Space
+from dumb_bot import Dumb_Bot
+from game import AsyncGame, BotPool, Game, Player
+from random_bot import RandomPlayer
+from record import RecordWriter
+from smart_bot import Smart_Bot
+
+
+# Bots that can be entered, by name. Each is built from the game's time control.
+BOTS: dict[str, Callable[[float, float], Player]] = {
+    "random": lambda time_per_move, reserve_time: RandomPlayer(),
+    "dumb": lambda time_per_move, reserve_time: Dumb_Bot(),
+    "smart": Smart_Bot,
+}
+
+
+@dataclass
+class Match:
+    """
+    One game to play
+
+    Attributes:
+        red: The registered name of the bot playing red
+        blue: The registered name of the bot playing blue
+        small: Whether to play on the small board
+        time_per_move: The Game's time_per_move
+        reserve_time: The Game's reserve_time
+        round: Which repetition of the schedule this game belongs to
+    """
+
+    red: str
+    blue: str
+    small: bool
+    time_per_move: float = 3.0
+    reserve_time: float = 10.0
+    round: int = 0
+
+
+def schedule(
+    bots: list[str],
+    rounds: int = 1,
+    gauntlet: str | None = None,
+    sizes: Iterable[bool] = (True, False),
+    time_per_move: float = 3.0,
+    reserve_time: float = 10.0,
+) -> list[Match]:
+    """
+    List the games of a tournament
+
+    Args:
+        bots (list[str]): Registered names of the bots taking part
+        rounds (int, optional): How many times to play the whole schedule. Defaults to 1.
+        gauntlet (str | None, optional): If given, this bot plays every other
+            bot and the others don't play each other. Otherwise every pair of
+            bots plays (round robin). Defaults to None.
+        sizes (Iterable[bool], optional): The board sizes to play on, as Game's
+            small flag. Defaults to both.
+        time_per_move (float, optional): The Game's time_per_move. Defaults to 3.0.
+        reserve_time (float, optional): The Game's reserve_time. Defaults to 10.0.
+
+    Raises:
+        ValueError: A bot isn't registered in BOTS or is entered twice, or the
+            gauntlet bot isn't playing
+
+    Returns:
+        list[Match]: Every game, each pairing on every size with both colors
+    """
+    for name in bots:
+        if name not in BOTS:
+            raise ValueError(f"Unknown bot {name!r}, expected one of {sorted(BOTS)}")
+    if len(set(bots)) != len(bots):
+        raise ValueError("Each bot can only be entered once")
+    if gauntlet is None:
+        pairs = list(combinations(bots, 2))
+    elif gauntlet not in bots:
+        raise ValueError(f"The gauntlet bot {gauntlet!r} must be one of the bots")
+    else:
+        pairs = [(gauntlet, other) for other in bots if other != gauntlet]
+    return [
+        Match(red, blue, small, time_per_move, reserve_time, n)
+        for n in range(rounds)
+        for a, b in pairs
+        for small in sizes
+        for red, blue in ((a, b), (b, a))
+    ]
+
+
+def play(match: Match, record: bool = False) -> dict:
+    """
+    Play one game to the end
+
+    Args:
+        match (Match): The game to play
+        record (bool, optional): Whether to keep a game record. Defaults to False.
+
+    Returns:
+        dict: The match, plus the winner's name and color, the number of
+            turns played, how long the game took and, if asked for, the
+            record's bytes under "record"
+    """
+    recording = BytesIO()
+    game = Game(*_game_args(match, recording, record))
+    start = time.monotonic()
+    turns = 0
+    try:
+        while game.winner is None:
+            game.step()
+            turns += 1
+    finally:
+        game.close()
+    return _result(match, game, turns, time.monotonic() - start, recording, record)
+
+
+async def play_shared(match: Match, pool: BotPool, record: bool = False) -> dict:
+    """
+    Play one game to the end as an AsyncGame, with its bots in a shared pool
+
+    Args:
+        match (Match): The game to play
+        pool (BotPool): The worker processes to host the bots in
+        record (bool, optional): Whether to keep a game record. Defaults to False.
+
+    Returns:
+        dict: The same as play
+    """
+    recording = BytesIO()
+    red, blue, *rest = _game_args(match, recording, record)
+    game = AsyncGame(red, blue, pool, *rest)
+    start = time.monotonic()
+    turns = 0
+    try:
+        while game.winner is None:
+            await game.step()
+            turns += 1
+    finally:
+        game.close()
+    return _result(match, game, turns, time.monotonic() - start, recording, record)
+
+
+def _game_args(match: Match, recording: BytesIO, record: bool) -> tuple:
+    return (
+        BOTS[match.red](match.time_per_move, match.reserve_time),
+        BOTS[match.blue](match.time_per_move, match.reserve_time),
+        match.small,
+        match.time_per_move,
+        match.reserve_time,
+        0.0,
+        RecordWriter(recording, match.small) if record else None,
+    )
+
+
+def _result(
+    match: Match, game: Game, turns: int, seconds: float, recording: BytesIO, record: bool
+) -> dict:
+    return {
+        **asdict(match),
+        "winner": match.red if game.winner == Space.RED else match.blue,
+        "winner_color": game.winner.name,  # type: ignore
+        "turns": turns,
+        "seconds": round(seconds, 3),
+        **({"record": recording.getvalue()} if record else {}),
+    }
+
+
+def run(
+    matches: list[Match],
+    jobs: int = 1,
+    out: TextIO | None = None,
+    records: BinaryIO | None = None,
+) -> list[dict]:
+    """
+    Play a list of games, several at a time
+
+    Args:
+        matches (list[Match]): The games to play
+        jobs (int, optional): How many games to play at once. Every game also
+            starts a worker process per bot, so the bots' time controls are
+            only fair while jobs leaves them a CPU core each. Defaults to 1.
+        out (TextIO | None, optional): Where to write each result as a line of
+            JSON as soon as its game ends. Defaults to None.
+        records (BinaryIO | None, optional): Where to write each game's record
+            (see record.py) as soon as it ends. Defaults to None.
+
+    Returns:
+        list[dict]: The results, in the order the games ended
+    """
+    results = []
+    # Not a multiprocessing.Pool: its processes are daemons, which can't start
+    # the bots' worker processes
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(play, match, records is not None) for match in matches]
+        for future in as_completed(futures):
+            results.append(_finish(future.result(), out, records))
+    return results
+
+
+def run_shared(
+    matches: list[Match],
+    processes: int | None = None,
+    out: TextIO | None = None,
+    records: BinaryIO | None = None,
+) -> list[dict]:
+    """
+    Play a list of games all at once in this process, with every bot hosted
+    in a fixed number of shared worker processes (see BotPool)
+
+    Args:
+        matches (list[Match]): The games to play
+        processes (int | None, optional): How many worker processes to share.
+            Defaults to the number of CPUs.
+        out (TextIO | None, optional): As for run. Defaults to None.
+        records (BinaryIO | None, optional): As for run. Defaults to None.
+
+    Returns:
+        list[dict]: The results, in the order the games ended
+    """
+
+    async def play_all() -> list[dict]:
+        results = []
+        async with BotPool(processes) as pool:
+            for game in asyncio.as_completed(
+                [play_shared(match, pool, records is not None) for match in matches]
+            ):
+                results.append(_finish(await game, out, records))
+        return results
+
+    return asyncio.run(play_all())
+
+
+def _finish(result: dict, out: TextIO | None, records: BinaryIO | None) -> dict:
+    # Write out a game's result and record as soon as it ends
+    if records is not None:
+        records.write(result.pop("record"))
+        records.flush()
+    if out is not None:
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+    return result
+
+
+def wilson(wins: float, games: int, z: float = 1.96) -> tuple[float, float]:
+    """
+    The Wilson score interval for a win rate
+
+    Args:
+        wins (float): Games won
+        games (int): Games played
+        z (float, optional): The normal quantile of the confidence level.
+            Defaults to 1.96 (95%).
+
+    Returns:
+        tuple[float, float]: The low and high ends of the interval
+    """
+    if games == 0:
+        return 0.0, 1.0
+    p = wins / games
+    center = (p + z * z / (2 * games)) / (1 + z * z / games)
+    spread = (
+        z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games))
+    ) / (1 + z * z / games)
+    return max(0.0, center - spread), min(1.0, center + spread)
+
+
+def elo_difference(rate: float) -> float:
+    """
+    The Elo rating difference that predicts a win rate
+
+    Args:
+        rate (float): The expected score of the stronger side, between 0 and 1
+
+    Returns:
+        float: The rating difference, infinite for a rate of 0 or 1
+    """
+    if rate <= 0.0:
+        return -math.inf
+    if rate >= 1.0:
+        return math.inf
+    return -400 * math.log10(1 / rate - 1)
+
+
+def fit_elo(results: list[dict], iterations: int = 200) -> dict[str, float]:
+    """
+    Fit Elo ratings to all the results at once (a Bradley-Terry model)
+
+    Every pairing that was played gets half a virtual win each way, so a bot
+    that won all its games still gets a finite rating.
+
+    Args:
+        results (list[dict]): Game results from play()
+        iterations (int, optional): Rounds of the fitting algorithm. Defaults to 200.
+
+    Returns:
+        dict[str, float]: Ratings with an average of 0
+    """
+    wins: dict[tuple[str, str], float] = {}
+    for result in results:
+        loser = result["blue"] if result["winner"] == result["red"] else result["red"]
+        for pair in ((result["winner"], loser), (loser, result["winner"])):
+            wins.setdefault(pair, 0.5)
+        wins[result["winner"], loser] += 1
+    names = sorted({name for pair in wins for name in pair})
+    strength = {name: 1.0 for name in names}
+    for _ in range(iterations):
+        # Minorization-maximization update for Bradley-Terry strengths
+        for name in names:
+            won = sum(w for (a, _), w in wins.items() if a == name)
+            expected = sum(
+                (w + wins[b, a]) / (strength[a] + strength[b])
+                for (a, b), w in wins.items()
+                if a == name
+            )
+            strength[name] = won / expected
+        mean = sum(math.log10(s) for s in strength.values()) / len(names)
+        strength = {name: s / 10**mean for name, s in strength.items()}
+    return {name: 400 * math.log10(s) for name, s in strength.items()}
+
+
+def summarize(results: list[dict]) -> str:
+    """
+    Describe how each bot and each pairing did
+
+    Args:
+        results (list[dict]): Game results from play()
+
+    Returns:
+        str: A table of ratings and win rates with 95% confidence intervals,
+            followed by one line per pairing
+    """
+    ratings = fit_elo(results)
+    lines = [f"{'bot':<12}{'elo':>8}{'games':>8}{'win rate':>10}  95% interval"]
+    for name in sorted(ratings, key=ratings.__getitem__, reverse=True):
+        games = [r for r in results if name in (r["red"], r["blue"])]
+        won = sum(r["winner"] == name for r in games)
+        low, high = wilson(won, len(games))
+        lines.append(
+            f"{name:<12}{ratings[name]:>8.0f}{len(games):>8}"
+            f"{won / len(games):>10.1%}  {low:.1%} - {high:.1%}"
+        )
+    lines.append("")
+    pairs = sorted({tuple(sorted((r["red"], r["blue"]))) for r in results})
+    for a, b in pairs:
+        games = [r for r in results if {r["red"], r["blue"]} == {a, b}]
+        won = sum(r["winner"] == a for r in games)
+        low, high = wilson(won, len(games))
+        lines.append(
+            f"{a} vs {b}: {won}-{len(games) - won}, "
+            f"elo {elo_difference(won / len(games)):+.0f} "
+            f"({elo_difference(low):+.0f} to {elo_difference(high):+.0f})"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("bots", nargs="*", help=f"bots to enter, from {sorted(BOTS)}")
+    parser.add_argument("--gauntlet", help="play only this bot against the others")
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument(
+        "--size", choices=["small", "large", "both"], default="both"
+    )
+    parser.add_argument("--time-per-move", type=float, default=3.0)
+    parser.add_argument("--reserve-time", type=float, default=10.0)
+    parser.add_argument("--jobs", type=int, default=1, help="games to play at once")
+    parser.add_argument(
+        "--shared",
+        type=int,
+        metavar="PROCESSES",
+        help="play every game at once, with the bots sharing this many processes",
+    )
+    parser.add_argument("--out", help="append each result to this JSONL file")
+    parser.add_argument("--records", help="append each game's record to this file")
+    parser.add_argument(
+        "--summarize", metavar="JSONL", help="only summarize an existing results file"
+    )
+    args = parser.parse_args(argv)
+    if args.summarize:
+        with open(args.summarize) as file:
+            print(summarize([json.loads(line) for line in file if line.strip()]))
+        return
+    if len(args.bots) < 2:
+        parser.error("at least two bots are needed")
+    sizes = {"small": (True,), "large": (False,), "both": (True, False)}[args.size]
+    try:
+        matches = schedule(
+            args.bots,
+            args.rounds,
+            args.gauntlet,
+            sizes,
+            args.time_per_move,
+            args.reserve_time,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    out = open(args.out, "a") if args.out else None
+    records = open(args.records, "ab") if args.records else None
+    try:
+        if args.shared:
+            results = run_shared(matches, args.shared, out, records)
+        else:
+            results = run(matches, args.jobs, out, records)
+    finally:
+        if out is not None:
+            out.close()
+        if records is not None:
+            records.close()
+    print(summarize(results))
+
+
+if __name__ == "__main__":
+    main()